@@ -24,6 +24,9 @@ Windows:
     # Tkinter biasanya sudah included dengan Python installer dari python.org
     # Jika belum ada, reinstall Python dan centang "tcl/tk and IDLE"
 
+ALL PLATFORMS (NumPy untuk engine partikel):
+    pip install numpy
+
 === HOW TO RUN ===
     python brownian_motion.py
 
@@ -31,60 +34,55 @@ atau
 
     python3 brownian_motion.py
 
+    python3 brownian_motion.py --seed 42   # hasil bisa diulang
+
+Tanpa GUI (headless, tanpa Tkinter):
+
+    python -m brownian.headless --particles 10000 --steps 1000 --seed 42
+
+Benchmark (bagian render butuh display, di server pakai xvfb-run):
+
+    python -m brownian.benchmark -o bench.json
+    python -m brownian.benchmark --baseline bench.json
+
+Satu simulasi untuk banyak penampil (server + klien Tk):
+
+    python -m brownian.server --particles 5000 --port 8765
+    python -m brownian.viewer --port 8765
+
+Mulai cepat tanpa splash, dengan laporan waktu sampai frame pertama:
+
+    python3 brownian_motion.py --no-splash --startup-report -
+
 ========================
 """
 
+import time
+
+# Startup is timed from here (interpreter start-up itself is not included)
+LAUNCHED = time.perf_counter()
+
+import argparse
+import json
+import sys
 import tkinter as tk
-from tkinter import ttk
-import random
+from tkinter import filedialog, messagebox
 import math
-import time
 
-class Particle:
-    def __init__(self, canvas_width, canvas_height):
-        self.x = random.uniform(30, canvas_width - 30)
-        self.y = random.uniform(30, canvas_height - 30)
-        self.vx = random.uniform(-2, 2)
-        self.vy = random.uniform(-2, 2)
-        self.radius = random.uniform(4, 7)
-        self.color = random.choice([
-            '#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA07A',
-            '#98D8C8', '#F7DC6F', '#BB8FCE', '#85C1E2',
-            '#FF9FF3', '#54A0FF', '#48DBFB', '#1DD1A1'
-        ])
-        self.trail = []
-        self.canvas_width = canvas_width
-        self.canvas_height = canvas_height
-
-    def update(self, speed):
-        # Brownian motion: random walk
-        self.vx += random.uniform(-0.5, 0.5)
-        self.vy += random.uniform(-0.5, 0.5)
-
-        # Limit speed
-        max_speed = speed * 0.5
-        current_speed = math.sqrt(self.vx**2 + self.vy**2)
-        if current_speed > max_speed:
-            self.vx = (self.vx / current_speed) * max_speed
-            self.vy = (self.vy / current_speed) * max_speed
-
-        # Update position
-        self.x += self.vx
-        self.y += self.vy
-
-        # Bounce off walls with damping
-        if self.x < self.radius or self.x > self.canvas_width - self.radius:
-            self.vx *= -0.8
-            self.x = max(self.radius, min(self.x, self.canvas_width - self.radius))
-
-        if self.y < self.radius or self.y > self.canvas_height - self.radius:
-            self.vy *= -0.8
-            self.y = max(self.radius, min(self.y, self.canvas_height - self.radius))
-
-        # Update trail
-        self.trail.append((self.x, self.y))
-        if len(self.trail) > 30:
-            self.trail.pop(0)
+from brownian.engine import ParticleSystem
+from brownian.rendering import CanvasRenderer, RasterRenderer
+from brownian.trails import TRAIL_LENGTH, MIN_TRAIL_LENGTH, MAX_TRAIL_LENGTH, TrailBuffer
+from brownian.threaded import SimulationThread, RenderState, FAST_AS_POSSIBLE
+from brownian.analytics import FIT_MSD_FRACTION, LiveAnalytics
+from brownian.density import OccupancyGrid
+from brownian.profiling import FrameProfiler, JsonLinesSink, ProfilerOverlay, StartupTimer
+from brownian.quality import AdaptiveQuality, FULL_QUALITY
+from brownian.langevin import TEMPERATURE, FRICTION, DT
+from brownian.scheduler import FrameScheduler, Throttle, Debouncer
+
+MAX_WARP_EXPONENT = 12
+MIN_PARTICLES = 5
+MAX_PARTICLES = 50_000
 
 class ModernButton(tk.Canvas):
     def __init__(self, parent, text, command, bg_color, hover_color, **kwargs):
@@ -153,7 +151,9 @@ class ModernButton(tk.Canvas):
                 self.itemconfig(item, fill=self.bg_color)
 
 class BrownianMotionSimulator:
-    def __init__(self, root):
+    def __init__(self, root, seed=None, profile_log=None, resume=None, autosave=None,
+                 autosave_every=60, splash=True, startup=None, startup_report=None,
+                 exit_after_startup=False):
         self.root = root
         self.root.title("🔬 Simulasi Gerak Brown")
         self.root.geometry("1400x900")
@@ -162,17 +162,67 @@ class BrownianMotionSimulator:
         self.root.configure(bg="#1a1a2e")
 
         # Variables
-        self.particles = []
+        self.seed = seed
+        self.resume_path = resume
+        self.checkpoint_writer = None
+        self.autosave_path = autosave
+        self.autosave_every = autosave_every
+        self.startup = startup or StartupTimer()
+        self.startup_report = startup_report
+        self.exit_after_startup = exit_after_startup
+        self.controls_parent = None
+        self.controls_built = False
+        self.system = None
+        self.simulation = None
+        self.render_state = RenderState()
+        self.analytics = LiveAnalytics()
+        # Occupancy heatmap, only accumulated while it is shown
+        self.density = OccupancyGrid()
+        self.density.active = False
+        self.show_density = False
+        self.density_throttle = Throttle()
+        # [TrajectoryRecorder] while recording; the worker fills it in
+        self.recording = None
+        self.player = None
+        self.replay_window = None
+        self.interpolate = True
+        # Frame loops aim at frame deadlines; stat cards refresh a few
+        # times per second and slider drags settle before anything rebuilds
+        self.frames = FrameScheduler(self.root, self.animate)
+        self.replay_frames = FrameScheduler(self.root, self.animate_replay)
+        self.stats_throttle = Throttle()
+        self.debouncer = Debouncer(self.root)
+        self.profiler = FrameProfiler()
+        self.profile_sink = None
+        if profile_log:
+            self.profile_sink = JsonLinesSink(profile_log)
+            self.profiler.sinks.append(self.profile_sink)
+        self.overlay = None
+        self.adaptive = AdaptiveQuality(budget=self.profiler.budget)
+        self.auto_quality = True
         self.is_running = False
         self.show_trails = True
+        self.render_mode = "vector"
+        self.collisions = False
+        self.integrator = "classic"
+        self.langevin = {"temperature": TEMPERATURE, "friction": FRICTION, "dt": DT}
+        self.model_window = None
         self.num_particles = 20
+        # Slider position last set from code, see set_particle_slider()
+        self.particle_slider_position = None
         self.speed = 3
+        # Physics steps per displayed frame (slider position -> 2**position)
+        self.warp = 1
+        self.trail_length = TRAIL_LENGTH
         self.total_steps = 0
         self.start_time = None
         self.particle_count = 0
 
-        # Show splash screen first
-        self.show_splash_screen()
+        # Show splash screen first, unless asked to start straight away
+        if splash:
+            self.show_splash_screen()
+        else:
+            self.start_app()
 
     def show_splash_screen(self):
         """Display welcome splash screen with introduction"""
@@ -309,9 +359,41 @@ dengan molekul fluida di sekitarnya.
 
     def close_splash(self, splash):
         """Close splash screen and show main app"""
+        # Both the start button and the 8 s timer end up here
+        if not splash.winfo_exists():
+            return
         splash.destroy()
+        self.start_app()
+
+    def start_app(self):
+        """Window and canvas first, particles on the first frame, controls after it"""
         self.setup_ui()
-        self.init_particles()
+        self.startup.mark("window")
+        self.root.after_idle(self.init_particles)
+
+    def finish_startup(self):
+        """Build the control panel once the first frame is on screen"""
+        self.create_controls(self.controls_parent)
+        self.controls_built = True
+        self.startup.mark("controls")
+
+        if self.resume_path:
+            path, self.resume_path = self.resume_path, None
+            self.restore_checkpoint(path)
+        if self.autosave_path:
+            self.root.after(self.autosave_interval(), self.autosave)
+
+        if self.startup_report:
+            report = self.startup.report()
+            if self.startup_report == "-":
+                json.dump(report, sys.stdout)
+                sys.stdout.write("\n")
+                sys.stdout.flush()
+            else:
+                with open(self.startup_report, "w") as f:
+                    json.dump(report, f, indent=2)
+        if self.exit_after_startup:
+            self.root.after(0, self.root.destroy)
 
     def setup_ui(self):
         # Main container with padding
@@ -372,14 +454,19 @@ dengan molekul fluida di sekitarnya.
             highlightthickness=0
         )
         self.canvas.pack(fill=tk.BOTH, expand=True, padx=3, pady=3)
+        self.renderer = CanvasRenderer(self.canvas)
+        self.renderer.profiler = self.profiler
+        self.overlay = ProfilerOverlay(self.canvas, self.profiler)
+        self.show_overlay = False
 
         # Right side - Controls
         right_frame = tk.Frame(content_frame, bg="#1a1a2e", width=350)
         right_frame.pack(side=tk.RIGHT, fill=tk.Y)
         right_frame.pack_propagate(False)
 
-        # Control panels
-        self.create_control_panel(right_frame)
+        # Stat cards now, sliders and buttons once the first frame is drawn
+        self.create_stat_cards(right_frame)
+        self.controls_parent = right_frame
 
         # Bottom info
         info_frame = tk.Frame(main_frame, bg="#1a1a2e")
@@ -396,8 +483,7 @@ dengan molekul fluida di sekitarnya.
         )
         info_text.pack()
 
-    def create_control_panel(self, parent):
-        # Stats cards
+    def create_stat_cards(self, parent):
         stats_frame = tk.Frame(parent, bg="#1a1a2e")
         stats_frame.pack(fill=tk.X, pady=(0, 20))
 
@@ -406,22 +492,48 @@ dengan molekul fluida di sekitarnya.
         self.create_stat_card(stats_frame, "Partikel", "0", "particles", "#4ecdc4")
         self.create_stat_card(stats_frame, "Runtime", "0s", "runtime", "#f093fb")
 
-        # Control section
+        # Physics metrics, side by side
+        physics_row = tk.Frame(stats_frame, bg="#1a1a2e")
+        physics_row.pack(fill=tk.X)
+        self.create_stat_card(physics_row, "Difusi D (px²/step)", "–", "diffusion", "#1DD1A1", side=tk.LEFT)
+        self.create_stat_card(physics_row, "Kecepatan Rata²", "–", "mean_speed", "#F7DC6F", side=tk.RIGHT)
+
+    def create_controls(self, parent):
+        # Control section, scrolls when the window is too short for it
         control_container = tk.Frame(parent, bg="#2d3748")
         control_container.pack(fill=tk.BOTH, expand=True)
+        self.create_file_menu()
+
+        scroll_canvas = tk.Canvas(control_container, bg="#2d3748", highlightthickness=0)
+        scrollbar = tk.Scrollbar(control_container, orient=tk.VERTICAL,
+                                 command=scroll_canvas.yview)
+        scroll_canvas.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        scroll_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scroll_frame = tk.Frame(scroll_canvas, bg="#2d3748")
+        window = scroll_canvas.create_window(0, 0, anchor="nw", window=scroll_frame)
+        scroll_frame.bind("<Configure>", lambda e: scroll_canvas.configure(
+            scrollregion=scroll_canvas.bbox("all")))
+        scroll_canvas.bind("<Configure>", lambda e: scroll_canvas.itemconfig(window, width=e.width))
+        self.bind_scroll_wheel(scroll_canvas)
 
         # Padding inside control container
-        control_inner = tk.Frame(control_container, bg="#2d3748")
-        control_inner.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+        control_inner = tk.Frame(scroll_frame, bg="#2d3748")
+        control_inner.pack(fill=tk.BOTH, expand=True, padx=(15, 10), pady=20)
 
         # Particle count slider
         self.create_slider_control(
             control_inner,
             "🔵 Jumlah Partikel",
-            5, 50, self.num_particles,
+            0, 1, 1,
             self.update_particle_count,
             "particle"
         )
+        # Log scale so both 5 and 50 000 particles are reachable
+        self.particle_slider.config(
+            from_=math.log10(MIN_PARTICLES), to=math.log10(MAX_PARTICLES), resolution=0.01
+        )
+        self.set_particle_slider(self.num_particles)
 
         # Speed slider
         self.create_slider_control(
@@ -432,6 +544,25 @@ dengan molekul fluida di sekitarnya.
             "speed"
         )
 
+        # Time warp: 1, 2, 4 ... 4096 steps per frame, last position = as fast as possible
+        self.create_slider_control(
+            control_inner,
+            "⏩ Percepatan Waktu",
+            0, MAX_WARP_EXPONENT + 1, 0,
+            self.update_warp,
+            "warp"
+        )
+        self.warp_value_label.config(text="1x")
+
+        # Trail length slider
+        self.create_slider_control(
+            control_inner,
+            "〰 Panjang Jejak",
+            MIN_TRAIL_LENGTH, MAX_TRAIL_LENGTH, self.trail_length,
+            self.update_trail_length,
+            "trail"
+        )
+
         # Buttons
         button_container = tk.Frame(control_inner, bg="#2d3748")
         button_container.pack(fill=tk.X, pady=(20, 0))
@@ -474,9 +605,161 @@ dengan molekul fluida di sekitarnya.
         )
         self.trail_btn.pack(side=tk.RIGHT)
 
-    def create_stat_card(self, parent, title, value, var_name, color):
+        # Second row: render mode and particle collisions
+        btn_row2 = tk.Frame(button_container, bg="#2d3748")
+        btn_row2.pack(fill=tk.X)
+
+        self.mode_btn = ModernButton(
+            btn_row2,
+            text="🖼 Vektor",
+            command=self.toggle_render_mode,
+            bg_color="#45B7D1",
+            hover_color="#3a9bb3",
+            width=145,
+            height=45
+        )
+        self.mode_btn.pack(side=tk.LEFT, padx=(0, 10))
+
+        self.collision_btn = ModernButton(
+            btn_row2,
+            text="✗ Tumbukan",
+            command=self.toggle_collisions,
+            bg_color="#FFA07A",
+            hover_color="#e68a66",
+            width=145,
+            height=45
+        )
+        self.collision_btn.pack(side=tk.RIGHT)
+
+        # Third row: trajectory recording
+        btn_row3 = tk.Frame(button_container, bg="#2d3748")
+        btn_row3.pack(fill=tk.X, pady=(10, 0))
+
+        self.record_btn = ModernButton(
+            btn_row3,
+            text="⏺ Rekam",
+            command=self.toggle_recording,
+            bg_color="#FF6B6B",
+            hover_color="#e05555",
+            width=145,
+            height=45
+        )
+        self.record_btn.pack(side=tk.LEFT, padx=(0, 10))
+
+        self.replay_btn = ModernButton(
+            btn_row3,
+            text="🎞 Putar Ulang",
+            command=self.open_replay,
+            bg_color="#BB8FCE",
+            hover_color="#a277b5",
+            width=145,
+            height=45
+        )
+        self.replay_btn.pack(side=tk.RIGHT)
+
+        btn_row4 = tk.Frame(button_container, bg="#2d3748")
+        btn_row4.pack(fill=tk.X, pady=(10, 0))
+
+        self.overlay_btn = ModernButton(
+            btn_row4,
+            text="✗ Profil",
+            command=self.toggle_overlay,
+            bg_color="#F7DC6F",
+            hover_color="#dcc25a",
+            width=145,
+            height=45
+        )
+        self.overlay_btn.pack(side=tk.LEFT, padx=(0, 10))
+
+        self.density_btn = ModernButton(
+            btn_row4,
+            text="✗ Kepadatan",
+            command=self.toggle_density,
+            bg_color="#EE5A24",
+            hover_color="#cc4c1e",
+            width=145,
+            height=45
+        )
+        self.density_btn.pack(side=tk.RIGHT)
+
+        self.quality_btn = ModernButton(
+            button_container,
+            text="⚙ Kualitas Auto: penuh",
+            command=self.toggle_auto_quality,
+            bg_color="#48DBFB",
+            hover_color="#34c3e2",
+            width=300,
+            height=45
+        )
+        self.quality_btn.pack(pady=(10, 0))
+
+        btn_row5 = tk.Frame(button_container, bg="#2d3748")
+        btn_row5.pack(fill=tk.X, pady=(10, 0))
+
+        self.model_btn = ModernButton(
+            btn_row5,
+            text="〜 Klasik",
+            command=self.toggle_integrator,
+            bg_color="#1DD1A1",
+            hover_color="#17b88d",
+            width=145,
+            height=45
+        )
+        self.model_btn.pack(side=tk.LEFT, padx=(0, 10))
+
+        self.model_params_btn = ModernButton(
+            btn_row5,
+            text="🌡 Parameter",
+            command=self.show_model_controls,
+            bg_color="#FF9FF3",
+            hover_color="#e087d6",
+            width=145,
+            height=45
+        )
+        self.model_params_btn.pack(side=tk.RIGHT)
+
+    def create_file_menu(self):
+        """Rarely used file actions live in the menu bar, not in the panel"""
+        menubar = tk.Menu(self.root)
+        file_menu = tk.Menu(menubar, tearoff=0)
+        file_menu.add_command(label="Simpan Checkpoint…", accelerator="Ctrl+S",
+                              command=self.save_checkpoint)
+        file_menu.add_command(label="Muat Checkpoint…", accelerator="Ctrl+O",
+                              command=self.open_checkpoint)
+        file_menu.add_separator()
+        file_menu.add_command(label="Ekspor Waktu Frame…", command=self.export_profile)
+        file_menu.add_command(label="Ekspor Histogram Kepadatan…", command=self.export_density)
+        menubar.add_cascade(label="Berkas", menu=file_menu)
+        self.root.config(menu=menubar)
+        self.root.bind("<Control-s>", lambda e: self.save_checkpoint())
+        self.root.bind("<Control-o>", lambda e: self.open_checkpoint())
+
+    def bind_scroll_wheel(self, canvas):
+        """Scroll `canvas` with the mouse wheel while the pointer is over it"""
+        def scroll(event):
+            if event.num == 4 or event.delta > 0:
+                canvas.yview_scroll(-1, "units")
+            elif event.num == 5 or event.delta < 0:
+                canvas.yview_scroll(1, "units")
+
+        def enter(event):
+            for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                canvas.bind_all(sequence, scroll)
+
+        def leave(event):
+            for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+                canvas.unbind_all(sequence)
+
+        canvas.bind("<Enter>", enter)
+        canvas.bind("<Leave>", leave)
+
+    def create_stat_card(self, parent, title, value, var_name, color, side=None):
         card = tk.Frame(parent, bg="#2d3748")
-        card.pack(fill=tk.X, pady=(0, 10))
+        if side is None:
+            card.pack(fill=tk.X, pady=(0, 10))
+        else:
+            card.pack(side=side, fill=tk.X, expand=True, pady=(0, 10),
+                      padx=(0, 5) if side == tk.LEFT else (5, 0))
 
         # Value
         value_label = tk.Label(
@@ -517,7 +800,7 @@ dengan molekul fluida di sekitarnya.
 
         value_label = tk.Label(
             label_row,
-            text=str(initial) if prefix == "particle" else f"{initial}x",
+            text=f"{initial}x" if prefix == "speed" else str(initial),
             font=("Segoe UI", 11, "bold"),
             fg="#667eea",
             bg="#2d3748"
@@ -544,40 +827,152 @@ dengan molekul fluida di sekitarnya.
         slider.pack(fill=tk.X)
         setattr(self, f"{prefix}_slider", slider)
 
+    def set_particle_slider(self, count):
+        """Move the slider near `count` without resizing the system
+
+        The slider only has a 0.01 log grid clamped to its range, so its
+        own callback would round an exact count (e.g. a restored one).
+        That callback fires later from Tk, and is skipped for this position.
+        """
+        position = round(math.log10(min(max(count, MIN_PARTICLES), MAX_PARTICLES)), 2)
+        self.particle_slider_position = position
+        self.particle_slider.set(position)
+        self.particle_value_label.config(text=str(count))
+
     def update_particle_count(self, value):
-        self.num_particles = int(float(value))
-        self.particle_value_label.config(text=str(self.num_particles))
-        if not self.is_running:
-            self.init_particles()
+        position = self.particle_slider_position
+        self.particle_slider_position = None
+        if position is not None and abs(float(value) - position) < 1e-6:
+            return
+        count = int(round(10 ** float(value)))
+        if count == self.num_particles:
+            return
+        self.num_particles = count
+        self.particle_value_label.config(text=str(count))
+        # A drag fires this for every pixel; resize once it settles
+        self.debouncer.schedule("particles", self.apply_particle_count)
+
+    def apply_particle_count(self):
+        count = self.num_particles
+        if self.system is None or self.system.count == count:
+            return
+
+        # A recording holds a fixed number of particles
+        self.stop_recording()
+
+        # Add or drop particles at the end; the rest keep moving undisturbed
+        system = self.system
+        self.run_on_worker(lambda: system.resize(count))
+        self.particles_label.config(text=str(count))
+        if self.simulation is None:
+            self.render_state.load(system, self.total_steps)
+            if self.player is None:
+                self.draw_frame(self.render_state)
 
     def update_speed(self, value):
         self.speed = int(float(value))
         self.speed_value_label.config(text=f"{self.speed}x")
+        self.debouncer.schedule("speed", self.apply_speed)
+
+    def apply_speed(self):
+        if self.simulation is not None:
+            self.simulation.speed = self.speed
+
+    def update_warp(self, value):
+        position = int(float(value))
+        if position > MAX_WARP_EXPONENT:
+            self.warp = FAST_AS_POSSIBLE
+            self.warp_value_label.config(text="MAKS")
+        else:
+            self.warp = 2 ** position
+            self.warp_value_label.config(text=f"{self.warp}x")
+        self.debouncer.schedule("warp", self.apply_warp)
+
+    def apply_warp(self):
+        if self.simulation is not None:
+            self.simulation.warp = self.warp
+
+    def update_trail_length(self, value):
+        self.trail_length = int(float(value))
+        self.trail_value_label.config(text=str(self.trail_length))
+        self.debouncer.schedule("trail", self.apply_trail_length)
+
+    def apply_trail_length(self):
+        if self.render_state.trail_length != self.trail_length:
+            self.render_state.set_trail_length(self.trail_length)
+        if self.player is not None and self.player.trail_length != self.trail_length:
+            self.player.set_trail_length(self.trail_length)
+        self.sync_trail_points()
+
+    def sync_trail_points(self):
+        """Let the worker keep per-step trail points while trails are shown"""
+        if self.simulation is not None:
+            self.simulation.trail_points = self.render_state.trail_length if self.show_trails else 0
 
     def toggle_simulation(self):
+        if self.player is not None:
+            self.close_replay()
         self.is_running = not self.is_running
 
         if self.is_running:
             self.play_btn.text = "⏸ Jeda"
             self.play_btn.draw_button()
             self.start_time = time.time()
-            self.animate()
+            self.start_worker()
+            self.frames.start()
         else:
             self.play_btn.text = "▶ Mulai"
             self.play_btn.draw_button()
+            self.frames.stop()
+            self.stop_worker()
+            self.update_stats()
+
+    def start_worker(self):
+        """Hand the particle system to a fixed-timestep simulation thread"""
+        self.simulation = SimulationThread(self.system, self.speed, steps=self.total_steps,
+                                           profiler=self.profiler)
+        self.simulation.warp = self.warp
+        self.simulation.on_error = self._worker_failed
+        self.sync_trail_points()
+        self.simulation.step_hooks.append(self.analytics)
+        self.simulation.step_hooks.append(self.density)
+        if self.recording:
+            self.simulation.step_hooks.append(self.recording[0])
+        self.simulation.start()
+
+    def stop_worker(self):
+        """Park the simulation thread, the Tk side owns the system again"""
+        if self.simulation is not None:
+            self.simulation.stop()
+            self.total_steps = self.simulation.steps
+            self.simulation = None
 
     def reset_simulation(self):
+        self.close_replay()
+        self.debouncer.flush()
         self.is_running = False
+        self.frames.stop()
+        self.stop_recording()
+        self.stop_worker()
         self.play_btn.text = "▶ Mulai"
         self.play_btn.draw_button()
         self.total_steps = 0
         self.start_time = None
 
-        self.canvas.delete("all")
+        self.renderer.clear()
+        self.analytics.reset()
+        self.density.reset()
+        self.profiler.reset()
+        self.adaptive.reset()
+        self.renderer.quality = self.adaptive.current
+        self.update_quality_button()
         self.init_particles()
 
         self.steps_label.config(text="0")
         self.runtime_label.config(text="0s")
+        self.diffusion_label.config(text="–")
+        self.mean_speed_label.config(text="–")
+        self.stats_throttle.reset()
 
     def toggle_trails(self):
         self.show_trails = not self.show_trails
@@ -588,9 +983,265 @@ dengan molekul fluida di sekitarnya.
             self.trail_btn.text = "✗ Jejak"
         self.trail_btn.draw_button()
 
+        self.render_state.record_trails = self.show_trails
         if not self.show_trails:
-            for particle in self.particles:
-                particle.trail = []
+            self.render_state.clear_trails()
+        self.sync_trail_points()
+        if self.player is not None:
+            self.player.record_trails = self.show_trails
+            self.player.rebuild_trails()
+
+    def toggle_density(self):
+        """Show or hide the occupancy heatmap under the particles"""
+        self.show_density = not self.show_density
+        self.density.active = self.show_density
+        self.density_btn.text = "✓ Kepadatan" if self.show_density else "✗ Kepadatan"
+        self.density_btn.draw_button()
+        if self.player is None and self.system is not None and not self.is_running:
+            self.draw_frame(self.render_state)
+
+    def export_density(self):
+        """Save the accumulated visit counts per grid cell"""
+        path = filedialog.asksaveasfilename(
+            title="Ekspor Histogram Kepadatan",
+            defaultextension=".npz",
+            filetypes=[("NumPy", "*.npz"), ("CSV", "*.csv")]
+        )
+        if not path:
+            return
+        try:
+            self.density.export(path)
+        except OSError as exc:
+            messagebox.showerror("Ekspor Histogram", f"Gagal menyimpan:\n{exc}")
+
+    def toggle_collisions(self):
+        """Turn elastic particle-particle collisions on or off"""
+        self.collisions = not self.collisions
+
+        if self.collisions:
+            self.collision_btn.text = "✓ Tumbukan"
+        else:
+            self.collision_btn.text = "✗ Tumbukan"
+        self.collision_btn.draw_button()
+
+        if self.system is not None:
+            enabled = self.collisions
+            system = self.system
+            self.run_on_worker(lambda: setattr(system, "collisions", enabled))
+
+    def toggle_integrator(self):
+        """Switch between the classic kick model and exact Langevin dynamics"""
+        self.integrator = "langevin" if self.integrator == "classic" else "classic"
+        self.model_btn.text = "〜 Langevin" if self.integrator == "langevin" else "〜 Klasik"
+        self.model_btn.draw_button()
+        self.apply_model()
+
+    def apply_model(self):
+        if self.system is None:
+            return
+        system = self.system
+        integrator, params = self.integrator, dict(self.langevin)
+        self.run_on_worker(lambda: system.set_integrator(integrator, **params))
+
+    def show_model_controls(self):
+        """Temperature, friction and dt of the Langevin integrator, on log scales"""
+        if self.model_window is not None:
+            self.model_window.lift()
+            return
+        win = tk.Toplevel(self.root)
+        win.title("🌡 Parameter Langevin")
+        win.configure(bg="#2d3748")
+        win.resizable(False, False)
+        win.protocol("WM_DELETE_WINDOW", self.close_model_controls)
+        self.model_window = win
+
+        inner = tk.Frame(win, bg="#2d3748")
+        inner.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+
+        for label, name, low, high in (
+            ("🌡 Suhu kT", "temperature", 0.01, 100.0),
+            ("🧲 Gesekan γ", "friction", 0.001, 10.0),
+            ("⏱ Langkah Waktu dt", "dt", 0.01, 100.0),
+        ):
+            value = self.langevin[name]
+            self.create_slider_control(
+                inner, label, 0, 1, 1,
+                lambda v, name=name: self.update_model_param(name, v),
+                f"model_{name}"
+            )
+            slider = getattr(self, f"model_{name}_slider")
+            slider.config(from_=math.log10(low), to=math.log10(high), resolution=0.05,
+                          length=420)
+            slider.set(math.log10(value))
+
+    def update_model_param(self, name, value):
+        self.langevin[name] = 10 ** float(value)
+        getattr(self, f"model_{name}_value_label").config(text=f"{self.langevin[name]:.3g}")
+        self.debouncer.schedule("model", self.apply_model)
+
+    def close_model_controls(self):
+        if self.model_window is not None:
+            self.model_window.destroy()
+            self.model_window = None
+
+    def run_on_worker(self, command):
+        """Apply a change to the system between two simulation steps"""
+        if self.simulation is not None:
+            self.simulation.submit(command)
+        else:
+            command()
+
+    def toggle_recording(self):
+        """Start streaming every step to a trajectory file, or stop it"""
+        if self.recording is None:
+            if self.system is None:
+                return
+            path = filedialog.asksaveasfilename(
+                title="Simpan Rekaman",
+                defaultextension=".brtraj",
+                filetypes=[("Trajektori Brown", "*.brtraj")]
+            )
+            if not path:
+                return
+            from brownian.trajectory import TrajectoryRecorder
+            system = self.system
+            simulation = self.simulation
+            total_steps = self.total_steps
+            recording = []
+
+            def start():
+                # Between two steps on the worker, where the step count is exact;
+                # the current state is frame 0, as in headless recordings
+                step0 = simulation.steps if simulation is not None else total_steps
+                try:
+                    recorder = TrajectoryRecorder(path, system, seed=system.seed,
+                                                  dt=system.time_step, step0=step0)
+                except OSError as exc:
+                    message = str(exc)
+                    self.root.after(0, lambda: self._recording_failed(recording, message))
+                    return
+                recorder.record(system)
+                recording.append(recorder)
+                if simulation is not None:
+                    simulation.step_hooks.append(recorder)
+
+            self.recording = recording
+            self.run_on_worker(start)
+            self.record_btn.text = "⏹ Stop"
+        else:
+            self.stop_recording()
+        self.record_btn.draw_button()
+
+    def stop_recording(self):
+        recording, self.recording = self.recording, None
+        if recording is None:
+            return
+        simulation = self.simulation
+
+        # Queued after start(), so the recorder exists by the time this runs
+        def detach():
+            for recorder in recording:
+                if simulation is not None and recorder in simulation.step_hooks:
+                    simulation.step_hooks.remove(recorder)
+                try:
+                    recorder.close()
+                except OSError as exc:
+                    message = str(exc)
+                    self.root.after(0, lambda: self._recording_failed(recording, message))
+
+        self.run_on_worker(detach)
+        self.record_btn.text = "⏺ Rekam"
+        self.record_btn.draw_button()
+
+    def _recording_failed(self, recording, message):
+        """A recording could not be opened or written; it has already stopped"""
+        if self.recording is recording:
+            self.recording = None
+            self.record_btn.text = "⏺ Rekam"
+            self.record_btn.draw_button()
+        messagebox.showerror("Rekam", f"Rekaman dihentikan: {message}")
+
+    def _worker_failed(self, exc, source):
+        """Called on the worker when a command or step hook raised"""
+        message = str(exc)
+        self.root.after(0, lambda: self._show_worker_error(source, message))
+
+    def _show_worker_error(self, source, message):
+        recording = self.recording
+        if recording is not None and source in recording:
+            self._recording_failed(recording, message)
+        else:
+            messagebox.showerror("Simulasi", message)
+
+    def adapt_quality(self):
+        """Step the level of detail up or down from the last frame time"""
+        if not self.auto_quality:
+            return
+        if self.adaptive.observe(self.profiler.histogram("frame").last):
+            self.renderer.quality = self.adaptive.current
+            self.update_quality_button()
+
+    def toggle_auto_quality(self):
+        """Turn the adaptive level of detail on or off (off = full quality)"""
+        self.auto_quality = not self.auto_quality
+        self.adaptive.reset()
+        self.renderer.quality = self.adaptive.current
+        self.update_quality_button()
+        if self.system is not None and not self.is_running and self.player is None:
+            self.draw_frame(self.render_state)
+
+    def update_quality_button(self):
+        if not self.auto_quality:
+            self.quality_btn.text = "⚙ Kualitas: penuh (manual)"
+        elif self.adaptive.level == 0:
+            self.quality_btn.text = "⚙ Kualitas Auto: penuh"
+        else:
+            self.quality_btn.text = f"⚙ Kualitas Auto: level {self.adaptive.level}"
+        self.quality_btn.draw_button()
+
+    def toggle_overlay(self):
+        """Show or hide the FPS / frame budget overlay"""
+        self.show_overlay = not self.show_overlay
+        self.overlay_btn.text = "✓ Profil" if self.show_overlay else "✗ Profil"
+        self.overlay_btn.draw_button()
+        if self.show_overlay:
+            self.overlay.draw()
+        else:
+            self.overlay.clear()
+
+    def export_profile(self):
+        """Save the per-phase frame time percentiles as JSON"""
+        path = filedialog.asksaveasfilename(
+            title="Ekspor Waktu Frame",
+            defaultextension=".json",
+            filetypes=[("JSON", "*.json")]
+        )
+        if not path:
+            return
+        try:
+            self.profiler.export(path)
+        except OSError as exc:
+            messagebox.showerror("Ekspor Waktu", f"Gagal menyimpan:\n{exc}")
+
+    def toggle_render_mode(self):
+        """Switch between the vector look and the raster backend"""
+        self.renderer.clear()
+        if self.render_mode == "vector":
+            self.render_mode = "raster"
+            self.renderer = RasterRenderer(self.canvas)
+            self.mode_btn.text = "🖼 Raster"
+        else:
+            self.render_mode = "vector"
+            self.renderer = CanvasRenderer(self.canvas)
+            self.mode_btn.text = "🖼 Vektor"
+        self.mode_btn.draw_button()
+        self.renderer.profiler = self.profiler
+        self.renderer.quality = self.adaptive.current if self.auto_quality else FULL_QUALITY
+
+        if self.player is not None:
+            self.draw_frame(self.player)
+        elif self.system is not None and not self.is_running:
+            self.draw_frame(self.render_state)
 
     def init_particles(self):
         self.canvas.update()
@@ -598,75 +1249,184 @@ dengan molekul fluida di sekitarnya.
         height = self.canvas.winfo_height()
 
         if width < 2 or height < 2:
-            self.root.after(100, self.init_particles)
+            self.root.after(10, self.init_particles)
             return
 
-        self.particles = []
-        for _ in range(self.num_particles):
-            self.particles.append(Particle(width, height))
+        # A recording belongs to one population
+        self.stop_recording()
 
-        self.particles_label.config(text=str(len(self.particles)))
+        self.system = ParticleSystem(
+            width, height, self.num_particles, seed=self.seed,
+            trail_length=self.trail_length
+        )
+        # Trails are recorded on the render side from published snapshots
+        self.system.record_trails = False
+        self.system.collisions = self.collisions
+        self.system.set_integrator(self.integrator, **self.langevin)
+        self.render_state.load(self.system, self.total_steps)
+
+        self.particles_label.config(text=str(self.system.count))
+
+        if not self.controls_built:
+            # Put the particles on screen before building the rest of the window
+            self.draw_frame(self.render_state)
+            self.startup.mark("first_frame")
+            self.root.after_idle(self.finish_startup)
+
+    def save_checkpoint(self):
+        path = filedialog.asksaveasfilename(
+            title="Simpan Checkpoint",
+            defaultextension=".brckpt",
+            filetypes=[("Checkpoint Brown", "*.brckpt")]
+        )
+        if path:
+            self.write_checkpoint(path)
 
-    def animate(self):
-        if not self.is_running:
+    def write_checkpoint(self, path, quiet=False):
+        """Capture the state between two steps, write the file off the Tk thread
+
+        Only one write runs at a time; while one is in flight another
+        save is skipped, with a notice unless `quiet` (autosave).
+        """
+        if self.system is None:
+            return
+        from brownian.checkpoint import CheckpointWriter, capture
+
+        if self.checkpoint_writer is None:
+            self.checkpoint_writer = CheckpointWriter(on_error=self._checkpoint_failed)
+        writer = self.checkpoint_writer
+        if writer.busy:
+            if not quiet:
+                self._checkpoint_busy()
+            return
+        self.debouncer.flush()
+        system = self.system
+        simulation = self.simulation
+        total_steps = self.total_steps
+
+        # Trails live in the render state; copy them here on the Tk thread
+        trails = TrailBuffer(self.render_state.count, self.render_state.trail_length,
+                             self.render_state.dtype)
+        if self.show_trails:
+            trails.load(self.render_state.trails.to_array())
+        settings = {
+            "show_trails": self.show_trails,
+            "warp": self.warp,
+            "render_mode": self.render_mode,
+        }
+
+        def command():
+            step = simulation.steps if simulation is not None else total_steps
+            if trails.count != system.count:
+                trails.clear()
+            checkpoint = capture(system, step, self.speed, trails=trails, **settings)
+            if not writer.write(checkpoint, path) and not quiet:
+                self.root.after(0, self._checkpoint_busy)
+
+        self.run_on_worker(command)
+
+    def _checkpoint_busy(self):
+        messagebox.showinfo("Simpan Checkpoint",
+                            "Penyimpanan sebelumnya masih berjalan, coba lagi sebentar lagi.")
+
+    def _checkpoint_failed(self, exc):
+        """Called on the writer thread; the dialog is shown from the Tk loop"""
+        message = str(exc)
+        self.root.after(0, lambda: messagebox.showerror("Simpan Checkpoint", message))
+
+    def autosave(self):
+        """Periodic checkpoint for long unattended runs"""
+        if self.system is not None and self.player is None:
+            self.write_checkpoint(self.autosave_path, quiet=True)
+        self.root.after(self.autosave_interval(), self.autosave)
+
+    def autosave_interval(self):
+        """Autosave period in ms, never 0 so it cannot run every event-loop tick"""
+        return max(1, round(self.autosave_every * 1000))
+
+    def open_checkpoint(self):
+        path = filedialog.askopenfilename(
+            title="Muat Checkpoint",
+            filetypes=[("Checkpoint Brown", "*.brckpt")]
+        )
+        if path:
+            self.restore_checkpoint(path)
+
+    def restore_checkpoint(self, path):
+        """Replace the current run with a saved one, paused at its saved step"""
+        from brownian.checkpoint import load_checkpoint
+        try:
+            system, header = load_checkpoint(path)
+        except (OSError, ValueError, KeyError) as e:
+            messagebox.showerror("Muat Checkpoint", str(e))
             return
 
-        # Clear canvas with fade effect
-        self.canvas.delete("all")
+        self.close_replay()
+        self.stop_recording()
+        if self.is_running:
+            self.toggle_simulation()
+        self.debouncer.cancel()
+        self.renderer.clear()
+        self.analytics.reset()
+        self.density.reset()
+        self.profiler.reset()
+
+        # Trails move to the render side, like a freshly built system
+        points = system.trails.to_array() if system.trails.size else None
+        system.record_trails = False
+        system.reset_trails(system.count)
+        self.system = system
+        self.total_steps = header["step"]
+        settings = header.get("settings", {})
+
+        self.num_particles = system.count
+        self.set_particle_slider(system.count)
+        self.speed = header["speed"]
+        self.speed_slider.set(self.speed)
+        self.warp = settings.get("warp", 1)
+        self.warp_slider.set(MAX_WARP_EXPONENT + 1 if self.warp == FAST_AS_POSSIBLE
+                             else int(math.log2(self.warp)))
+        self.trail_length = system.trail_length
+        self.trail_slider.set(self.trail_length)
+        self.render_state.set_trail_length(self.trail_length)
+        if settings.get("show_trails", True) != self.show_trails:
+            self.toggle_trails()
+        if settings.get("render_mode", self.render_mode) != self.render_mode:
+            self.toggle_render_mode()
+
+        self.collisions = system.collisions
+        self.collision_btn.text = "✓ Tumbukan" if self.collisions else "✗ Tumbukan"
+        self.collision_btn.draw_button()
+        self.integrator = system.integrator
+        self.langevin = {"temperature": system.temperature, "friction": system.friction,
+                         "dt": system.dt}
+        self.model_btn.text = "〜 Langevin" if self.integrator == "langevin" else "〜 Klasik"
+        self.model_btn.draw_button()
+
+        self.render_state.load(system, self.total_steps)
+        if points is not None and len(points) == system.count:
+            self.render_state.load_trails(points)
+        self.particles_label.config(text=str(system.count))
+        self.steps_label.config(text=str(self.total_steps))
+        self.draw_frame(self.render_state)
 
-        # Draw grid (subtle)
-        width = self.canvas.winfo_width()
-        height = self.canvas.winfo_height()
+    def animate(self):
+        self.profiler.begin_frame()
 
-        grid_size = 50
-        for i in range(0, width, grid_size):
-            self.canvas.create_line(i, 0, i, height, fill="#1a1a2e", width=1)
-        for i in range(0, height, grid_size):
-            self.canvas.create_line(0, i, width, i, fill="#1a1a2e", width=1)
-
-        # Update and draw particles
-        for particle in self.particles:
-            particle.update(self.speed)
-
-            # Draw trail with gradient effect
-            if self.show_trails and len(particle.trail) > 1:
-                for i in range(len(particle.trail) - 1):
-                    x1, y1 = particle.trail[i]
-                    x2, y2 = particle.trail[i + 1]
-                    alpha_factor = i / len(particle.trail)
-
-                    self.canvas.create_line(
-                        x1, y1, x2, y2,
-                        fill=particle.color,
-                        width=2,
-                        stipple="gray50" if alpha_factor < 0.5 else ""
-                    )
-
-            # Draw particle with glow effect
-            glow_radius = particle.radius + 4
-            self.canvas.create_oval(
-                particle.x - glow_radius,
-                particle.y - glow_radius,
-                particle.x + glow_radius,
-                particle.y + glow_radius,
-                fill=particle.color,
-                outline="",
-                stipple="gray25"
-            )
+        # Physics runs on its own thread; take its latest snapshot
+        with self.profiler.phase("snapshot"):
+            self.total_steps = self.simulation.read(self.render_state, self.interpolate)
+        self.draw_frame(self.render_state)
 
-            # Main particle
-            self.canvas.create_oval(
-                particle.x - particle.radius,
-                particle.y - particle.radius,
-                particle.x + particle.radius,
-                particle.y + particle.radius,
-                fill=particle.color,
-                outline="white",
-                width=1
-            )
+        # Update statistics, a few times per second is plenty for text
+        if self.stats_throttle.ready():
+            with self.profiler.phase("stats"):
+                self.update_stats()
+
+        self.profiler.end_frame()
+        self.adapt_quality()
 
-        # Update statistics
-        self.total_steps += 1
+    def update_stats(self):
         self.steps_label.config(text=str(self.total_steps))
 
         if self.start_time:
@@ -678,10 +1438,196 @@ dengan molekul fluida di sekitarnya.
             else:
                 self.runtime_label.config(text=f"{seconds}s")
 
-        # Continue animation (60 FPS)
-        self.root.after(16, self.animate)
+        self.update_physics_stats()
+
+    def draw_frame(self, state):
+        """Draw a particle state (live or replayed) with the active renderer"""
+        # Draw grid (subtle), only redrawn when the canvas is resized
+        with self.profiler.phase("grid"):
+            width = self.canvas.winfo_width()
+            height = self.canvas.winfo_height()
+            self.renderer.draw_grid(width, height)
+
+        # Occupancy heatmap under the live particles, refreshed a few times per second
+        if self.show_density and state is self.render_state:
+            if self.renderer.underlay is None or self.density_throttle.ready():
+                with self.profiler.phase("density"):
+                    self.renderer.set_underlay(self.density.image(), self.density.cell)
+        elif self.renderer.underlay is not None:
+            self.renderer.set_underlay(None, self.density.cell)
+
+        # Move the existing canvas items to the new positions
+        self.renderer.draw(state, self.show_trails)
+
+        # Let Tk repaint now so the frame time includes the canvas redraw
+        with self.profiler.phase("paint"):
+            self.canvas.update_idletasks()
+
+        if self.show_overlay:
+            with self.profiler.phase("overlay"):
+                self.overlay.draw()
+
+    def open_replay(self):
+        """Load a recorded trajectory and play it back on the canvas"""
+        path = filedialog.askopenfilename(
+            title="Buka Rekaman",
+            filetypes=[("Trajektori Brown", "*.brtraj")]
+        )
+        if not path:
+            return
+        from brownian.trajectory import TrajectoryReader
+        from brownian.replay import TrajectoryPlayer
+        try:
+            reader = TrajectoryReader(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Putar Ulang", str(e))
+            return
+
+        if self.is_running:
+            self.toggle_simulation()
+        self.close_replay()
+
+        self.player = TrajectoryPlayer(reader, self.trail_length)
+        self.player.record_trails = self.show_trails
+        self.particles_label.config(text=str(self.player.count))
+        self.show_replay_controls()
+        self.last_replay_time = time.perf_counter()
+        self.replay_frames.start()
+
+    def show_replay_controls(self):
+        from brownian.replay import MIN_RATE, MAX_RATE
+        win = tk.Toplevel(self.root)
+        win.title("🎞 Putar Ulang")
+        win.configure(bg="#2d3748")
+        win.resizable(False, False)
+        win.protocol("WM_DELETE_WINDOW", self.close_replay)
+        self.replay_window = win
+
+        inner = tk.Frame(win, bg="#2d3748")
+        inner.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
+
+        # Frame scrubber
+        self.create_slider_control(
+            inner,
+            "🎞 Frame",
+            0, self.player.frames - 1, 0,
+            self.seek_replay,
+            "replay_frame"
+        )
+        self.replay_frame_slider.config(length=420)
+
+        # Playback rate on a log scale, 0.1x to 100x
+        self.create_slider_control(
+            inner,
+            "⏩ Kecepatan Putar",
+            0, 1, 1,
+            self.update_replay_rate,
+            "replay_rate"
+        )
+        self.replay_rate_slider.config(
+            from_=math.log10(MIN_RATE), to=math.log10(MAX_RATE), resolution=0.05
+        )
+        self.replay_rate_slider.set(0)
+
+        self.replay_play_btn = ModernButton(
+            inner,
+            text="⏸ Jeda",
+            command=self.toggle_replay,
+            bg_color="#667eea",
+            hover_color="#5568d3",
+            width=420,
+            height=45
+        )
+        self.replay_play_btn.pack()
+
+    def seek_replay(self, value):
+        if self.player is None:
+            return
+        index = int(float(value))
+        self.replay_frame_value_label.config(text=str(index))
+        if index != self.player.frame_index:
+            self.player.seek(index)
+            self.draw_frame(self.player)
+
+    def update_replay_rate(self, value):
+        rate = 10 ** float(value)
+        self.replay_rate_value_label.config(text=f"{rate:.1f}x")
+        if self.player is not None:
+            self.player.set_rate(rate)
+
+    def toggle_replay(self):
+        if self.player is None:
+            return
+        if not self.player.playing and self.player.frame_index == self.player.frames - 1:
+            self.player.seek(0)
+        self.player.playing = not self.player.playing
+        self.replay_play_btn.text = "⏸ Jeda" if self.player.playing else "▶ Putar"
+        self.replay_play_btn.draw_button()
+
+    def animate_replay(self):
+        now = time.perf_counter()
+        was_playing = self.player.playing
+        self.profiler.begin_frame()
+        self.player.advance(now - self.last_replay_time)
+        self.last_replay_time = now
+        if was_playing and not self.player.playing:
+            self.replay_play_btn.text = "▶ Putar"
+            self.replay_play_btn.draw_button()
+
+        self.draw_frame(self.player)
+        self.replay_frame_slider.set(self.player.frame_index)
+        if self.stats_throttle.ready():
+            self.steps_label.config(text=str(self.player.step))
+        self.profiler.end_frame()
+        self.adapt_quality()
+
+    def close_replay(self):
+        """Leave replay mode and show the live simulation again"""
+        self.replay_frames.stop()
+        if self.replay_window is not None:
+            self.replay_window.destroy()
+            self.replay_window = None
+        if self.player is None:
+            return
+        self.player = None
+        self.renderer.clear()
+        if self.system is not None:
+            self.particles_label.config(text=str(self.system.count))
+            self.steps_label.config(text=str(self.total_steps))
+            self.draw_frame(self.render_state)
+
+    def update_physics_stats(self):
+        """Show the live diffusion coefficient and mean speed"""
+        diffusion = self.analytics.diffusion_coefficient(msd_fraction=FIT_MSD_FRACTION)
+        if diffusion is not None:
+            self.diffusion_label.config(text=f"{diffusion:.2f}")
+        if self.analytics.msd is not None and self.analytics.speed.n:
+            self.mean_speed_label.config(text=f"{self.analytics.speed.mean:.2f}")
 
 def main():
+    from brownian.headless import positive
+
+    parser = argparse.ArgumentParser(description="Simulasi Gerak Brown")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed acak untuk simulasi yang bisa diulang")
+    parser.add_argument("--profile-log", default=None,
+                        help="tulis waktu tiap frame ke file JSON Lines")
+    parser.add_argument("--resume", default=None,
+                        help="lanjutkan dari file checkpoint .brckpt")
+    parser.add_argument("--autosave", default=None,
+                        help="simpan checkpoint otomatis ke file ini")
+    parser.add_argument("--autosave-every", type=positive(float), default=60,
+                        help="detik antar checkpoint otomatis")
+    parser.add_argument("--no-splash", action="store_true",
+                        help="langsung ke simulasi tanpa layar pembuka")
+    parser.add_argument("--startup-report", default=None,
+                        help="tulis waktu startup sebagai JSON ke file ini ('-' = stdout)")
+    parser.add_argument("--exit-after-startup", action="store_true",
+                        help="keluar setelah frame pertama (untuk mengukur startup)")
+    args = parser.parse_args()
+
+    startup = StartupTimer(origin=LAUNCHED)
+    startup.mark("imports")
     root = tk.Tk()
 
     # Try to set app icon (optional)
@@ -690,8 +1636,15 @@ def main():
     except:
         pass
 
-    app = BrownianMotionSimulator(root)
+    app = BrownianMotionSimulator(root, seed=args.seed, profile_log=args.profile_log,
+                                 resume=args.resume, autosave=args.autosave,
+                                 autosave_every=args.autosave_every,
+                                 splash=not args.no_splash, startup=startup,
+                                 startup_report=args.startup_report,
+                                 exit_after_startup=args.exit_after_startup)
     root.mainloop()
+    if app.profile_sink is not None:
+        app.profile_sink.close()
 
 if __name__ == "__main__":
     main()
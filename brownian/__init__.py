@@ -0,0 +1,7 @@
+"""
+Brownian motion simulation core
+Physics, renderers and tools shared by the GUI and headless modes
+
+No module here imports Tkinter at import time; renderers receive an
+existing canvas from the caller.
+"""
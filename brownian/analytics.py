@@ -0,0 +1,220 @@
+"""
+Live analytics
+Streaming physics metrics updated with O(1) work per step
+
+Mean squared displacement and velocity autocorrelation use multi-tau
+correlators: level l keeps the last m samples taken every 2**l steps,
+so lags up to m * 2**(levels-1) are covered with a fixed amount of
+memory. Speeds go into a fixed histogram and a Welford accumulator.
+Metrics are computed on at most `max_tracked` particles, which keeps
+the cost flat for 10^5+ particle systems.
+"""
+
+import threading
+
+import numpy as np
+
+MAX_TRACKED = 4096
+CORRELATOR_POINTS = 16
+CORRELATOR_LEVELS = 16
+SPEED_BINS = 50
+# The MSD fit ends where MSD reaches this fraction of width² + height²;
+# beyond it the walls flatten the curve and D would drift toward 0
+FIT_MSD_FRACTION = 0.01
+
+
+class MultiTauCorrelator:
+    """Multi-tau estimator of <f(a(t), a(t + lag))> averaged over particles
+
+    `kind` is "msd" for |a(t + lag) - a(t)|² or "dot" for a(t)·a(t + lag).
+    Coarser levels sample (not average) the signal, so MSD stays unbiased.
+    """
+
+    def __init__(self, count, kind="msd", points=CORRELATOR_POINTS,
+                 levels=CORRELATOR_LEVELS, dtype=np.float32):
+        if points % 2:
+            raise ValueError("points must be even")
+        self.kind = kind
+        self.points = points
+        self.levels = levels
+        self.history = np.zeros((levels, points, count, 2), dtype=dtype)
+        self.filled = np.zeros(levels, dtype=np.int64)
+        self.head = np.zeros(levels, dtype=np.int64)
+        self.sums = np.zeros((levels, points))
+        self.counts = np.zeros((levels, points), dtype=np.int64)
+        self.ticks = 0
+
+    def push(self, a, b):
+        """Add one sample per particle, components a and b"""
+        self.ticks += 1
+        for level in range(self.levels):
+            if level and self.ticks % (1 << level):
+                break
+            self._push_level(level, a, b)
+
+    def _push_level(self, level, a, b):
+        points = self.points
+        ring = self.history[level]
+        head = self.head[level]
+        ring[head, :, 0] = a
+        ring[head, :, 1] = b
+        newest = ring[head]
+        self.filled[level] = min(self.filled[level] + 1, points)
+        self.head[level] = (head + 1) % points
+
+        # Level 0 covers lags 1..m-1, higher levels only m/2..m-1 of their
+        # own stride, the rest is already covered more finely below
+        first = 1 if level == 0 else points // 2
+        for lag in range(first, int(self.filled[level])):
+            older = ring[(head - lag) % points]
+            if self.kind == "msd":
+                diff = newest - older
+                value = float(np.einsum("ij,ij->", diff, diff, dtype=np.float64))
+            else:
+                value = float(np.einsum("ij,ij->", newest, older, dtype=np.float64))
+            self.sums[level, lag] += value / len(newest)
+            self.counts[level, lag] += 1
+
+    def result(self):
+        """Lags (in samples) and averaged values where data exists"""
+        lags, values = [], []
+        for level in range(self.levels):
+            first = 1 if level == 0 else self.points // 2
+            for lag in range(first, self.points):
+                if self.counts[level, lag]:
+                    lags.append(lag << level)
+                    values.append(self.sums[level, lag] / self.counts[level, lag])
+        return np.array(lags, dtype=np.int64), np.array(values)
+
+
+class WelfordAccumulator:
+    """Running mean and variance, merged batch by batch (Chan et al.)"""
+
+    def __init__(self):
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add_batch(self, values):
+        count = len(values)
+        if count == 0:
+            return
+        mean = float(values.mean())
+        m2 = float(((values - mean) ** 2).sum())
+        total = self.n + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.n * count / total
+        self.n = total
+
+    @property
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self):
+        return self.variance ** 0.5
+
+
+class LiveAnalytics:
+    """MSD, diffusion coefficient, VACF and speed distribution of a running system
+
+    Usable as a SimulationThread step hook: analytics(system, step).
+    """
+
+    def __init__(self, max_tracked=MAX_TRACKED, points=CORRELATOR_POINTS,
+                 levels=CORRELATOR_LEVELS, speed_bins=SPEED_BINS, max_speed=10.0):
+        self.max_tracked = max_tracked
+        self.points = points
+        self.levels = levels
+        self.speed_bins = speed_bins
+        self.max_speed = max_speed
+        self._lock = threading.Lock()
+        self._source = None
+        self.msd = None
+        self.vacf = None
+        self.box_span = 0.0
+
+    def reset(self, count=0):
+        with self._lock:
+            self._reset(count)
+
+    def _reset(self, count):
+        tracked = min(count, self.max_tracked)
+        self.tracked = tracked
+        self.msd = MultiTauCorrelator(tracked, "msd", self.points, self.levels)
+        self.vacf = MultiTauCorrelator(tracked, "dot", self.points, self.levels)
+        self.speed = WelfordAccumulator()
+        self.speed_hist = np.zeros(self.speed_bins, dtype=np.int64)
+        self.steps = 0
+
+    def __call__(self, system, step):
+        self.update(system)
+
+    def update(self, system):
+        """Feed the current state, call once per simulation step"""
+        # Only the first max_tracked particles are followed, so growing a
+        # population past that keeps the accumulated statistics
+        source = (id(system), system.generation, min(system.count, self.max_tracked))
+        with self._lock:
+            if source != self._source:
+                self._source = source
+                self._reset(system.count)
+            self.box_span = system.width ** 2 + system.height ** 2
+            k = self.tracked
+            if k == 0:
+                return
+            self.steps += 1
+            self.msd.push(system.x[:k], system.y[:k])
+            self.vacf.push(system.vx[:k], system.vy[:k])
+
+            speed = np.hypot(system.vx[:k], system.vy[:k])
+            self.speed.add_batch(speed)
+            bins = (speed * (self.speed_bins / self.max_speed)).astype(np.intp)
+            np.minimum(bins, self.speed_bins - 1, out=bins)
+            self.speed_hist += np.bincount(bins, minlength=self.speed_bins)
+
+    def msd_curve(self):
+        """(lag in steps, mean squared displacement)"""
+        with self._lock:
+            if self.msd is None:
+                return np.empty(0, dtype=np.int64), np.empty(0)
+            return self.msd.result()
+
+    def vacf_curve(self):
+        """(lag in steps, velocity autocorrelation <v(t)·v(t+lag)>)"""
+        with self._lock:
+            if self.vacf is None:
+                return np.empty(0, dtype=np.int64), np.empty(0)
+            return self.vacf.result()
+
+    def diffusion_coefficient(self, fit_min=10, fit_max=None, msd_fraction=FIT_MSD_FRACTION):
+        """D from a least-squares fit MSD = 4 D lag + c over [fit_min, fit_max]
+
+        With `msd_fraction` the window also stops at the first lag whose
+        MSD exceeds msd_fraction * (width² + height²), which keeps a long
+        run in a bounded box inside the diffusive regime. Returns None
+        until at least two lags fall inside the fit window.
+        """
+        lags, values = self.msd_curve()
+        window = lags >= fit_min
+        if fit_max is not None:
+            window &= lags <= fit_max
+        if msd_fraction is not None and self.box_span:
+            window &= np.logical_and.accumulate(values <= msd_fraction * self.box_span)
+        if window.sum() < 2:
+            return None
+        slope, _ = np.polyfit(lags[window].astype(np.float64), values[window], 1)
+        return slope / 4.0
+
+    def speed_distribution(self):
+        """(bin edges, normalized density) of particle speeds"""
+        with self._lock:
+            if self.msd is None:
+                return np.linspace(0, self.max_speed, self.speed_bins + 1), np.zeros(self.speed_bins)
+            hist = self.speed_hist.astype(np.float64)
+        edges = np.linspace(0, self.max_speed, self.speed_bins + 1)
+        total = hist.sum()
+        if total:
+            hist /= total * (edges[1] - edges[0])
+        return edges, hist
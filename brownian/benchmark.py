@@ -0,0 +1,381 @@
+"""
+Benchmarks
+Stepping, trail and rendering throughput, with regression checks
+
+    python -m brownian.benchmark -o bench.json
+    python -m brownian.benchmark --baseline bench.json   # exit 1 on regression
+
+Physics cases run anywhere. Render and startup cases need a Tk display
+(use xvfb-run on a server) and are skipped with a note when Tk cannot
+start. The startup case launches the GUI with --no-splash and reports
+its time to first frame. The step_parallel cases step 10^6 particles on
+1, 2, 4 ... CPUs and report the speedup over one worker process.
+Every case reports the median seconds per operation, which is what the
+baseline comparison uses, plus the peak traced memory of a short
+untimed pass.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from .engine import Particle, ParticleSystem
+from .parallel import ParallelStepper
+from .trails import TRAIL_LENGTH
+
+STEP_COUNTS = (10, 100, 1_000, 10_000, 100_000, 1_000_000)
+SCALAR_COUNTS = (10, 100, 1_000)
+RENDER_COUNTS = (100, 1_000, 10_000)
+# Trails cost N x TRAIL_LENGTH x 2 floats; 10^6 particles would need ~0.5 GB
+MAX_TRAIL_PARTICLES = 100_000
+PARALLEL_COUNT = 1_000_000
+MIN_TIME = 0.5
+MIN_ROUNDS = 5
+TOLERANCE = 0.25
+SEED = 12345
+WIDTH = 800
+HEIGHT = 600
+STARTUP_ROUNDS = 5
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "brown-move.py")
+
+
+def measure(operation, min_time=MIN_TIME, min_rounds=MIN_ROUNDS):
+    """Per-call durations of `operation` over at least `min_time` seconds"""
+    durations = []
+    deadline = time.perf_counter() + min_time
+    while len(durations) < min_rounds or time.perf_counter() < deadline:
+        start = time.perf_counter()
+        operation()
+        durations.append(time.perf_counter() - start)
+    return np.asarray(durations)
+
+
+def peak_memory(setup, operation, rounds=3):
+    """Peak bytes allocated while building and running a case a few times"""
+    tracemalloc.start()
+    try:
+        state = setup()
+        for _ in range(rounds):
+            operation(state)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def result(case, params, durations, peak_bytes, **extra):
+    entry = {
+        "case": case,
+        "params": params,
+        "rounds": len(durations),
+        "seconds": float(np.median(durations)),
+        "p95_seconds": float(np.percentile(durations, 95)),
+        "peak_bytes": int(peak_bytes),
+    }
+    entry.update(extra)
+    return entry
+
+
+def new_system(count, trails=False, dtype=np.float64):
+    system = ParticleSystem(WIDTH, HEIGHT, count, dtype=dtype, seed=SEED)
+    system.record_trails = trails
+    return system
+
+
+def bench_step(count, trails=False, dtype=np.float64, min_time=MIN_TIME):
+    """Vectorized ParticleSystem.step, optionally recording trails"""
+    system = new_system(count, trails, dtype)
+    system.step(3)
+    durations = measure(lambda: system.step(3), min_time)
+    peak = peak_memory(lambda: new_system(count, trails, dtype),
+                       lambda s: s.step(3))
+    seconds = float(np.median(durations))
+    case = f"step[n={count},trails={'on' if trails else 'off'},{np.dtype(dtype).name}]"
+    return result(case, {"particles": count, "trails": trails, "dtype": np.dtype(dtype).name},
+                  durations, peak, steps_per_s=1 / seconds,
+                  particle_steps_per_s=count / seconds)
+
+
+def bench_parallel(count, processes, min_time=MIN_TIME):
+    """ParallelStepper.step over shared memory with `processes` workers"""
+    system = new_system(count)
+    with ParallelStepper(system, processes) as stepper:
+        stepper.step(3)
+        durations = measure(lambda: stepper.step(3), min_time)
+    seconds = float(np.median(durations))
+    return result(f"step_parallel[n={count},p={processes}]",
+                  {"particles": count, "processes": processes}, durations, 0,
+                  steps_per_s=1 / seconds, particle_steps_per_s=count / seconds)
+
+
+def parallel_counts(cpus=None):
+    """1, 2, 4 ... up to the number of CPUs"""
+    cpus = cpus or os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cpus:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cpus:
+        counts.append(cpus)
+    return counts
+
+
+def bench_particle_update(count, min_time=MIN_TIME):
+    """The scalar per-particle path, one Particle.update call per particle"""
+    def setup():
+        system = new_system(count, trails=True)
+        return [Particle(WIDTH, HEIGHT, system, index) for index in range(count)]
+
+    def run(particles):
+        for particle in particles:
+            particle.update(3)
+
+    particles = setup()
+    durations = measure(lambda: run(particles), min_time)
+    peak = peak_memory(setup, run, rounds=1)
+    seconds = float(np.median(durations))
+    return result(f"particle_update[n={count}]", {"particles": count}, durations, peak,
+                  steps_per_s=1 / seconds, particle_steps_per_s=count / seconds)
+
+
+def open_canvas():
+    """A mapped Tk canvas, or (None, reason) when no display is available"""
+    try:
+        import tkinter as tk
+        root = tk.Tk()
+    except Exception as exc:  # ImportError or TclError without a display
+        return None, str(exc)
+    root.geometry(f"{WIDTH}x{HEIGHT}")
+    canvas = tk.Canvas(root, width=WIDTH, height=HEIGHT, highlightthickness=0)
+    canvas.pack()
+    root.update()
+    return canvas, None
+
+
+def bench_render(canvas, renderer_cls, count, show_trails, min_time=MIN_TIME):
+    """One frame of `renderer_cls` including Tk's own redraw"""
+    system = new_system(count, trails=True)
+    for _ in range(TRAIL_LENGTH):
+        system.step(3)
+    renderer = renderer_cls(canvas)
+    renderer.draw_grid(WIDTH, HEIGHT)
+
+    def frame():
+        renderer.draw(system, show_trails)
+        canvas.update_idletasks()
+
+    def operation():
+        system.step(3)
+        start = time.perf_counter()
+        frame()
+        return time.perf_counter() - start
+
+    frame()
+    durations = []
+    deadline = time.perf_counter() + min_time
+    while len(durations) < MIN_ROUNDS or time.perf_counter() < deadline:
+        durations.append(operation())
+    durations = np.asarray(durations)
+    items = len(canvas.find_all())
+
+    peak = peak_memory(lambda: None, lambda _: operation())
+    renderer.clear()
+    canvas.delete("all")
+    name = renderer_cls.__name__.replace("Renderer", "").lower()
+    case = f"render[{name},n={count},trails={'on' if show_trails else 'off'}]"
+    seconds = float(np.median(durations))
+    return result(case, {"renderer": name, "particles": count, "trails": show_trails},
+                  durations, peak, frames_per_s=1 / seconds, canvas_items=items)
+
+
+def bench_startup(rounds=STARTUP_ROUNDS, app=APP):
+    """Launch to first frame of the GUI, one fresh process per round"""
+    durations = []
+    marks = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "startup.json")
+        for _ in range(rounds):
+            subprocess.run([sys.executable, app, "--no-splash", "--exit-after-startup",
+                            "--startup-report", path],
+                           check=True, capture_output=True, timeout=60)
+            with open(path) as f:
+                report = json.load(f)
+            durations.append(report["marks_ms"]["first_frame"] / 1e3)
+            for name, ms in report["marks_ms"].items():
+                marks.setdefault(name, []).append(ms)
+    durations = np.asarray(durations)
+    return result("startup[first_frame]", {"rounds": rounds}, durations, 0,
+                  budget_ms=report["budget_ms"],
+                  within_budget=bool(np.median(durations) * 1e3 <= report["budget_ms"]),
+                  marks_ms={name: float(np.median(ms)) for name, ms in marks.items()})
+
+
+def environment():
+    info = {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    try:
+        import resource
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        scale = 1 if sys.platform == "darwin" else 1024
+        info["max_rss_bytes"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+    except ImportError:
+        pass
+    return info
+
+
+def run_suite(step_counts=STEP_COUNTS, scalar_counts=SCALAR_COUNTS,
+              render_counts=RENDER_COUNTS, render=True, startup=True, parallel=True,
+              min_time=MIN_TIME, progress=None):
+    """Run every case, returns {"environment", "results", "skipped"}"""
+    results = []
+    skipped = []
+
+    def add(entry):
+        results.append(entry)
+        if progress is not None:
+            progress(entry)
+
+    for count in step_counts:
+        add(bench_step(count, min_time=min_time))
+        add(bench_step(count, dtype=np.float32, min_time=min_time))
+        if count <= MAX_TRAIL_PARTICLES:
+            add(bench_step(count, trails=True, min_time=min_time))
+    for count in scalar_counts:
+        add(bench_particle_update(count, min_time=min_time))
+    if parallel:
+        base = None
+        for processes in parallel_counts():
+            entry = bench_parallel(PARALLEL_COUNT, processes, min_time=min_time)
+            base = base or entry["seconds"]
+            entry["speedup"] = base / entry["seconds"]
+            add(entry)
+
+    if render and render_counts:
+        canvas, reason = open_canvas()
+        if canvas is None:
+            skipped.append({"case": "render", "reason": reason})
+        else:
+            from .rendering import CanvasRenderer, RasterRenderer
+            try:
+                for renderer_cls in (CanvasRenderer, RasterRenderer):
+                    for count in render_counts:
+                        for show_trails in (False, True):
+                            add(bench_render(canvas, renderer_cls, count, show_trails,
+                                             min_time=min_time))
+            finally:
+                canvas.winfo_toplevel().destroy()
+
+    if startup:
+        try:
+            add(bench_startup())
+        except (OSError, subprocess.SubprocessError, KeyError, ValueError) as exc:
+            stderr = getattr(exc, "stderr", None)
+            reason = stderr.decode(errors="replace").strip().splitlines()[-1] if stderr else str(exc)
+            skipped.append({"case": "startup", "reason": reason})
+
+    return {"environment": environment(), "results": results, "skipped": skipped}
+
+
+def compare(report, baseline, tolerance=TOLERANCE):
+    """Cases slower than the baseline by more than `tolerance` (a fraction)"""
+    previous = {entry["case"]: entry for entry in baseline.get("results", [])}
+    regressions = []
+    for entry in report["results"]:
+        old = previous.get(entry["case"])
+        if old is None or old["seconds"] <= 0:
+            continue
+        ratio = entry["seconds"] / old["seconds"]
+        if ratio > 1 + tolerance:
+            regressions.append({
+                "case": entry["case"],
+                "baseline_seconds": old["seconds"],
+                "seconds": entry["seconds"],
+                "ratio": ratio,
+            })
+    return regressions
+
+
+def format_entry(entry):
+    rate = entry.get("frames_per_s", entry.get("steps_per_s", 1 / entry["seconds"]))
+    text = (f"{entry['case']:<44} {entry['seconds'] * 1e3:10.3f} ms"
+            f" {rate:12.1f}/s {entry['peak_bytes'] / 2**20:9.1f} MiB")
+    if "speedup" in entry:
+        text += f" x{entry['speedup']:.2f}"
+    if "canvas_items" in entry:
+        text += f" {entry['canvas_items']:7d} items"
+    return text
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m brownian.benchmark",
+        description="Benchmark simulasi Gerak Brown"
+    )
+    parser.add_argument("--counts", type=int, nargs="+", default=list(STEP_COUNTS),
+                        help="particle counts for the stepping cases")
+    parser.add_argument("--scalar-counts", type=int, nargs="+", default=list(SCALAR_COUNTS),
+                        help="particle counts for the Particle.update cases")
+    parser.add_argument("--render-counts", type=int, nargs="+", default=list(RENDER_COUNTS),
+                        help="particle counts for the render cases")
+    parser.add_argument("--no-render", action="store_true", help="skip the Tk render cases")
+    parser.add_argument("--no-startup", action="store_true", help="skip the GUI startup case")
+    parser.add_argument("--no-parallel", action="store_true",
+                        help="skip the multi-process stepping cases")
+    parser.add_argument("--min-time", type=float, default=MIN_TIME,
+                        help="seconds spent measuring each case")
+    parser.add_argument("-o", "--output", help="write results as JSON")
+    parser.add_argument("--baseline", help="JSON from an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="allowed slowdown before a case counts as a regression")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    def progress(entry):
+        print(format_entry(entry), file=sys.stderr, flush=True)
+
+    report = run_suite(args.counts, args.scalar_counts, args.render_counts,
+                       render=not args.no_render, startup=not args.no_startup,
+                       parallel=not args.no_parallel,
+                       min_time=args.min_time,
+                       progress=progress)
+    for skip in report["skipped"]:
+        print(f"skipped {skip['case']}: {skip['reason']}", file=sys.stderr)
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        report["regressions"] = compare(report, baseline, args.tolerance)
+        for regression in report["regressions"]:
+            print(f"REGRESSION {regression['case']}: "
+                  f"{regression['baseline_seconds'] * 1e3:.3f} ms -> "
+                  f"{regression['seconds'] * 1e3:.3f} ms (x{regression['ratio']:.2f})",
+                  file=sys.stderr)
+        status = 1 if report["regressions"] else 0
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+Checkpoints
+Save and restore the complete state of a simulation
+
+Layout of a .brckpt file:
+
+    8 bytes   magic b"BRWNCKP1"
+    4 bytes   little-endian header length H
+    H bytes   JSON header (settings, step, RNG state, array table)
+    arrays    raw little-endian arrays, each 64-byte aligned
+
+Loading maps the file and copies each array straight into the pooled
+particle stores, so restoring a large run costs about one memcpy. State
+is captured on the thread that owns the system (a few array copies) and
+written on another, so stepping never waits on the disk.
+"""
+
+import json
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+from .engine import KICK, WALL_DAMPING, ParticleSystem
+from .rng import BlockRandom
+from .trajectory import _aligned
+
+MAGIC = b"BRWNCKP1"
+FIELDS = ("x", "y", "vx", "vy", "radius", "color_index")
+
+
+class Checkpoint:
+    """In-memory copy of a system's state, ready to be written"""
+
+    def __init__(self, header, arrays):
+        self.header = header
+        self.arrays = arrays
+
+    def write(self, path):
+        """Write atomically: a crash mid-write leaves the old checkpoint intact"""
+        header = dict(self.header)
+        arrays = [(name, np.ascontiguousarray(a, dtype=a.dtype.newbyteorder("<")))
+                  for name, a in self.arrays.items()]
+        table = {name: {"dtype": a.dtype.str, "shape": list(a.shape)} for name, a in arrays}
+        header["arrays"] = table
+
+        # Offsets depend on the header size, iterate until they are stable
+        while True:
+            blob = json.dumps(header).encode("utf-8")
+            offset = _aligned(len(MAGIC) + 4 + len(blob))
+            stable = True
+            for name, a in arrays:
+                if table[name].get("offset") != offset:
+                    table[name]["offset"] = offset
+                    stable = False
+                offset = _aligned(offset + a.nbytes)
+            if stable:
+                break
+
+        partial = path + ".part"
+        with open(partial, "wb") as f:
+            f.write(MAGIC)
+            f.write(struct.pack("<I", len(blob)))
+            f.write(blob)
+            for name, a in arrays:
+                f.write(b"\0" * (table[name]["offset"] - f.tell()))
+                f.write(memoryview(a).cast("B"))
+        os.replace(partial, path)
+
+
+def capture(system, step=0, speed=3, trails=None, **settings):
+    """Copy everything needed to resume `system`; call on its owning thread
+
+    `trails` overrides the system's own trail buffer (the GUI records
+    trails on the render side). Extra keyword settings are stored as-is
+    and come back from load_checkpoint().
+    """
+    trails = system.trails if trails is None else trails
+    arrays = {name: getattr(system, name).copy() for name in FIELDS}
+    if trails.size:
+        arrays["trails"] = trails.to_array()
+    header = {
+        "version": 1,
+        "particles": system.count,
+        "dtype": system.dtype.str,
+        "width": system.width,
+        "height": system.height,
+        "step": step,
+        "speed": speed,
+        "trail_length": trails.length,
+        "record_trails": system.record_trails,
+        "collisions": system.collisions,
+        "integrator": system.integrator,
+        "temperature": system.temperature,
+        "friction": system.friction,
+        "dt": system.dt,
+        "kick": system.kick,
+        "wall_damping": system.wall_damping,
+        "batches": system.batches,
+        "random": system.random.get_state(),
+        "rng": system.rng.bit_generator.state,
+        "settings": settings,
+        "saved_at": time.time(),
+    }
+    return Checkpoint(header, arrays)
+
+
+def save_checkpoint(path, system, step=0, speed=3, trails=None, **settings):
+    capture(system, step, speed, trails, **settings).write(path)
+
+
+def read_checkpoint_header(path):
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a checkpoint file")
+        (length,) = struct.unpack("<I", f.read(4))
+        return json.loads(f.read(length).decode("utf-8"))
+
+
+def load_checkpoint(path):
+    """Rebuild the saved system, returns (system, header)
+
+    header["step"], header["speed"] and header["settings"] hold the run
+    settings; the saved trails are loaded into system.trails.
+    """
+    header = read_checkpoint_header(path)
+    random = BlockRandom.from_state(header["random"])
+    system = ParticleSystem(header["width"], header["height"], 0,
+                            dtype=np.dtype(header["dtype"]), seed=random.base,
+                            trail_length=header["trail_length"])
+    system.random = random
+    system.rng.bit_generator.state = header["rng"]
+    system.set_integrator(header["integrator"], temperature=header["temperature"],
+                          friction=header["friction"], dt=header["dt"])
+    system.collisions = header["collisions"]
+    system.kick = header.get("kick", KICK)
+    system.wall_damping = header.get("wall_damping", WALL_DAMPING)
+    system.record_trails = header["record_trails"]
+    system.batches = header["batches"]
+
+    system.allocate(header["particles"])
+    table = header["arrays"]
+    for name in FIELDS:
+        np.copyto(getattr(system, name), _map(path, table[name]))
+    if "trails" in table and table["trails"]["shape"][0] == system.count:
+        system.load_trails(_map(path, table["trails"]))
+    return system, header
+
+
+def _map(path, entry):
+    return np.memmap(path, dtype=np.dtype(entry["dtype"]), mode="r",
+                     offset=entry["offset"], shape=tuple(entry["shape"]))
+
+
+class CheckpointWriter:
+    """Writes checkpoints on a background thread, one at a time
+
+    A write asked for while the previous one is still running is skipped
+    rather than queued, so two writes never share the same ".part" file.
+    Write errors go to `on_error(exc)` when set, otherwise they are kept
+    and raised from the next write() or close().
+    """
+
+    def __init__(self, on_error=None):
+        self.on_error = on_error
+        self.error = None
+        self._thread = None
+
+    @property
+    def busy(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def write(self, checkpoint, path):
+        """Start writing `checkpoint`, returns False if a write is in flight"""
+        if self.busy:
+            return False
+        self._raise()
+        self._thread = threading.Thread(target=self._write, args=(checkpoint, path),
+                                        name="brownian-ckpt", daemon=True)
+        self._thread.start()
+        return True
+
+    def _write(self, checkpoint, path):
+        try:
+            checkpoint.write(path)
+        except Exception as exc:
+            if self.on_error is None:
+                self.error = exc
+            else:
+                self.on_error(exc)
+
+    def _raise(self):
+        error, self.error = self.error, None
+        if error is not None:
+            raise error
+
+    def close(self):
+        """Wait for a write in flight"""
+        if self._thread is not None:
+            self._thread.join()
+        self._raise()
+
+
+class Autosaver:
+    """Step hook writing a checkpoint every `every_steps` steps
+
+    The state is captured inside the hook, between two steps; the file
+    is written on a background thread. If the previous write is still
+    running the checkpoint is skipped rather than queued. A failed write
+    is raised from the next save() or from close().
+    """
+
+    def __init__(self, path, every_steps=1000, speed=3, settings=None):
+        self.path = path
+        self.every_steps = every_steps
+        self.speed = speed
+        self.settings = settings or {}
+        self.saved = 0
+        self._writer = CheckpointWriter()
+
+    def __call__(self, system, step):
+        if step % self.every_steps == 0:
+            self.save(system, step)
+
+    def save(self, system, step):
+        if self._writer.busy:
+            return False
+        self._writer.write(capture(system, step, self.speed, **self.settings), self.path)
+        self.saved += 1
+        return True
+
+    def close(self):
+        """Wait for a write in flight, raises the error of a failed one"""
+        self._writer.close()
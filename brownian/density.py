@@ -0,0 +1,140 @@
+"""
+Occupancy density
+Visit counts of every canvas grid cell, accumulated step by step
+
+Each step bins all particle positions at once (one bincount over flat
+cell indices) into a fixed grid, so memory and per-step cost depend on
+the particle count and grid size only, never on how long the run is.
+The counts can be drawn as a color-mapped heatmap under the particles
+and exported as a 2D histogram.
+"""
+
+import threading
+
+import numpy as np
+
+from .rendering import BACKGROUND, GRID_SIZE, hex_to_rgb
+
+# Color stops of the heatmap, from an empty cell to the most visited one
+HEAT_STOPS = (BACKGROUND, "#3b0f70", "#8c2981", "#de4968", "#fe9f6d", "#fcfdbf")
+HEAT_LEVELS = 256
+
+
+def heat_palette(stops=HEAT_STOPS, levels=HEAT_LEVELS):
+    """(levels, 3) uint8 lookup table interpolated between `stops`"""
+    rgb = np.array([hex_to_rgb(c) for c in stops], dtype=np.float64)
+    at = np.linspace(0, 1, len(stops))
+    t = np.linspace(0, 1, levels)
+    table = np.column_stack([np.interp(t, at, rgb[:, i]) for i in range(3)])
+    return np.rint(table).astype(np.uint8)
+
+
+class OccupancyGrid:
+    """2D histogram of particle positions over `cell`-pixel grid cells
+
+    Usable as a SimulationThread step hook: grid(system, step). While
+    `active` is False the hook does nothing, so it can stay attached.
+    """
+
+    def __init__(self, cell=GRID_SIZE):
+        self.cell = cell
+        self.active = True
+        self.palette = heat_palette()
+        self._lock = threading.Lock()
+        self._source = None
+        self.width = self.height = 0
+        self.counts = np.zeros((0, 0), dtype=np.int64)
+        self.steps = 0
+        self.visits = 0
+        self._ix = np.empty(0, dtype=np.intp)
+        self._iy = np.empty(0, dtype=np.intp)
+
+    @property
+    def shape(self):
+        """(rows, cols) of the grid"""
+        return self.counts.shape
+
+    def reset(self):
+        with self._lock:
+            self._source = None
+            self.counts = np.zeros((0, 0), dtype=np.int64)
+            self.steps = 0
+            self.visits = 0
+
+    def _reset(self, width, height):
+        self.width, self.height = width, height
+        rows = max(1, -(-int(height) // self.cell))
+        cols = max(1, -(-int(width) // self.cell))
+        self.counts = np.zeros((rows, cols), dtype=np.int64)
+        self.steps = 0
+        self.visits = 0
+
+    def __call__(self, system, step):
+        if self.active:
+            self.update(system)
+
+    def update(self, system):
+        """Add the current positions, call once per simulation step"""
+        # A count change keeps the histogram, a new population or box does not
+        source = (id(system), system.generation, system.width, system.height)
+        with self._lock:
+            if source != self._source:
+                self._source = source
+                self._reset(system.width, system.height)
+            count = system.count
+            if count == 0:
+                return
+            if len(self._ix) < count:
+                self._ix = np.empty(count, dtype=np.intp)
+                self._iy = np.empty(count, dtype=np.intp)
+            ix, iy = self._ix[:count], self._iy[:count]
+            rows, cols = self.counts.shape
+
+            # Truncating the scaled positions is floor() inside the box
+            scale = 1.0 / self.cell
+            np.copyto(ix, system.x * scale, casting="unsafe")
+            np.copyto(iy, system.y * scale, casting="unsafe")
+            np.clip(ix, 0, cols - 1, out=ix)
+            np.clip(iy, 0, rows - 1, out=iy)
+            iy *= cols
+            iy += ix
+            self.counts += np.bincount(iy, minlength=rows * cols).reshape(rows, cols)
+            self.steps += 1
+            self.visits += count
+
+    def histogram(self):
+        """Copy of the visit counts, shape (rows, cols)"""
+        with self._lock:
+            return self.counts.copy()
+
+    def density(self):
+        """Fraction of all visits per px², integrates to 1 over the box"""
+        counts = self.histogram().astype(np.float64)
+        total = counts.sum()
+        if total:
+            counts /= total * self.cell * self.cell
+        return counts
+
+    def image(self):
+        """(rows, cols, 3) uint8 heatmap, log-scaled against the busiest cell"""
+        counts = self.histogram()
+        levels = len(self.palette) - 1
+        peak = counts.max() if counts.size else 0
+        if peak == 0:
+            return self.palette[np.zeros(counts.shape, dtype=np.intp)]
+        scaled = np.log1p(counts) * (levels / np.log1p(peak))
+        return self.palette[scaled.astype(np.intp)]
+
+    def export(self, path):
+        """Write the histogram as .npz (with grid metadata) or .csv (counts only)"""
+        with self._lock:
+            counts = self.counts.copy()
+            steps, visits = self.steps, self.visits
+        if path.endswith(".csv"):
+            np.savetxt(path, counts, fmt="%d", delimiter=",")
+        else:
+            rows, cols = counts.shape
+            np.savez(path, counts=counts, cell=self.cell,
+                     x_edges=np.minimum(np.arange(cols + 1) * self.cell, self.width),
+                     y_edges=np.minimum(np.arange(rows + 1) * self.cell, self.height),
+                     steps=steps, visits=visits)
@@ -0,0 +1,419 @@
+"""
+Vectorized particle engine
+Struct-of-arrays state for the Brownian motion simulator
+
+Every particle lives in one slot of a set of contiguous NumPy arrays
+(x, y, vx, vy, radius, color index), so a whole frame is stepped with a
+handful of batched array operations instead of one Python call per
+particle.
+"""
+
+import numpy as np
+
+from .collisions import resolve_collisions
+from .langevin import DT, FRICTION, TEMPERATURE, ou_coefficients
+from .rng import STREAM_INIT, STREAM_MISC, BlockRandom
+from .trails import TRAIL_LENGTH, TrailHistory
+
+COLORS = [
+    '#FF6B6B', '#4ECDC4', '#45B7D1', '#FFA07A',
+    '#98D8C8', '#F7DC6F', '#BB8FCE', '#85C1E2',
+    '#FF9FF3', '#54A0FF', '#48DBFB', '#1DD1A1'
+]
+
+KICK = 0.5
+WALL_DAMPING = 0.8
+
+# "classic": random kick plus a hard speed clamp, one step per frame
+# "langevin": exact Ornstein-Uhlenbeck update with temperature, friction, dt
+INTEGRATORS = ("classic", "langevin")
+
+# Per-particle arrays, all views into one pooled store per field
+FIELDS = ("x", "y", "vx", "vy", "radius", "color_index")
+SCRATCH = ("_tmp", "_hi", "_low_mask", "_high_mask")
+MIN_CAPACITY = 64
+
+
+class ParticleSystem(TrailHistory):
+    """All particles of one simulation, stepped together"""
+
+    def __init__(self, width, height, count=0, dtype=np.float64, seed=None,
+                 trail_length=TRAIL_LENGTH):
+        self.width = float(width)
+        self.height = float(height)
+        self.dtype = np.dtype(dtype)
+        if self.dtype not in (np.float32, np.float64):
+            raise ValueError("dtype must be float32 or float64")
+        # Batched, block-partitioned streams: reproducible from `seed`
+        # however the particles are later split across workers
+        self.random = BlockRandom(seed)
+        self.seed = self.random.entropy
+        # Generator for scalar code paths such as Particle.update
+        self.rng = self.random.stream(STREAM_MISC, 0)
+        self.record_trails = True
+        self.trail_length = trail_length
+        self.collisions = False
+        self.last_collisions = 0
+        # Classic model: kick amplitude and speed kept when bouncing off a wall
+        self.kick = KICK
+        self.wall_damping = WALL_DAMPING
+        # Particle-wall contacts (per axis) in the last step
+        self.last_wall_hits = 0
+        self.integrator = "classic"
+        self.set_langevin()
+        # Bumped whenever the particle population is replaced
+        self.generation = 0
+        # Spawn batches so far; keys the init streams of added particles
+        self.batches = 0
+        # Global slot of x[0]; non-zero for a shard of a larger system
+        self.offset = 0
+        self.capacity = 0
+        self._store = {}
+        self.spawn(count)
+
+    @property
+    def count(self):
+        return len(self.x)
+
+    def __len__(self):
+        return self.count
+
+    def spawn(self, count):
+        """Replace all particles with `count` fresh random ones"""
+        self._bind(0)
+        self.reset_trails(0)
+        self.generation += 1
+        self.resize(count)
+
+    def resize(self, count):
+        """Add or remove particles at the end, the others keep their state
+
+        Slots come from pooled stores that grow geometrically and never
+        shrink, so dragging the count back and forth does not reallocate.
+        The population generation is unchanged; renderers and analytics
+        see a count change instead of a new population.
+        """
+        count = int(count)
+        if count < 0:
+            raise ValueError("count must be >= 0")
+        old = self.count
+        if count == old:
+            return
+        self._reserve(count)
+        self._bind(count)
+        if count > old:
+            self._init_slots(old, count)
+        self.resize_trails(count)
+
+    def allocate(self, count):
+        """Set the particle count without initialising new slots, for loaders"""
+        self._reserve(count)
+        self._bind(count)
+        self.reset_trails(count)
+
+    def attach(self, arrays, offset=0):
+        """Step caller-owned arrays in place, e.g. views of shared memory
+
+        `arrays` maps every name in FIELDS to an array of the same length.
+        `offset` is the global slot of their first element, so a shard
+        draws its kicks from the same block streams as the whole system
+        would. Growing the system later moves it back to private stores.
+        """
+        count = len(arrays["x"])
+        store = {name: arrays[name] for name in FIELDS}
+        for name in SCRATCH:
+            store[name] = np.empty(count, dtype=bool if "mask" in name else self.dtype)
+        self._store = store
+        self.capacity = count
+        self.offset = offset
+        self._bind(count)
+        if self.trails.count != count:
+            self.reset_trails(count)
+
+    def _reserve(self, count):
+        if count <= self.capacity:
+            return
+        capacity = max(count, 2 * self.capacity, MIN_CAPACITY)
+        kept = self.count
+        store = {}
+        for name in FIELDS:
+            dtype = np.uint8 if name == "color_index" else self.dtype
+            store[name] = np.empty(capacity, dtype=dtype)
+            if kept:
+                store[name][:kept] = self._store[name][:kept]
+        # Scratch buffers reused every step so stepping never allocates
+        for name in SCRATCH:
+            store[name] = np.empty(capacity, dtype=bool if "mask" in name else self.dtype)
+        self._store = store
+        self.capacity = capacity
+
+    def _bind(self, count):
+        store = self._store
+        for name in FIELDS + SCRATCH:
+            if name in store:
+                setattr(self, name, store[name][:count])
+            else:
+                dtype = np.uint8 if name == "color_index" else bool if "mask" in name else self.dtype
+                setattr(self, name, np.empty(0, dtype=dtype))
+
+    def _init_slots(self, first, last):
+        """Fresh random particles in slots [first, last)
+
+        Each spawn batch and block has its own init stream, so the values
+        depend only on the seed and the sequence of count changes.
+        """
+        batch = self.batches
+        self.batches += 1
+        for block, start, stop in self.random.spans(first, last):
+            rng = self.random.stream(STREAM_INIT, block, batch)
+            n = stop - start
+            self.x[start:stop] = rng.uniform(30, self.width - 30, n)
+            self.y[start:stop] = rng.uniform(30, self.height - 30, n)
+            self.vx[start:stop] = rng.uniform(-2, 2, n)
+            self.vy[start:stop] = rng.uniform(-2, 2, n)
+            self.radius[start:stop] = rng.uniform(4, 7, n)
+            self.color_index[start:stop] = rng.integers(0, len(COLORS), n)
+
+    def set_langevin(self, temperature=TEMPERATURE, friction=FRICTION, dt=DT):
+        """Parameters of the "langevin" integrator, validated up front"""
+        self._ou = ou_coefficients(temperature, friction, dt)
+        self.temperature = float(temperature)
+        self.friction = float(friction)
+        self.dt = float(dt)
+
+    def set_integrator(self, integrator, **params):
+        if integrator not in INTEGRATORS:
+            raise ValueError(f"integrator must be one of {INTEGRATORS}")
+        if params:
+            self.set_langevin(**params)
+        self.integrator = integrator
+
+    @property
+    def time_step(self):
+        """Simulated time per step; a classic step is one time unit"""
+        return self.dt if self.integrator == "langevin" else 1.0
+
+    def resize_box(self, width, height):
+        self.width = float(width)
+        self.height = float(height)
+
+    def colors(self):
+        """Hex color string of every particle"""
+        return [COLORS[i] for i in self.color_index.tolist()]
+
+    def step(self, speed):
+        """Advance every particle by one step, same rules as Particle.update
+
+        `speed` only sets the velocity clamp of the classic integrator.
+        """
+        if self.count == 0:
+            return
+        if self.integrator == "langevin":
+            self._step_langevin()
+        else:
+            self._step_classic(speed)
+
+        # Optional elastic collisions between particles
+        if self.collisions:
+            self.last_collisions = resolve_collisions(self)
+
+        if self.integrator == "langevin":
+            # Mirror at the walls without damping, keeps the equilibrium intact
+            self.last_wall_hits = (self._reflect(self.x, self.vx, self.width)
+                                   + self._reflect(self.y, self.vy, self.height))
+        else:
+            # Bounce off walls with damping
+            self.last_wall_hits = (self._bounce(self.x, self.vx, self.width)
+                                   + self._bounce(self.y, self.vy, self.height))
+
+        # Update trail
+        self.record_trail()
+
+    def _step_classic(self, speed):
+        vx, vy, tmp = self.vx, self.vy, self._tmp
+        kick = self.kick
+
+        # Brownian motion: random walk, kicks drawn per block in one batch
+        self.random.fill_uniform(tmp, self.offset)
+        tmp -= 0.5
+        tmp *= 2 * kick
+        vx += tmp
+        self.random.fill_uniform(tmp, self.offset)
+        tmp -= 0.5
+        tmp *= 2 * kick
+        vy += tmp
+
+        # Limit speed: scale = max_speed / max(current, max_speed)
+        max_speed = speed * 0.5
+        np.hypot(vx, vy, out=tmp)
+        np.maximum(tmp, max(max_speed, np.finfo(self.dtype).tiny), out=tmp)
+        np.divide(max_speed, tmp, out=tmp)
+        vx *= tmp
+        vy *= tmp
+
+        # Update position
+        self.x += vx
+        self.y += vy
+
+    def _step_langevin(self):
+        decay, drift, sigma_v, coupling, sigma_x = self._ou
+        tmp, scratch = self._tmp, self._hi
+        for pos, vel in ((self.x, self.vx), (self.y, self.vy)):
+            # Mean: x + drift * v, decay * v
+            np.multiply(vel, drift, out=scratch)
+            pos += scratch
+            vel *= decay
+            # Correlated noise: n1 drives both, n2 only the position
+            self.random.fill_normal(tmp, self.offset)
+            np.multiply(tmp, coupling, out=scratch)
+            pos += scratch
+            np.multiply(tmp, sigma_v, out=scratch)
+            vel += scratch
+            self.random.fill_normal(tmp, self.offset)
+            tmp *= sigma_x
+            pos += tmp
+
+    def _bounce(self, pos, vel, extent):
+        radius, hi = self.radius, self._hi
+        low, high = self._low_mask, self._high_mask
+        np.subtract(extent, radius, out=hi)
+        np.less(pos, radius, out=low)
+        np.greater(pos, hi, out=high)
+        np.logical_or(low, high, out=low)
+        np.multiply(vel, -self.wall_damping, out=vel, where=low)
+        np.minimum(pos, hi, out=pos)
+        np.maximum(pos, radius, out=pos)
+        return int(np.count_nonzero(low))
+
+    def _reflect(self, pos, vel, extent):
+        radius, hi, tmp = self.radius, self._hi, self._tmp
+        low, high = self._low_mask, self._high_mask
+        np.subtract(extent, radius, out=hi)
+        np.less(pos, radius, out=low)
+        np.greater(pos, hi, out=high)
+        # pos -> 2 * wall - pos, velocity flipped
+        np.subtract(radius, pos, out=tmp)
+        tmp += radius
+        np.copyto(pos, tmp, where=low)
+        np.subtract(hi, pos, out=tmp)
+        tmp += hi
+        np.copyto(pos, tmp, where=high)
+        np.logical_or(low, high, out=low)
+        np.negative(vel, out=vel, where=low)
+        # A jump longer than the box is still clamped inside it
+        np.minimum(pos, hi, out=pos)
+        np.maximum(pos, radius, out=pos)
+        return int(np.count_nonzero(low))
+
+    def view(self, index):
+        return Particle(self.width, self.height, system=self, index=index)
+
+
+def _field(name):
+    def getter(self):
+        return float(getattr(self.system, name)[self.index])
+
+    def setter(self, value):
+        getattr(self.system, name)[self.index] = value
+
+    return property(getter, setter)
+
+
+def _mirror(pos, vel, low, high):
+    if pos < low:
+        pos, vel = 2 * low - pos, -vel
+    elif pos > high:
+        pos, vel = 2 * high - pos, -vel
+    return max(low, min(pos, high)), vel
+
+
+class Particle:
+    """Thin view of one slot of a ParticleSystem, kept for compatibility"""
+
+    x = _field("x")
+    y = _field("y")
+    vx = _field("vx")
+    vy = _field("vy")
+    radius = _field("radius")
+
+    def __init__(self, canvas_width, canvas_height, system=None, index=0):
+        if system is None:
+            system = ParticleSystem(canvas_width, canvas_height, 1)
+            index = 0
+        self.system = system
+        self.index = index
+
+    @property
+    def canvas_width(self):
+        return self.system.width
+
+    @property
+    def canvas_height(self):
+        return self.system.height
+
+    @property
+    def color(self):
+        return COLORS[self.system.color_index[self.index]]
+
+    @property
+    def trail(self):
+        """Copy of this particle's trail as (x, y) tuples, oldest first"""
+        return self.system.trails.points(self.index)
+
+    def update(self, speed):
+        """Step only this particle (scalar path, use ParticleSystem.step for batches)"""
+        if self.system.integrator == "langevin":
+            self._update_langevin()
+            return
+        rng = self.system.rng
+        kick = self.system.kick
+
+        # Brownian motion: random walk
+        vx = self.vx + rng.uniform(-kick, kick)
+        vy = self.vy + rng.uniform(-kick, kick)
+
+        # Limit speed
+        max_speed = speed * 0.5
+        current_speed = (vx**2 + vy**2) ** 0.5
+        if current_speed > max_speed:
+            vx = (vx / current_speed) * max_speed
+            vy = (vy / current_speed) * max_speed
+
+        # Update position
+        x = self.x + vx
+        y = self.y + vy
+
+        # Bounce off walls with damping
+        radius = self.radius
+        if x < radius or x > self.canvas_width - radius:
+            vx *= -self.system.wall_damping
+            x = max(radius, min(x, self.canvas_width - radius))
+
+        if y < radius or y > self.canvas_height - radius:
+            vy *= -self.system.wall_damping
+            y = max(radius, min(y, self.canvas_height - radius))
+
+        self.x, self.y, self.vx, self.vy = x, y, vx, vy
+
+        # Update trail; the ring buffer has one head shared by all particles,
+        # so a single view can only advance it when it owns the whole system
+        if self.system.count == 1:
+            self.system.record_trail()
+
+    def _update_langevin(self):
+        system = self.system
+        decay, drift, sigma_v, coupling, sigma_x = system._ou
+        n = system.rng.standard_normal(4)
+        x = self.x + drift * self.vx + coupling * n[0] + sigma_x * n[1]
+        y = self.y + drift * self.vy + coupling * n[2] + sigma_x * n[3]
+        vx = decay * self.vx + sigma_v * n[0]
+        vy = decay * self.vy + sigma_v * n[2]
+
+        # Mirror at the walls
+        radius = self.radius
+        x, vx = _mirror(x, vx, radius, self.canvas_width - radius)
+        y, vy = _mirror(y, vy, radius, self.canvas_height - radius)
+
+        self.x, self.y, self.vx, self.vy = x, y, vx, vy
+        if system.count == 1:
+            system.record_trail()
@@ -0,0 +1,181 @@
+"""
+Ensemble runner
+Many independent replicas of the particle dynamics across a process pool
+
+Every replica gets its own spawned seed, runs headless in a worker
+process and sends back only compact statistics (an MSD curve, final
+position and displacement histograms). The parent folds those into
+running accumulators as they arrive, so its memory does not grow with
+the number of replicas and no trajectory is ever held.
+
+    python -m brownian.ensemble --replicas 256 --particles 200 --steps 2000
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+from .engine import INTEGRATORS, ParticleSystem
+from .langevin import DT, FRICTION, TEMPERATURE
+
+
+def run_replica(task):
+    """Simulate one replica in a worker process, returns its statistics"""
+    (index, seed, num_particles, width, height, speed, steps,
+     sample_every, bins, model) = task
+    system = ParticleSystem(width, height, num_particles, seed=seed)
+    system.set_integrator(**model)
+    system.record_trails = False
+    x0 = system.x.astype(np.float64)
+    y0 = system.y.astype(np.float64)
+
+    msd = np.empty(steps // sample_every, dtype=np.float64)
+    for step in range(1, steps + 1):
+        system.step(speed)
+        if step % sample_every == 0:
+            dx = system.x - x0
+            dy = system.y - y0
+            msd[step // sample_every - 1] = (dx * dx + dy * dy).mean()
+
+    dx = system.x - x0
+    dy = system.y - y0
+    position_hist, _, _ = np.histogram2d(
+        system.x, system.y, bins=bins, range=[[0, width], [0, height]]
+    )
+    displacement_hist, _, _ = np.histogram2d(
+        dx, dy, bins=bins, range=[[-width, width], [-height, height]]
+    )
+    return {
+        "index": index,
+        "msd": msd,
+        "position_hist": position_hist,
+        "displacement_hist": displacement_hist,
+        "mean_speed": float(np.hypot(system.vx, system.vy).mean()),
+    }
+
+
+class EnsembleStats:
+    """Streaming merge of replica results (Welford mean/variance of the MSD)"""
+
+    def __init__(self, samples, bins):
+        self.replicas = 0
+        self.msd_mean = np.zeros(samples)
+        self.msd_m2 = np.zeros(samples)
+        self.position_hist = np.zeros((bins, bins))
+        self.displacement_hist = np.zeros((bins, bins))
+        self.speed_mean = 0.0
+
+    def add(self, result):
+        self.replicas += 1
+        n = self.replicas
+        delta = result["msd"] - self.msd_mean
+        self.msd_mean += delta / n
+        self.msd_m2 += delta * (result["msd"] - self.msd_mean)
+        self.position_hist += result["position_hist"]
+        self.displacement_hist += result["displacement_hist"]
+        self.speed_mean += (result["mean_speed"] - self.speed_mean) / n
+
+    @property
+    def msd_std(self):
+        if self.replicas < 2:
+            return np.zeros_like(self.msd_mean)
+        return np.sqrt(self.msd_m2 / (self.replicas - 1))
+
+    def summary(self, lags):
+        return {
+            "replicas": self.replicas,
+            "lags": lags.tolist(),
+            "msd_mean": self.msd_mean.tolist(),
+            "msd_std": self.msd_std.tolist(),
+            "mean_speed": self.speed_mean,
+        }
+
+
+def run_ensemble(replicas, num_particles=20, width=800, height=600, speed=3,
+                 steps=1000, seed=None, workers=None, sample_every=10, bins=50,
+                 progress=None, integrator="classic", temperature=TEMPERATURE,
+                 friction=FRICTION, dt=DT):
+    """Run `replicas` independent simulations on a process pool
+
+    Returns (EnsembleStats, lag steps of the MSD samples). `progress` is
+    called as progress(done, replicas) after each merged replica.
+    """
+    model = {"integrator": integrator, "temperature": temperature,
+             "friction": friction, "dt": dt}
+    if sample_every < 1 or steps < sample_every:
+        raise ValueError("steps must be at least sample_every (>= 1)")
+    seeds = np.random.SeedSequence(seed).spawn(replicas)
+    tasks = (
+        (index, seeds[index], num_particles, width, height, speed, steps, sample_every, bins,
+         model)
+        for index in range(replicas)
+    )
+    lags = np.arange(1, steps // sample_every + 1) * sample_every
+    stats = EnsembleStats(len(lags), bins)
+
+    workers = workers or os.cpu_count() or 1
+    with multiprocessing.Pool(workers) as pool:
+        for result in pool.imap_unordered(run_replica, tasks):
+            stats.add(result)
+            if progress is not None:
+                progress(stats.replicas, replicas)
+    return stats, lags
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m brownian.ensemble",
+        description="Ensemble banyak replika Gerak Brown di semua core"
+    )
+    parser.add_argument("-r", "--replicas", type=int, default=64)
+    parser.add_argument("-n", "--particles", type=int, default=20)
+    parser.add_argument("--width", type=float, default=800)
+    parser.add_argument("--height", type=float, default=600)
+    parser.add_argument("--speed", type=float, default=3)
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--sample-every", type=int, default=10)
+    parser.add_argument("--bins", type=int, default=50)
+    parser.add_argument("--integrator", choices=INTEGRATORS, default="classic")
+    parser.add_argument("--temperature", type=float, default=TEMPERATURE)
+    parser.add_argument("--friction", type=float, default=FRICTION)
+    parser.add_argument("--dt", type=float, default=DT)
+    parser.add_argument("-o", "--output", help="save histograms and MSD as .npz")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    start = time.perf_counter()
+
+    def progress(done, total):
+        print(f"\r{done}/{total} replika", end="", file=sys.stderr, flush=True)
+
+    stats, lags = run_ensemble(
+        args.replicas, args.particles, args.width, args.height, args.speed,
+        args.steps, args.seed, args.workers, args.sample_every, args.bins,
+        progress=progress, integrator=args.integrator, temperature=args.temperature,
+        friction=args.friction, dt=args.dt,
+    )
+    print(file=sys.stderr)
+
+    if args.output:
+        np.savez(args.output, lags=lags, msd_mean=stats.msd_mean, msd_std=stats.msd_std,
+                 position_hist=stats.position_hist,
+                 displacement_hist=stats.displacement_hist)
+
+    summary = stats.summary(lags)
+    summary["elapsed_s"] = time.perf_counter() - start
+    json.dump(summary, sys.stdout, indent=2)
+    sys.stdout.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
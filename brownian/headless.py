@@ -0,0 +1,235 @@
+"""
+Headless batch simulation
+Runs the particle dynamics without Tkinter, for display-less servers
+
+    python -m brownian.headless --particles 100000 --steps 1000 --seed 42
+    python -m brownian.headless --steps 100000 --checkpoint run.brckpt --checkpoint-every 5000
+    python -m brownian.headless --resume run.brckpt --steps 100000
+    python -m brownian.headless --particles 4000000 --steps 500 --processes 8
+    python -m brownian.headless --particles 5000 --steps 20000 --density occupancy.npz
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from .checkpoint import Autosaver, load_checkpoint, save_checkpoint
+from .density import OccupancyGrid
+from .engine import INTEGRATORS, KICK, WALL_DAMPING, ParticleSystem
+from .langevin import DT, FRICTION, TEMPERATURE
+from .parallel import ParallelStepper
+from .rendering import GRID_SIZE
+from .trajectory import TrajectoryRecorder
+
+
+def summarize(system, x0, y0, steps, elapsed):
+    """Summary statistics of a finished run"""
+    dx = system.x.astype(np.float64) - x0
+    dy = system.y.astype(np.float64) - y0
+    speed = np.hypot(system.vx, system.vy)
+    return {
+        "particles": system.count,
+        "width": system.width,
+        "height": system.height,
+        "steps": steps,
+        "elapsed_s": elapsed,
+        "steps_per_s": steps / elapsed if elapsed > 0 else float("inf"),
+        "particle_steps_per_s": steps * system.count / elapsed if elapsed > 0 else float("inf"),
+        "mean_x": float(system.x.mean()) if system.count else 0.0,
+        "mean_y": float(system.y.mean()) if system.count else 0.0,
+        "mean_speed": float(speed.mean()) if system.count else 0.0,
+        "msd": float((dx * dx + dy * dy).mean()) if system.count else 0.0,
+    }
+
+
+def run_headless(num_particles=20, width=800, height=600, speed=3, steps=1000,
+                 seed=None, dtype=np.float64, record=None, record_velocities=False,
+                 integrator="classic", temperature=TEMPERATURE, friction=FRICTION, dt=DT,
+                 resume=None, checkpoint=None, checkpoint_every=1000, processes=1,
+                 density=None, density_cell=GRID_SIZE, kick=KICK, wall_damping=WALL_DAMPING):
+    """Simulate without a display, returns (system, summary dict)
+
+    With `record` set to a path, every step is streamed to a trajectory file.
+    With `resume` the run continues from a checkpoint (its system, step
+    count and speed replace the other arguments) for `steps` more steps.
+    With `checkpoint` a checkpoint is written every `checkpoint_every`
+    steps and once more at the end. With `processes` > 1 the particles
+    are stepped in shards by that many worker processes; the result is
+    the same as with one. With `density` set to a path, the occupancy
+    histogram over `density_cell`-pixel cells is accumulated every step
+    and exported there (.npz or .csv) at the end.
+    """
+    if checkpoint and checkpoint_every < 1:
+        raise ValueError("checkpoint_every must be >= 1")
+    step0 = 0
+    if resume:
+        system, header = load_checkpoint(resume)
+        step0 = header["step"]
+        speed = header["speed"]
+    else:
+        system = ParticleSystem(width, height, num_particles, dtype=dtype, seed=seed)
+        system.set_integrator(integrator, temperature=temperature, friction=friction, dt=dt)
+        system.kick = kick
+        system.wall_damping = wall_damping
+        system.record_trails = False
+    x0 = system.x.astype(np.float64)
+    y0 = system.y.astype(np.float64)
+
+    recorder = None
+    if record:
+        recorder = TrajectoryRecorder(record, system, velocities=record_velocities,
+                                      dt=system.time_step, seed=system.seed, step0=step0)
+        recorder.record(system)
+    autosaver = Autosaver(checkpoint, checkpoint_every, speed) if checkpoint else None
+    grid = OccupancyGrid(density_cell) if density else None
+
+    start = time.perf_counter()
+    stepper = ParallelStepper(system, processes) if processes > 1 else None
+    try:
+        if stepper is not None and recorder is None and autosaver is None and grid is None:
+            # Nothing to do between steps, let the workers run the whole batch
+            stepper.step(speed, steps)
+        else:
+            advance = system.step if stepper is None else stepper.step
+            for step in range(step0 + 1, step0 + steps + 1):
+                advance(speed)
+                if recorder is not None:
+                    recorder.record(system)
+                if grid is not None:
+                    grid.update(system)
+                if autosaver is not None and step % checkpoint_every == 0:
+                    if stepper is not None:
+                        stepper.sync_random()
+                    autosaver.save(system, step)
+    except BaseException:
+        # Release workers and shared memory without hiding the original error
+        if stepper is not None:
+            stepper.abort()
+        raise
+    finally:
+        # Keeps the frames recorded so far, also when the run is interrupted
+        if recorder is not None:
+            recorder.close()
+    if stepper is not None:
+        stepper.close()
+    if autosaver is not None:
+        autosaver.close()
+        save_checkpoint(checkpoint, system, step0 + steps, speed)
+    if grid is not None:
+        grid.export(density)
+    elapsed = time.perf_counter() - start
+
+    summary = summarize(system, x0, y0, steps, elapsed)
+    summary["seed"] = system.seed
+    summary["step"] = step0 + steps
+    summary["processes"] = stepper.processes if stepper is not None else 1
+    summary["integrator"] = system.integrator
+    summary["simulated_time"] = steps * system.time_step
+    return system, summary
+
+
+def save_state(system, path):
+    """Write final particle state as .npz or .csv"""
+    if path.endswith(".csv"):
+        data = np.column_stack([system.x, system.y, system.vx, system.vy,
+                                system.radius, system.color_index])
+        np.savetxt(path, data, delimiter=",", comments="",
+                   header="x,y,vx,vy,radius,color_index")
+    else:
+        np.savez(path, x=system.x, y=system.y, vx=system.vx, vy=system.vy,
+                 radius=system.radius, color_index=system.color_index)
+
+
+def positive(type_=int):
+    """argparse type accepting only values > 0"""
+    def parse(text):
+        value = type_(text)
+        if not value > 0:
+            raise argparse.ArgumentTypeError(f"must be > 0, got {value}")
+        return value
+    return parse
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m brownian.headless",
+        description="Simulasi Gerak Brown tanpa GUI"
+    )
+    parser.add_argument("-n", "--particles", type=int, default=20)
+    parser.add_argument("--width", type=float, default=800)
+    parser.add_argument("--height", type=float, default=600)
+    parser.add_argument("--speed", type=float, default=3)
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--dtype", choices=["float32", "float64"], default="float64")
+    parser.add_argument("--integrator", choices=INTEGRATORS, default="classic")
+    parser.add_argument("--temperature", type=float, default=TEMPERATURE,
+                        help="kT for --integrator langevin")
+    parser.add_argument("--friction", type=float, default=FRICTION,
+                        help="friction rate gamma for --integrator langevin")
+    parser.add_argument("--dt", type=float, default=DT,
+                        help="time per step for --integrator langevin")
+    parser.add_argument("--kick", type=float, default=KICK,
+                        help="kick amplitude of --integrator classic")
+    parser.add_argument("--wall-damping", type=float, default=WALL_DAMPING,
+                        help="speed kept when bouncing off a wall (classic)")
+    parser.add_argument("-o", "--output", help="save final state (.npz or .csv)")
+    parser.add_argument("--record", help="stream every step to a .brtraj trajectory file")
+    parser.add_argument("--record-velocities", action="store_true",
+                        help="also record vx and vy")
+    parser.add_argument("--resume", help="continue from a .brckpt checkpoint")
+    parser.add_argument("--checkpoint", help="write a .brckpt checkpoint periodically")
+    parser.add_argument("--checkpoint-every", type=positive(), default=1000,
+                        help="steps between checkpoints (>= 1)")
+    parser.add_argument("-p", "--processes", type=int, default=1,
+                        help="step the particles in shards on this many processes")
+    parser.add_argument("--density", help="export the occupancy histogram (.npz or .csv)")
+    parser.add_argument("--density-cell", type=int, default=GRID_SIZE,
+                        help="histogram cell size in pixels")
+    parser.add_argument("--json", action="store_true", help="print summary as JSON")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    system, summary = run_headless(
+        num_particles=args.particles,
+        width=args.width,
+        height=args.height,
+        speed=args.speed,
+        steps=args.steps,
+        seed=args.seed,
+        dtype=args.dtype,
+        record=args.record,
+        record_velocities=args.record_velocities,
+        integrator=args.integrator,
+        temperature=args.temperature,
+        friction=args.friction,
+        dt=args.dt,
+        resume=args.resume,
+        checkpoint=args.checkpoint,
+        checkpoint_every=args.checkpoint_every,
+        processes=args.processes,
+        density=args.density,
+        density_cell=args.density_cell,
+        kick=args.kick,
+        wall_damping=args.wall_damping,
+    )
+
+    if args.output:
+        save_state(system, args.output)
+
+    if args.json:
+        json.dump(summary, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        for key, value in summary.items():
+            print(f"{key:>22}: {value:.6g}" if isinstance(value, float) else f"{key:>22}: {value}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
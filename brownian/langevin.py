@@ -0,0 +1,56 @@
+"""
+Langevin dynamics
+Exact Ornstein-Uhlenbeck update of velocity and position
+
+For dv = -gamma v dt + sqrt(2 gamma kT / m) dW, dx = v dt the joint change
+of (x, v) over a step dt is Gaussian with known mean and covariance
+(Gillespie 1996). Sampling it directly is exact for any dt: velocities
+relax to variance kT/m per axis and positions diffuse with
+D = kT / (m gamma), so long diffusion times need few, large steps.
+"""
+
+import math
+from collections import namedtuple
+
+TEMPERATURE = 1.0
+FRICTION = 0.5
+DT = 1.0
+
+# Below this gamma*dt the position variance is taken from its Taylor
+# series, the closed form loses most of its digits to cancellation
+SERIES_LIMIT = 0.05
+_SERIES = (2 / 3, -1 / 2, 7 / 30, -1 / 12, 31 / 1260, -1 / 160, 127 / 90720, -17 / 60480)
+
+OUCoefficients = namedtuple("OUCoefficients", "decay drift sigma_v coupling sigma_x")
+
+
+def ou_coefficients(temperature=TEMPERATURE, friction=FRICTION, dt=DT, mass=1.0):
+    """Coefficients of one exact step, shared by every particle
+
+        x' = x + drift * v + coupling * n1 + sigma_x * n2
+        v' = decay * v + sigma_v * n1
+
+    with n1, n2 independent standard normals.
+    """
+    if temperature < 0:
+        raise ValueError("temperature must be >= 0")
+    if friction <= 0 or dt <= 0 or mass <= 0:
+        raise ValueError("friction, dt and mass must be > 0")
+    h = friction * dt
+    tau = 1.0 / friction
+    variance = temperature / mass
+    a = -math.expm1(-h)  # 1 - exp(-h)
+
+    # 2h - (1 - mu)(3 - mu), mu = exp(-h)
+    if h < SERIES_LIMIT:
+        t = h ** 3 * sum(c * h ** k for k, c in enumerate(_SERIES))
+    else:
+        t = 2 * h - a * (2 + a)
+
+    var_v = variance * a * (2 - a)
+    cov_xv = variance * tau * a * a
+    var_x = variance * tau * tau * t
+    sigma_v = math.sqrt(var_v)
+    coupling = cov_xv / sigma_v if sigma_v > 0 else 0.0
+    sigma_x = math.sqrt(max(var_x - coupling * coupling, 0.0))
+    return OUCoefficients(1.0 - a, tau * a, sigma_v, coupling, sigma_x)
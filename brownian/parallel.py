@@ -0,0 +1,276 @@
+"""
+Parallel stepping
+One large ParticleSystem split into shards stepped by worker processes
+
+The particle arrays are moved into multiprocessing.shared_memory and the
+parent system is re-attached to them, so it keeps working as usual for
+rendering, recording or checkpoints, without copies. Every worker
+attaches a shard (a run of whole RNG blocks) and steps it in place.
+Parent and workers meet at a barrier before and after each batch of
+steps, so the parent only ever reads a complete state.
+
+Shards start on RNG_BLOCK boundaries and draw kicks from the same block
+streams as the single-process engine, so the trajectory for a seed is
+bit-identical whatever the number of processes.
+
+    with ParallelStepper(system, processes=8) as stepper:
+        for _ in range(1000):
+            stepper.step(3)
+"""
+
+import multiprocessing
+import multiprocessing.connection
+import os
+import threading
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .engine import FIELDS, ParticleSystem
+from .rng import BlockRandom
+
+_RUN = 0.0
+_SYNC = 1.0
+_STOP = 2.0
+
+
+def shard_bounds(count, processes, block):
+    """[(start, stop)] of at most `processes` shards made of whole blocks"""
+    blocks = -(-count // block)
+    processes = max(1, min(processes, blocks))
+    bounds = []
+    for index in range(processes):
+        first = index * blocks // processes * block
+        last = min((index + 1) * blocks // processes * block, count)
+        if last > first:
+            bounds.append((first, last))
+    return bounds
+
+
+def _attach_shared(layout, start=0, stop=None):
+    """Open the shared blocks, returns (handles, {field: view})"""
+    handles, arrays = [], {}
+    for name, (shm_name, dtype, count) in layout.items():
+        shm = shared_memory.SharedMemory(name=shm_name)
+        handles.append(shm)
+        arrays[name] = np.ndarray(count, dtype=dtype, buffer=shm.buf)[start:stop]
+    return handles, arrays
+
+
+def _shard_worker(layout, spec, start, stop, barrier, control, conn):
+    """Step particles [start, stop) in place whenever the parent says so"""
+    handles = []
+    try:
+        handles, arrays = _attach_shared(layout, start, stop)
+        shard = ParticleSystem(spec["width"], spec["height"], 0, dtype=spec["dtype"])
+        shard.random = BlockRandom.from_state(spec["random"])
+        shard.set_integrator(spec["integrator"], temperature=spec["temperature"],
+                             friction=spec["friction"], dt=spec["dt"])
+        shard.kick = spec["kick"]
+        shard.wall_damping = spec["wall_damping"]
+        shard.record_trails = False
+        shard.attach(arrays, start)
+        blocks = range(start // shard.random.block, -(-stop // shard.random.block))
+
+        while True:
+            barrier.wait()
+            command, steps, speed = control[0], int(control[1]), control[2]
+            if command == _STOP:
+                break
+            if command == _SYNC:
+                shard.random.ensure(stop)
+                conn.send({block: shard.random.kick_streams[block].bit_generator.state
+                           for block in blocks})
+            else:
+                for _ in range(steps):
+                    shard.step(speed)
+            barrier.wait()
+    except BaseException:
+        # Let the parent fail fast instead of waiting at the barrier forever
+        barrier.abort()
+        raise
+    finally:
+        shard = arrays = None
+        for shm in handles:
+            shm.close()
+
+
+class ParallelStepper:
+    """Steps `system` with `processes` worker processes
+
+    While the stepper is open the system must only be advanced through
+    step(), and its particle count must stay fixed. Collisions couple
+    particles across shards and are not supported. close() moves the
+    particles back to private memory and hands the RNG state over, so
+    the system can carry on single-process afterwards.
+    """
+
+    def __init__(self, system, processes=None, context=None):
+        if system.collisions:
+            raise ValueError("collisions are not supported with parallel stepping")
+        self.system = system
+        self.steps = 0
+        ctx = context or multiprocessing.get_context()
+        processes = processes or os.cpu_count() or 1
+        self.bounds = shard_bounds(system.count, processes, system.random.block)
+
+        self._handles = []
+        self._pipes = []
+        self._workers = []
+        self._attached = False
+        self._barrier = None
+        self._closing = False
+        try:
+            self._start(ctx)
+        except BaseException:
+            # Leave no workers or /dev/shm blocks behind a failed start
+            self._shutdown(sync=False)
+            raise
+
+    def _start(self, ctx):
+        system = self.system
+
+        # Shared blocks hold the particle state; the parent steps nothing itself
+        layout, arrays = {}, {}
+        for name in FIELDS:
+            source = getattr(system, name)
+            shm = shared_memory.SharedMemory(create=True, size=max(source.nbytes, 1))
+            self._handles.append(shm)
+            arrays[name] = np.ndarray(len(source), dtype=source.dtype, buffer=shm.buf)
+            arrays[name][:] = source
+            layout[name] = (shm.name, source.dtype.str, len(source))
+        system.attach(arrays)
+        self._attached = True
+
+        spec = {
+            "width": system.width,
+            "height": system.height,
+            "dtype": system.dtype.str,
+            "integrator": system.integrator,
+            "temperature": system.temperature,
+            "friction": system.friction,
+            "dt": system.dt,
+            "kick": system.kick,
+            "wall_damping": system.wall_damping,
+            "random": system.random.get_state(),
+        }
+        self._barrier = ctx.Barrier(len(self.bounds) + 1)
+        self._control = ctx.RawArray("d", 3)
+        for start, stop in self.bounds:
+            parent_end, child_end = ctx.Pipe()
+            worker = ctx.Process(
+                target=_shard_worker,
+                args=(layout, spec, start, stop, self._barrier, self._control, child_end),
+                name=f"brownian-shard-{start}", daemon=True,
+            )
+            worker.start()
+            child_end.close()
+            self._pipes.append(parent_end)
+            self._workers.append(worker)
+        threading.Thread(target=self._watch, args=([w.sentinel for w in self._workers],),
+                         name="brownian-shard-watch", daemon=True).start()
+
+    def _watch(self, sentinels):
+        """Break the barrier when a worker exits on its own (killed, crashed)"""
+        multiprocessing.connection.wait(sentinels)
+        if not self._closing:
+            self._barrier.abort()
+
+    @property
+    def processes(self):
+        return len(self.bounds)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # On an error the RNG hand-over is not worth masking it with another
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _command(self, command, steps=0, speed=0.0):
+        self._control[0] = command
+        self._control[1] = steps
+        self._control[2] = speed
+        try:
+            self._barrier.wait()
+            if command == _STOP:
+                return
+            if command == _SYNC:
+                states = {}
+                for pipe in self._pipes:
+                    states.update(pipe.recv())
+                self._barrier.wait()
+                return states
+            self._barrier.wait()
+        except threading.BrokenBarrierError:
+            raise RuntimeError("a shard worker failed, see its traceback above") from None
+
+    def step(self, speed, steps=1):
+        """Advance every shard by `steps` steps, returns once all are done
+
+        Same signature as ParticleSystem.step() for steps=1. Trails, when
+        enabled on the system, are recorded here after the batch.
+        """
+        self._command(_RUN, steps, speed)
+        self.steps += steps
+        if self.system.record_trails:
+            self.system.record_trail()
+
+    def sync_random(self):
+        """Copy the workers' stream positions into system.random (e.g. before a checkpoint)"""
+        random = self.system.random
+        states = self._command(_SYNC)
+        random.ensure(self.system.count)
+        for block, state in states.items():
+            random.kick_streams[block].bit_generator.state = state
+
+    def close(self):
+        """Stop the workers and hand the system back, also after a failure
+
+        If a worker died (or Ctrl-C reached the workers too) the RNG state
+        cannot be synced and the error is raised, but the workers are
+        still stopped and the shared blocks still released first.
+        """
+        if not self._workers and not self._handles:
+            return
+        self._shutdown(sync=bool(self._workers))
+
+    def abort(self):
+        """Like close() without the RNG hand-over, never raises for a dead worker"""
+        self._shutdown(sync=False)
+
+    def _shutdown(self, sync):
+        stopped = False
+        try:
+            if sync:
+                self.sync_random()
+                self._closing = True
+                self._command(_STOP)
+                stopped = True
+        finally:
+            self._closing = True
+            if not stopped and self._workers:
+                # Wake workers still waiting at the barrier so they exit
+                self._barrier.abort()
+            for worker in self._workers:
+                worker.join(timeout=5)
+                if worker.is_alive():
+                    worker.terminate()
+                    worker.join()
+            for pipe in self._pipes:
+                pipe.close()
+            self._workers = []
+            self._pipes = []
+
+            # Back to private arrays before the shared blocks go away
+            if self._attached:
+                system = self.system
+                system.attach({name: getattr(system, name).copy() for name in FIELDS})
+                self._attached = False
+            for shm in self._handles:
+                shm.close()
+                shm.unlink()
+            self._handles = []
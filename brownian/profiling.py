@@ -0,0 +1,275 @@
+"""
+Frame profiling
+Per-phase frame timings with rolling percentiles and an on-canvas overlay
+
+A FrameProfiler is handed to the renderers and the GUI loop; each piece
+of a frame is wrapped in `with profiler.phase(name):`. The last WINDOW
+samples of every phase are kept in a ring buffer, so p50/p95/p99 always
+describe recent behaviour. Finished frames can be streamed to sinks
+(any callable taking the frame record), e.g. JsonLinesSink for long
+unattended runs. StartupTimer covers the one-off path from launch to the
+first drawn frame.
+"""
+
+import json
+import time
+from contextlib import contextmanager, nullcontext
+
+import numpy as np
+
+WINDOW = 600
+FRAME_BUDGET = 1 / 60
+QUANTILES = (50, 95, 99)
+OVERLAY_REFRESH = 0.25
+# Launch to first drawn frame
+STARTUP_BUDGET = 0.3
+
+
+class RollingHistogram:
+    """The last `capacity` samples of one timing, in seconds"""
+
+    def __init__(self, capacity=WINDOW):
+        self.samples = np.zeros(capacity)
+        self.index = 0
+        self.size = 0
+        self.last = 0.0
+
+    def add(self, seconds):
+        self.samples[self.index] = seconds
+        self.index = (self.index + 1) % len(self.samples)
+        self.size = min(self.size + 1, len(self.samples))
+        self.last = seconds
+
+    def values(self):
+        return self.samples[:self.size]
+
+    def mean(self):
+        return float(self.values().mean()) if self.size else 0.0
+
+    def percentiles(self, quantiles=QUANTILES):
+        if not self.size:
+            return [0.0] * len(quantiles)
+        return np.percentile(self.values(), quantiles).tolist()
+
+
+class NullProfiler:
+    """Stand-in used by the renderers when nobody is profiling"""
+
+    enabled = False
+
+    def phase(self, name):
+        return nullcontext()
+
+    def record(self, name, seconds):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class FrameProfiler:
+    """Times the phases of each frame and keeps rolling histograms
+
+    `frame` is the work done inside begin_frame()/end_frame(), `interval`
+    the wall time between two frame starts, which also covers Tk's own
+    redraw and any idle wait, and is what the FPS figure is based on.
+    """
+
+    enabled = True
+
+    def __init__(self, window=WINDOW, budget=FRAME_BUDGET):
+        self.window = window
+        self.budget = budget
+        self.histograms = {}
+        self.sinks = []
+        self.frames = 0
+        self.started = time.perf_counter()
+        self._phases = None
+        self._frame_start = None
+        self._last_start = None
+
+    def histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms.setdefault(name, RollingHistogram(self.window))
+        return histogram
+
+    def reset(self):
+        self.histograms = {}
+        self.frames = 0
+        self._phases = None
+        self._last_start = None
+
+    def begin_frame(self):
+        now = time.perf_counter()
+        if self._last_start is not None:
+            self.histogram("interval").add(now - self._last_start)
+        self._last_start = now
+        self._frame_start = now
+        self._phases = {}
+
+    @contextmanager
+    def phase(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.histogram(name).add(elapsed)
+            if self._phases is not None:
+                self._phases[name] = self._phases.get(name, 0.0) + elapsed
+
+    def record(self, name, seconds):
+        """Add a timing taken outside the frame loop, e.g. on the worker thread"""
+        self.histogram(name).add(seconds)
+
+    def end_frame(self):
+        if self._phases is None:
+            return
+        total = time.perf_counter() - self._frame_start
+        self.histogram("frame").add(total)
+        self.frames += 1
+        if self.sinks:
+            interval = self.histograms.get("interval")
+            record = {
+                "frame": self.frames,
+                "t": self._frame_start - self.started,
+                "frame_ms": total * 1e3,
+                "interval_ms": interval.last * 1e3 if interval else None,
+                "phases": {name: seconds * 1e3 for name, seconds in self._phases.items()},
+            }
+            for sink in self.sinks:
+                sink(record)
+        self._phases = None
+
+    @property
+    def fps(self):
+        interval = self.histograms.get("interval")
+        mean = interval.mean() if interval else 0.0
+        return 1.0 / mean if mean > 0 else 0.0
+
+    def summary(self, quantiles=QUANTILES):
+        """{phase: {"p50": ms, ..., "mean": ms, "samples": n}}"""
+        summary = {}
+        for name, histogram in list(self.histograms.items()):
+            entry = {f"p{q:g}": value * 1e3
+                     for q, value in zip(quantiles, histogram.percentiles(quantiles))}
+            entry["mean"] = histogram.mean() * 1e3
+            entry["samples"] = histogram.size
+            summary[name] = entry
+        return summary
+
+    def export(self, path):
+        """Write the current percentiles as JSON"""
+        report = {
+            "frames": self.frames,
+            "fps": self.fps,
+            "budget_ms": self.budget * 1e3,
+            "window": self.window,
+            "phases_ms": self.summary(),
+        }
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        return report
+
+
+class StartupTimer:
+    """Named milestones, in seconds since `origin` (a perf_counter value)"""
+
+    def __init__(self, origin=None, budget=STARTUP_BUDGET):
+        self.origin = time.perf_counter() if origin is None else origin
+        self.budget = budget
+        self.marks = {}
+
+    def mark(self, name):
+        """Record `name` once, later calls keep the first time"""
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter() - self.origin
+        return self.marks[name]
+
+    def report(self):
+        first_frame = self.marks.get("first_frame")
+        return {
+            "marks_ms": {name: seconds * 1e3 for name, seconds in self.marks.items()},
+            "budget_ms": self.budget * 1e3,
+            "within_budget": first_frame is not None and first_frame <= self.budget,
+        }
+
+    def format(self):
+        return "  ".join(f"{name} {seconds * 1e3:.0f} ms" for name, seconds in self.marks.items())
+
+
+class JsonLinesSink:
+    """Appends one JSON line per frame to a file"""
+
+    def __init__(self, path, flush_every=60):
+        self.file = open(path, "a")
+        self.flush_every = flush_every
+        self.pending = 0
+
+    def __call__(self, record):
+        self.file.write(json.dumps(record) + "\n")
+        self.pending += 1
+        if self.pending >= self.flush_every:
+            self.file.flush()
+            self.pending = 0
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+
+class ProfilerOverlay:
+    """FPS, frame budget bar and per-phase p50/p95/p99 drawn on the canvas"""
+
+    WIDTH = 260
+    LINE_HEIGHT = 14
+
+    def __init__(self, canvas, profiler, refresh=OVERLAY_REFRESH):
+        self.canvas = canvas
+        self.profiler = profiler
+        self.refresh = refresh
+        self.items = None
+        self.next_refresh = 0.0
+
+    def clear(self):
+        self.canvas.delete("overlay")
+        self.items = None
+        self.next_refresh = 0.0
+
+    def draw(self):
+        """Refresh the overlay, at most every `refresh` seconds"""
+        now = time.perf_counter()
+        if now < self.next_refresh:
+            return
+        self.next_refresh = now + self.refresh
+        canvas = self.canvas
+        if self.items is None:
+            self.items = (
+                canvas.create_rectangle(8, 8, 8 + self.WIDTH, 8, fill="#000000",
+                                        outline="#4ECDC4", stipple="gray50", tags="overlay"),
+                canvas.create_rectangle(16, 16, 16, 24, fill="#1DD1A1", outline="",
+                                        tags="overlay"),
+                canvas.create_text(16, 30, anchor="nw", fill="#e2e8f0",
+                                   font=("Consolas", 9), tags="overlay"),
+            )
+        panel, bar, text = self.items
+
+        profiler = self.profiler
+        summary = profiler.summary()
+        frame = summary.get("frame", {}).get("p95", 0.0)
+        budget = profiler.budget * 1e3
+        lines = [f"FPS {profiler.fps:5.1f}   frame p95 {frame:5.1f} / {budget:.1f} ms",
+                 f"{'fase':<10}{'p50':>8}{'p95':>8}{'p99':>8}"]
+        for name, entry in summary.items():
+            if name in ("frame", "interval"):
+                continue
+            lines.append(f"{name:<10}{entry['p50']:8.2f}{entry['p95']:8.2f}{entry['p99']:8.2f}")
+
+        share = frame / budget if budget else 0.0
+        color = "#1DD1A1" if share < 0.75 else "#F7DC6F" if share < 1.0 else "#FF6B6B"
+        canvas.coords(bar, 16, 16, 16 + (self.WIDTH - 16) * min(share, 1.0), 24)
+        canvas.itemconfig(bar, fill=color)
+        canvas.itemconfig(text, text="\n".join(lines))
+        canvas.coords(panel, 8, 8, 8 + self.WIDTH, 38 + self.LINE_HEIGHT * len(lines))
+        canvas.tag_raise("overlay")
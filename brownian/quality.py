@@ -0,0 +1,87 @@
+"""
+Adaptive level of detail
+Trades visual detail for frame time to hold a frame budget
+
+The renderers draw according to a Quality tuple. QUALITY_LEVELS goes from
+the full look to the cheapest one, and AdaptiveQuality walks along that
+list using the measured frame times: one level down when recent frames
+miss the budget, one level back up after a while of clear headroom.
+"""
+
+import time
+from collections import deque, namedtuple
+
+from .profiling import FRAME_BUDGET
+
+Quality = namedtuple(
+    "Quality", "glow stipple trails trail_width trail_fraction merge_trails"
+)
+
+FULL_QUALITY = Quality(glow=True, stipple=True, trails=True, trail_width=2,
+                       trail_fraction=1.0, merge_trails=False)
+
+QUALITY_LEVELS = (
+    FULL_QUALITY,
+    FULL_QUALITY._replace(glow=False),
+    FULL_QUALITY._replace(glow=False, trail_width=1, trail_fraction=0.5),
+    FULL_QUALITY._replace(glow=False, trail_width=1, trail_fraction=0.5, stipple=False),
+    FULL_QUALITY._replace(glow=False, trail_width=1, trail_fraction=0.5, stipple=False,
+                          merge_trails=True),
+    FULL_QUALITY._replace(glow=False, trail_width=1, trail_fraction=0.25, stipple=False,
+                          merge_trails=True),
+    FULL_QUALITY._replace(glow=False, stipple=False, trails=False),
+)
+
+WINDOW = 30
+PERCENTILE = 0.9
+HEADROOM = 0.6
+RESTORE_HOLD = 2.0
+
+
+class AdaptiveQuality:
+    """Chooses a quality level from recent frame times
+
+    A decision is taken once per `window` frames from their 90th
+    percentile. Quality is only raised again when that stays below
+    `headroom` x budget and the last change is `hold` seconds old, so a
+    level that was just too expensive is not retried every second.
+    """
+
+    def __init__(self, budget=FRAME_BUDGET, levels=QUALITY_LEVELS, window=WINDOW,
+                 headroom=HEADROOM, hold=RESTORE_HOLD):
+        self.budget = budget
+        self.levels = levels
+        self.headroom = headroom
+        self.hold = hold
+        self.samples = deque(maxlen=window)
+        self.level = 0
+        self.last_change = time.perf_counter()
+
+    @property
+    def current(self):
+        return self.levels[self.level]
+
+    def reset(self):
+        self.level = 0
+        self.samples.clear()
+        self.last_change = time.perf_counter()
+
+    def observe(self, seconds, now=None):
+        """Add one frame time, returns True when the level changed"""
+        self.samples.append(seconds)
+        if len(self.samples) < self.samples.maxlen:
+            return False
+        now = time.perf_counter() if now is None else now
+        ordered = sorted(self.samples)
+        load = ordered[int(PERCENTILE * (len(ordered) - 1))]
+        if load > self.budget and self.level < len(self.levels) - 1:
+            self.level += 1
+        elif (load < self.budget * self.headroom and self.level > 0
+              and now - self.last_change >= self.hold):
+            self.level -= 1
+        else:
+            self.samples.clear()
+            return False
+        self.samples.clear()
+        self.last_change = now
+        return True
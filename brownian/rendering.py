@@ -0,0 +1,474 @@
+"""
+Canvas renderers
+Drawing of a ParticleSystem on a Tk canvas
+
+CanvasRenderer is retained-mode: canvas items are created once and then
+moved in place with coords() and itemconfig(). RasterRenderer paints
+into an off-screen NumPy pixel buffer and blits it as one PhotoImage,
+so its frame time barely depends on the particle count.
+"""
+
+from collections import deque
+
+import numpy as np
+
+from .engine import COLORS
+from .profiling import NULL_PROFILER
+from .quality import FULL_QUALITY
+
+GRID_SIZE = 50
+GRID_COLOR = "#1a1a2e"
+BACKGROUND = "#0f1419"
+
+
+def hex_to_rgb(color):
+    return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+
+
+def upscale(image, cell, width, height):
+    """Blow a (rows, cols, 3) image up to `cell` px per pixel, cropped to the canvas"""
+    return image.repeat(cell, axis=0).repeat(cell, axis=1)[:height, :width]
+
+
+class CanvasRenderer:
+    """Vector look of the simulator: grid, fading trails, glow and body ovals"""
+
+    def __init__(self, canvas, grid_size=GRID_SIZE):
+        self.canvas = canvas
+        self.grid_size = grid_size
+        self.grid_extent = None
+        self.system = None
+        self.generation = None
+        self.glows = []
+        self.bodies = []
+        self.colors = []
+        # Per particle: deque of [item, stippled] from oldest to newest segment
+        self.segments = []
+        # Per particle: one polyline item when trail segments are merged
+        self.polylines = []
+        self.trail_seen = 0
+        self.trail_epoch = 0
+        self.restipple = False
+        self.underlay = None
+        self.profiler = NULL_PROFILER
+        self._quality = FULL_QUALITY
+
+    @property
+    def quality(self):
+        return self._quality
+
+    @quality.setter
+    def quality(self, quality):
+        """Switch level of detail, touching each affected item kind once"""
+        old, self._quality = self._quality, quality
+        canvas = self.canvas
+        if quality.glow != old.glow:
+            canvas.itemconfig("glow", state="normal" if quality.glow else "hidden")
+        if quality.merge_trails != old.merge_trails or quality.trails != old.trails:
+            self.clear_trails()
+            return
+        if quality.trail_width != old.trail_width:
+            canvas.itemconfig("trail", width=quality.trail_width)
+        if quality.stipple != old.stipple:
+            if quality.stipple:
+                self.restipple = True
+            else:
+                canvas.itemconfig("trail", stipple="")
+                for segs in self.segments:
+                    for seg in segs:
+                        seg[1] = False
+
+    def clear(self):
+        """Forget every item, the next draw starts from an empty canvas"""
+        self.canvas.delete("grid", "particle", "trail", "underlay")
+        self.grid_extent = None
+        self.underlay = None
+        self.system = None
+        self.generation = None
+        self.glows = []
+        self.bodies = []
+        self.colors = []
+        self.segments = []
+        self.polylines = []
+        self.trail_seen = 0
+        self.trail_epoch = 0
+
+    def clear_trails(self):
+        self.canvas.delete("trail")
+        self.segments = [deque() for _ in self.bodies]
+        self.polylines = []
+        self.trail_seen = 0
+
+    def draw_grid(self, width, height):
+        """Draw the static grid, only when the canvas size changed"""
+        if self.grid_extent == (width, height):
+            return
+        self.grid_extent = (width, height)
+        self.canvas.delete("grid")
+
+        for i in range(0, width, self.grid_size):
+            self.canvas.create_line(i, 0, i, height, fill=GRID_COLOR, width=1, tags="grid")
+        for i in range(0, height, self.grid_size):
+            self.canvas.create_line(0, i, width, i, fill=GRID_COLOR, width=1, tags="grid")
+        self.canvas.tag_lower("grid")
+        if self.underlay is not None:
+            self.canvas.tag_lower("underlay")
+
+    def set_underlay(self, image, cell):
+        """Show a (rows, cols, 3) uint8 image under the grid, `cell` px per pixel
+
+        None removes it. Meant for slowly changing layers such as the
+        occupancy heatmap, refreshed a few times per second at most.
+        """
+        canvas = self.canvas
+        if image is None:
+            canvas.delete("underlay")
+            self.underlay = None
+            return
+        height, width = image.shape[0] * cell, image.shape[1] * cell
+        pixels = np.ascontiguousarray(upscale(image, cell, width, height))
+        data = f"P6 {width} {height} 255 ".encode("ascii") + pixels.tobytes()
+        if self.underlay is None:
+            import tkinter as tk
+            self.underlay = tk.PhotoImage(master=canvas, width=width, height=height)
+            canvas.create_image(0, 0, anchor="nw", image=self.underlay, tags="underlay")
+            canvas.tag_lower("underlay")
+        self.underlay.configure(data=data, format="PPM")
+
+    def draw(self, system, show_trails=True):
+        """Bring all canvas items in line with the current particle state"""
+        profiler = self.profiler
+        quality = self._quality
+        with profiler.phase("sync"):
+            self.sync_particles(system)
+
+        with profiler.phase("trails"):
+            if show_trails and quality.trails:
+                if quality.merge_trails:
+                    self.update_polylines(system)
+                else:
+                    self.update_trails(system)
+            elif self.trail_seen:
+                self.clear_trails()
+
+        with profiler.phase("particles"):
+            coords = self.canvas.coords
+            positions = zip(system.x.tolist(), system.y.tolist(), system.radius.tolist())
+            if quality.glow:
+                for glow, body, (x, y, radius) in zip(self.glows, self.bodies, positions):
+                    glow_radius = radius + 4
+                    coords(glow, x - glow_radius, y - glow_radius,
+                           x + glow_radius, y + glow_radius)
+                    coords(body, x - radius, y - radius, x + radius, y + radius)
+            else:
+                # Hidden glow ovals are left where they are
+                for body, (x, y, radius) in zip(self.bodies, positions):
+                    coords(body, x - radius, y - radius, x + radius, y + radius)
+
+    def sync_particles(self, system):
+        """Create or delete items only when the particle count changes"""
+        canvas = self.canvas
+        count = system.count
+        have = len(self.bodies)
+
+        if system is not self.system or system.generation != self.generation:
+            self.system = system
+            self.generation = system.generation
+            colors = system.colors()
+            for i in range(min(count, have)):
+                if self.colors[i] != colors[i]:
+                    canvas.itemconfig(self.glows[i], fill=colors[i])
+                    canvas.itemconfig(self.bodies[i], fill=colors[i])
+            self.colors[:min(count, have)] = colors[:min(count, have)]
+            self.clear_trails()
+        else:
+            colors = None
+
+        if count > have:
+            colors = colors or system.colors()
+            for color in colors[have:count]:
+                self.glows.append(canvas.create_oval(
+                    0, 0, 0, 0, fill=color, outline="", stipple="gray25",
+                    state="normal" if self._quality.glow else "hidden",
+                    tags=("particle", "glow")
+                ))
+                self.bodies.append(canvas.create_oval(
+                    0, 0, 0, 0, fill=color, outline="white", width=1, tags="particle"
+                ))
+                self.colors.append(color)
+                self.segments.append(deque())
+        elif count < have:
+            for items in (self.glows[count:], self.bodies[count:]):
+                if items:
+                    canvas.delete(*items)
+            for segs in self.segments[count:]:
+                if segs:
+                    canvas.delete(*[item for item, _ in segs])
+            if self.polylines[count:]:
+                canvas.delete(*self.polylines[count:])
+            del self.glows[count:], self.bodies[count:], self.colors[count:], self.segments[count:]
+            del self.polylines[count:]
+
+    def update_trails(self, system):
+        """Add the newest segments and recycle the oldest ones"""
+        fresh = self.fresh_points(system)
+        quality = self._quality
+        trails = system.trails
+        points = min(trails.size, self.drawn_points(system))
+        target = points - 1
+        if fresh <= 0 or target <= 0:
+            return
+        new = min(fresh, target)
+
+        # Only the newest points are read from the ring buffer
+        canvas = self.canvas
+        half = (points + 1) // 2
+        recent = trails.recent(new + 1).tolist()
+        restipple, self.restipple = self.restipple, False
+        for color, segs, pts in zip(self.colors, self.segments, recent):
+            for k in range(new):
+                (x1, y1), (x2, y2) = pts[k], pts[k + 1]
+                if len(segs) >= target:
+                    seg = segs.popleft()
+                    canvas.coords(seg[0], x1, y1, x2, y2)
+                else:
+                    item = canvas.create_line(
+                        x1, y1, x2, y2, fill=color, width=quality.trail_width, tags="trail"
+                    )
+                    canvas.tag_lower(item, "particle")
+                    seg = [item, False]
+                segs.append(seg)
+
+            while len(segs) > target:
+                canvas.delete(segs.popleft()[0])
+
+            if not quality.stipple:
+                continue
+            # Older half of the trail is stippled; the boundary moves by at
+            # most `new` segments per frame, so only those need itemconfig
+            if restipple:
+                candidates = range(len(segs))
+            else:
+                candidates = set(range(max(0, half - new - 1), min(len(segs), half + new + 1)))
+                candidates.update(range(max(0, len(segs) - new), len(segs)))
+            for i in candidates:
+                seg = segs[i]
+                stippled = i < half
+                if seg[1] != stippled:
+                    canvas.itemconfig(seg[0], stipple="gray50" if stippled else "")
+                    seg[1] = stippled
+
+    def fresh_points(self, system):
+        """Trail points pushed since the last draw, after any epoch change"""
+        if system.trail_epoch != self.trail_epoch:
+            self.clear_trails()
+            self.trail_epoch = system.trail_epoch
+        version = system.trail_version
+        fresh = min(version - self.trail_seen, system.trail_length)
+        self.trail_seen = version
+        return fresh
+
+    def drawn_points(self, system):
+        """Trail points shown per particle at the current level of detail"""
+        return max(2, int(round(system.trail_length * self._quality.trail_fraction)))
+
+    def update_polylines(self, system):
+        """Merged trails: one polyline per particle, moved with a single coords()"""
+        if self.fresh_points(system) <= 0:
+            return
+        points = min(system.trails.size, self.drawn_points(system))
+        if points < 2:
+            return
+        canvas = self.canvas
+        lines = self.polylines
+        flat = system.trails.recent(points).reshape(system.count, -1).tolist()
+        for color in self.colors[len(lines):len(flat)]:
+            item = canvas.create_line(0, 0, 0, 0, fill=color,
+                                      width=self._quality.trail_width, tags="trail")
+            canvas.tag_lower(item, "particle")
+            lines.append(item)
+        coords = canvas.coords
+        for item, pts in zip(lines, flat):
+            coords(item, pts)
+
+
+class RasterRenderer:
+    """Pixel-buffer look for large particle counts, blitted as one PhotoImage
+
+    Trails are a decaying RGB layer instead of line segments, the glow is a
+    blurred quarter-resolution splat, and bodies are stamped disc sprites.
+    The sprite size shrinks once the particle count would exceed
+    `max_stamp_pixels`, so per-frame cost stays bounded.
+    """
+
+    GLOW_SCALE = 4
+    GLOW_GAIN = 0.6
+    TRAIL_ALPHA = 0.6
+
+    def __init__(self, canvas, grid_size=GRID_SIZE, max_stamp_pixels=500_000):
+        self.canvas = canvas
+        self.grid_size = grid_size
+        self.max_stamp_pixels = max_stamp_pixels
+        self.palette = np.array([hex_to_rgb(c) for c in COLORS], dtype=np.float32)
+        self.white = np.array(hex_to_rgb("#ffffff"), dtype=np.float32)
+        self.discs = {}
+        self.extent = None
+        self.image = None
+        self.item = None
+        self.trail = None
+        self.underlay = None
+        self.profiler = NULL_PROFILER
+        # Only glow, trails and trail_fraction apply to the pixel buffer
+        self.quality = FULL_QUALITY
+
+    def clear(self):
+        self.canvas.delete("raster")
+        self.extent = None
+        self.image = None
+        self.item = None
+        self.trail = None
+        self.underlay = None
+
+    def clear_trails(self):
+        if self.trail is not None:
+            self.trail.fill(0)
+
+    def draw_grid(self, width, height):
+        """(Re)allocate the pixel buffers and bake the grid into the background"""
+        if self.extent == (width, height):
+            return
+        self.extent = (width, height)
+
+        background = np.empty((height, width, 3), dtype=np.float32)
+        background[...] = hex_to_rgb(BACKGROUND)
+        self.bake_grid(background)
+        self.background = background
+        self.base = background
+        self.underlay = None
+        self.frame = np.empty_like(background)
+        self.trail = np.zeros_like(background)
+        self.pixels = np.empty((height, width, 3), dtype=np.uint8)
+        self.header = f"P6 {width} {height} 255 ".encode("ascii")
+
+        if self.image is None:
+            import tkinter as tk
+            self.image = tk.PhotoImage(master=self.canvas, width=width, height=height)
+            self.item = self.canvas.create_image(0, 0, anchor="nw", image=self.image, tags="raster")
+        else:
+            self.image.configure(width=width, height=height)
+
+    def bake_grid(self, buffer):
+        grid = hex_to_rgb(GRID_COLOR)
+        buffer[:, ::self.grid_size] = grid
+        buffer[::self.grid_size, :] = grid
+
+    def set_underlay(self, image, cell):
+        """Paint a (rows, cols, 3) uint8 image under the grid, `cell` px per pixel
+
+        The layer is baked into the frame background once here, so
+        drawing frames costs the same with or without it. None removes it.
+        """
+        if self.extent is None:
+            return
+        self.underlay = image
+        if image is None:
+            self.base = self.background
+            return
+        width, height = self.extent
+        base = self.background.copy()
+        layer = upscale(image, cell, width, height)
+        base[:layer.shape[0], :layer.shape[1]] = layer
+        self.bake_grid(base)
+        self.base = base
+
+    def disc(self, radius):
+        """Flat pixel offsets (dy, dx) of a filled disc, cached per radius"""
+        if radius not in self.discs:
+            r = np.arange(-radius, radius + 1)
+            dy, dx = np.meshgrid(r, r, indexing="ij")
+            inside = dy * dy + dx * dx <= radius * radius + radius
+            self.discs[radius] = (dy[inside], dx[inside])
+        return self.discs[radius]
+
+    def sprite_radius(self, system):
+        """Disc radius that keeps the total stamped pixels within budget"""
+        if system.count == 0:
+            return 0
+        radius = int(round(float(system.radius.mean())))
+        while radius > 0 and system.count * 2 * len(self.disc(radius)[0]) > self.max_stamp_pixels:
+            radius -= 1
+        return radius
+
+    def draw(self, system, show_trails=True):
+        if self.extent is None:
+            return
+        profiler = self.profiler
+        width, height = self.extent
+        frame = self.frame
+        np.copyto(frame, self.base)
+
+        ix = np.clip(system.x, 0, width - 1).astype(np.intp)
+        iy = np.clip(system.y, 0, height - 1).astype(np.intp)
+        colors = self.palette[system.color_index]
+        pixels = frame.reshape(-1, 3)
+
+        # Fading trails: decay the layer, then mark the current positions
+        quality = self.quality
+        if show_trails and quality.trails:
+            with profiler.phase("trails"):
+                length = max(1.0, system.trail_length * quality.trail_fraction)
+                self.trail *= 0.01 ** (1 / length)
+                self.trail.reshape(-1, 3)[iy * width + ix] = colors
+                frame += self.trail * self.TRAIL_ALPHA
+
+        if quality.glow:
+            with profiler.phase("glow"):
+                self.add_glow(frame, ix, iy, system.color_index)
+
+        # Bodies: white outline disc, then the colored disc inside it
+        with profiler.phase("particles"):
+            radius = self.sprite_radius(system)
+            if radius > 1:
+                self.stamp(pixels, ix, iy, self.white, radius)
+                self.stamp(pixels, ix, iy, colors[:, None, :], radius - 1)
+            else:
+                self.stamp(pixels, ix, iy, colors[:, None, :], radius)
+
+        with profiler.phase("blit"):
+            np.clip(frame, 0, 255, out=frame)
+            np.copyto(self.pixels, frame, casting="unsafe")
+            self.image.configure(data=self.header + self.pixels.tobytes(), format="PPM")
+
+    def add_glow(self, frame, ix, iy, color_index):
+        """Blur a quarter-resolution splat of the particles and add it"""
+        height, width = frame.shape[:2]
+        scale = self.GLOW_SCALE
+        gh, gw = -(-height // scale), -(-width // scale)
+        colors = len(self.palette)
+
+        # Count particles per (cell, palette color), then mix the palette
+        cells = ((iy // scale) * gw + ix // scale) * colors + color_index
+        counts = np.bincount(cells, minlength=gh * gw * colors).reshape(gh * gw, colors)
+        splat = np.zeros((gh + 2, gw + 2, 3), dtype=np.float32)
+        splat[1:-1, 1:-1] = (counts.astype(np.float32) @ self.palette).reshape(gh, gw, 3)
+
+        # 3x3 box blur at low resolution
+        glow = np.zeros((gh, gw, 3), dtype=np.float32)
+        for dy in range(3):
+            for dx in range(3):
+                glow += splat[dy:dy + gh, dx:dx + gw]
+        glow *= self.GLOW_GAIN / 9
+
+        glow = glow.repeat(scale, axis=0).repeat(scale, axis=1)
+        frame += glow[:height, :width]
+
+    def stamp(self, pixels, ix, iy, color, radius):
+        """Overwrite a disc of pixels around every particle"""
+        height, width = self.frame.shape[:2]
+        if radius == 0:
+            pixels[iy * width + ix] = color.reshape(-1, 3)
+            return
+        dy, dx = self.disc(radius)
+        yy = np.clip(iy[:, None] + dy, 0, height - 1)
+        xx = np.clip(ix[:, None] + dx, 0, width - 1)
+        pixels[yy * width + xx] = color
@@ -0,0 +1,109 @@
+"""
+Trajectory replay
+Plays a recorded .brtraj file back through the regular renderers
+
+TrajectoryPlayer looks like a ParticleSystem to the renderers: its
+positions are views into the memory-mapped file, and its trails are
+rebuilt from the recorded window around the current frame instead of
+being simulated.
+"""
+
+import numpy as np
+
+from .engine import COLORS
+from .trails import TRAIL_LENGTH, TrailHistory
+
+FRAME_RATE = 60.0
+MIN_RATE = 0.1
+MAX_RATE = 100.0
+
+
+class TrajectoryPlayer(TrailHistory):
+    """Playback position, speed and trail window over a TrajectoryReader"""
+
+    def __init__(self, reader, trail_length=TRAIL_LENGTH, frame_rate=FRAME_RATE):
+        self.reader = reader
+        self.trail_length = trail_length
+        self.record_trails = True
+        self.frame_rate = frame_rate
+        self.dtype = reader.dtype
+        self.width = reader.header.get("width")
+        self.height = reader.header.get("height")
+        self.radius = np.asarray(reader.radius)
+        self.color_index = np.asarray(reader.color_index)
+        self.generation = 1
+        self.rate = 1.0
+        self.playing = True
+        self.position = 0.0
+        self.frame_index = -1
+        self.reset_trails(reader.particles)
+        self.seek(0)
+
+    @property
+    def count(self):
+        return self.reader.particles
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def frames(self):
+        return len(self.reader)
+
+    @property
+    def x(self):
+        return self.reader.data[self.frame_index, 0]
+
+    @property
+    def y(self):
+        return self.reader.data[self.frame_index, 1]
+
+    @property
+    def step(self):
+        return self.reader.header.get("step0", 0) + self.frame_index
+
+    def colors(self):
+        return [COLORS[i] for i in self.color_index.tolist()]
+
+    def set_rate(self, rate):
+        self.rate = min(max(rate, MIN_RATE), MAX_RATE)
+
+    def advance(self, elapsed):
+        """Move playback forward by `elapsed` wall-clock seconds"""
+        if not self.playing:
+            return
+        last = self.frames - 1
+        self.position = min(self.position + elapsed * self.frame_rate * self.rate, last)
+        self.seek(int(self.position), keep_position=True)
+        if self.frame_index == last:
+            self.playing = False
+
+    def seek(self, index, keep_position=False):
+        """Jump to a frame; cost depends on the trail length, not the file size"""
+        index = min(max(int(index), 0), self.frames - 1)
+        if not keep_position:
+            self.position = float(index)
+        if index == self.frame_index:
+            return
+        ahead = index - self.frame_index
+        if self.record_trails and self.frame_index >= 0 and 0 < ahead < self.trail_length:
+            # Short step forward: append the frames in between
+            for frame in range(self.frame_index + 1, index + 1):
+                self.frame_index = frame
+                self.record_trail()
+        else:
+            self.frame_index = index
+            self.rebuild_trails()
+
+    def rebuild_trails(self):
+        """Refill the trail buffer from the recorded window ending at the current frame"""
+        if not self.record_trails:
+            self.clear_trails()
+            return
+        start = max(0, self.frame_index - self.trail_length + 1)
+        window = self.reader.window(start, self.frame_index + 1)
+        self.load_trails(window.transpose(2, 0, 1))
+
+    def set_trail_length(self, length):
+        TrailHistory.set_trail_length(self, length)
+        self.rebuild_trails()
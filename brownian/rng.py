@@ -0,0 +1,106 @@
+"""
+Random streams
+Seeded, block-partitioned random number generation
+
+Particles are grouped in fixed blocks of RNG_BLOCK slots and every block
+owns its own PCG64 stream derived from (seed, purpose, block). A block
+always draws the same numbers in the same order, so a seed gives
+bit-identical trajectories however the blocks are split across
+threads or processes, as long as chunks start on a block boundary.
+"""
+
+import numpy as np
+
+RNG_BLOCK = 4096
+
+# Purposes, part of every stream's spawn key
+STREAM_INIT = 0
+STREAM_KICK = 1
+STREAM_MISC = 2
+
+
+def as_seed_sequence(seed):
+    if isinstance(seed, np.random.SeedSequence):
+        return seed
+    return np.random.SeedSequence(seed)
+
+
+class BlockRandom:
+    """Independent random streams per particle block, derived from one seed"""
+
+    def __init__(self, seed=None, block=RNG_BLOCK):
+        self.base = as_seed_sequence(seed)
+        self.block = block
+        self.kick_streams = []
+
+    @property
+    def entropy(self):
+        """Root entropy; passing it back as `seed` reproduces the run"""
+        return self.base.entropy
+
+    def get_state(self):
+        """JSON-serialisable position of every stream, see from_state()"""
+        return {
+            "entropy": self.base.entropy,
+            "spawn_key": list(self.base.spawn_key),
+            "pool_size": self.base.pool_size,
+            "block": self.block,
+            "kicks": [stream.bit_generator.state for stream in self.kick_streams],
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        seed = np.random.SeedSequence(
+            state["entropy"], spawn_key=tuple(state["spawn_key"]), pool_size=state["pool_size"]
+        )
+        random = cls(seed, state["block"])
+        random.ensure(len(state["kicks"]) * random.block)
+        for stream, bit_state in zip(random.kick_streams, state["kicks"]):
+            stream.bit_generator.state = bit_state
+        return random
+
+    def stream(self, purpose, *index):
+        """Fresh generator for (purpose, *index), identical on every call"""
+        sequence = np.random.SeedSequence(
+            self.base.entropy,
+            spawn_key=tuple(self.base.spawn_key) + (purpose,) + index,
+            pool_size=self.base.pool_size,
+        )
+        return np.random.Generator(np.random.PCG64(sequence))
+
+    def blocks(self, start, stop):
+        """(block index, slice start, slice stop) covering slots [start, stop)"""
+        if start % self.block:
+            raise ValueError(f"chunks must start on a multiple of {self.block}")
+        return self.spans(start, stop)
+
+    def spans(self, start, stop):
+        """Like blocks(), but `start` may fall inside a block"""
+        first = start
+        while first < stop:
+            block = first // self.block
+            last = min((block + 1) * self.block, stop)
+            yield block, first, last
+            first = last
+
+    def ensure(self, count):
+        """Create kick streams for the blocks covering `count` slots"""
+        needed = -(-count // self.block)
+        while len(self.kick_streams) < needed:
+            self.kick_streams.append(self.stream(STREAM_KICK, len(self.kick_streams)))
+
+    def fill_uniform(self, out, start=0):
+        """Fill out[i] for slots start..start+len(out) with U[0, 1) kicks"""
+        self.ensure(start + len(out))
+        for block, first, last in self.blocks(start, start + len(out)):
+            self.kick_streams[block].random(
+                out=out[first - start:last - start], dtype=out.dtype
+            )
+
+    def fill_normal(self, out, start=0):
+        """Fill out[i] for slots start..start+len(out) with standard normals"""
+        self.ensure(start + len(out))
+        for block, first, last in self.blocks(start, start + len(out)):
+            self.kick_streams[block].standard_normal(
+                out=out[first - start:last - start], dtype=out.dtype
+            )
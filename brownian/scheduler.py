@@ -0,0 +1,126 @@
+"""
+Frame scheduling
+Deadline-based frame loop, throttles and debounced callbacks for Tk
+
+Everything here only needs an object with Tk's after()/after_cancel(),
+usually the root window, and runs on the Tk thread.
+"""
+
+import time
+
+TARGET_FPS = 60.0
+STATS_RATE = 4.0
+DEBOUNCE_MS = 120
+
+
+class FrameScheduler:
+    """Calls `callback` once per frame at `fps`
+
+    Frames are timed against deadlines rather than a fixed after(16): the
+    wait before the next frame is whatever is left of the period once the
+    callback returns, so frame cost does not stretch the frame rate and
+    Tk's millisecond rounding does not accumulate. A frame that overruns
+    by more than a whole period is counted in `missed` and the schedule
+    restarts from now instead of firing a burst of catch-up frames.
+    """
+
+    def __init__(self, root, callback, fps=TARGET_FPS):
+        self.root = root
+        self.callback = callback
+        self.period = 1.0 / fps
+        self.active = False
+        self.deadline = 0.0
+        self.missed = 0
+        self._job = None
+
+    @property
+    def fps(self):
+        return 1.0 / self.period
+
+    @fps.setter
+    def fps(self, fps):
+        self.period = 1.0 / fps
+
+    def start(self):
+        if self.active:
+            return
+        self.active = True
+        self.deadline = time.perf_counter()
+        self._job = self.root.after(0, self._tick)
+
+    def stop(self):
+        self.active = False
+        if self._job is not None:
+            self.root.after_cancel(self._job)
+            self._job = None
+
+    def _tick(self):
+        self._job = None
+        if not self.active:
+            return
+        self.callback()
+        if not self.active:
+            return
+        now = time.perf_counter()
+        self.deadline += self.period
+        if now - self.deadline > self.period:
+            self.missed += 1
+            self.deadline = now
+        delay = max(0, round((self.deadline - now) * 1000))
+        self._job = self.root.after(delay, self._tick)
+
+
+class Throttle:
+    """Lets an action through at most `rate` times per second"""
+
+    def __init__(self, rate=STATS_RATE):
+        self.interval = 1.0 / rate
+        self.next = 0.0
+
+    def ready(self, now=None):
+        now = time.perf_counter() if now is None else now
+        if now < self.next:
+            return False
+        self.next = now + self.interval
+        return True
+
+    def reset(self):
+        """Let the next call through, e.g. after the shown values were reset"""
+        self.next = 0.0
+
+
+class Debouncer:
+    """Runs keyed callbacks once their events stop for `delay_ms`
+
+    A slider drag fires its command for every pixel moved; scheduling the
+    expensive part here under one key collapses the drag into a single
+    call with the final value.
+    """
+
+    def __init__(self, root, delay_ms=DEBOUNCE_MS):
+        self.root = root
+        self.delay_ms = delay_ms
+        self._pending = {}
+
+    def schedule(self, key, callback):
+        job = self._pending.pop(key, (None, None))[0]
+        if job is not None:
+            self.root.after_cancel(job)
+        job = self.root.after(self.delay_ms, lambda: self._run(key))
+        self._pending[key] = (job, callback)
+
+    def _run(self, key):
+        _, callback = self._pending.pop(key)
+        callback()
+
+    def flush(self):
+        """Run everything still pending now"""
+        for key in list(self._pending):
+            job, _ = self._pending[key]
+            self.root.after_cancel(job)
+            self._run(key)
+
+    def cancel(self):
+        for job, _ in self._pending.values():
+            self.root.after_cancel(job)
+        self._pending.clear()
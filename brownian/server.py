@@ -0,0 +1,288 @@
+"""
+Simulation server
+One simulation broadcast to any number of viewers over TCP or WebSocket
+
+    python -m brownian.server --particles 5000 --port 8765 --ws-port 8766
+    python -m brownian.viewer --port 8765
+
+The particles are stepped by a SimulationThread; the asyncio loop
+samples its newest snapshot FPS times per second and sends every client
+the quantized delta to the frame that client received last (see
+brownian.stream). A client whose socket is still busy simply misses the
+frames in between and gets a single, larger delta afterwards, so a slow
+viewer never builds up a backlog or holds back the others.
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import struct
+import sys
+
+import numpy as np
+
+from . import stream
+from .engine import INTEGRATORS, ParticleSystem
+from .langevin import DT, FRICTION, TEMPERATURE
+from .threaded import RenderState, SimulationThread
+
+FPS = 30.0
+PORT = 8765
+# Bytes allowed to queue in a client's transport before its sender waits
+WRITE_BUFFER = 256 * 1024
+
+_WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+class Frame:
+    """One broadcast frame, shared read-only by every client"""
+
+    def __init__(self, index, step, q, hello):
+        self.index = index
+        self.step = step
+        self.q = q
+        self.hello = hello
+
+
+class Subscriber:
+    """A connected viewer and the last frame it was sent"""
+
+    def __init__(self, peer, send):
+        self.peer = peer
+        self.send = send
+        self.wake = asyncio.Event()
+        self.sent = None
+        self.frames = 0
+        self.dropped = 0
+
+
+class SimulationServer:
+    """Steps `system` and streams it to every subscriber"""
+
+    def __init__(self, system, speed=3, fps=FPS, warp=1):
+        self.system = system
+        self.fps = fps
+        self.simulation = SimulationThread(system, speed)
+        self.simulation.warp = warp
+        self.state = RenderState()
+        self.state.record_trails = False
+        self.subscribers = set()
+        self.frame = None
+        self._population = None
+        self._hello = None
+        self._delta = None
+
+    async def serve(self, host="127.0.0.1", port=PORT, ws_port=None):
+        servers = [await asyncio.start_server(self._serve_tcp, host, port)]
+        if ws_port is not None:
+            servers.append(await asyncio.start_server(self._serve_websocket, host, ws_port))
+        for server in servers:
+            for sock in server.sockets:
+                print(f"listening on {sock.getsockname()[:2]}", file=sys.stderr)
+        self.simulation.start()
+        try:
+            await self._publish_loop()
+        finally:
+            self.simulation.stop()
+            for server in servers:
+                server.close()
+
+    async def _publish_loop(self):
+        loop = asyncio.get_running_loop()
+        period = 1.0 / self.fps
+        next_time = loop.time()
+        index = 0
+        while True:
+            step = self.simulation.read(self.state, interpolate=False)
+            if self.frame is None or step != self.frame.step:
+                index += 1
+                self._publish(index, step)
+            next_time += period
+            await asyncio.sleep(max(0.0, next_time - loop.time()))
+
+    def _publish(self, index, step):
+        state = self.state
+        population = (state.generation, state.count)
+        if population != self._population:
+            self._population = population
+            header = {"particles": state.count, "width": self.system.width,
+                      "height": self.system.height, "seed": self.system.seed}
+            self._hello = stream.encode_hello(header, state.radius, state.color_index)
+        q = np.stack([stream.quantize(state.x, self.system.width),
+                      stream.quantize(state.y, self.system.height)])
+        self.frame = Frame(index, step, q, self._hello)
+        self._delta = None
+        for subscriber in self.subscribers:
+            subscriber.wake.set()
+
+    def _payloads(self, subscriber):
+        """Messages bringing `subscriber` up to the current frame"""
+        frame, sent = self.frame, subscriber.sent
+        if sent is None or sent.hello is not frame.hello:
+            return [(stream.HELLO, frame.hello),
+                    (stream.KEY, stream.encode_key(frame.step, frame.q))]
+        subscriber.dropped += frame.index - sent.index - 1
+        if frame.index - sent.index == 1:
+            # Every client that kept up needs the same delta, encode it once
+            if self._delta is None:
+                self._delta = stream.encode_delta(frame.step, frame.q, sent.step, sent.q)
+            return [(stream.DELTA, self._delta)]
+        return [(stream.DELTA, stream.encode_delta(frame.step, frame.q, sent.step, sent.q))]
+
+    async def _feed(self, subscriber):
+        while True:
+            await subscriber.wake.wait()
+            subscriber.wake.clear()
+            frame = self.frame
+            if frame is None or frame is subscriber.sent:
+                continue
+            for kind, payload in self._payloads(subscriber):
+                await subscriber.send(kind, payload)
+            subscriber.sent = frame
+            subscriber.frames += 1
+
+    async def _attach(self, subscriber, receive):
+        """Feed `subscriber` until `receive` returns (the peer went away)"""
+        self.subscribers.add(subscriber)
+        subscriber.wake.set()
+        print(f"viewer {subscriber.peer} connected", file=sys.stderr)
+        feeder = asyncio.create_task(self._feed(subscriber))
+        watcher = asyncio.create_task(receive())
+        try:
+            await asyncio.wait((feeder, watcher), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self.subscribers.discard(subscriber)
+            feeder.cancel()
+            watcher.cancel()
+            print(f"viewer {subscriber.peer} left after {subscriber.frames} frames "
+                  f"({subscriber.dropped} skipped)", file=sys.stderr)
+
+    async def _serve_tcp(self, reader, writer):
+        writer.transport.set_write_buffer_limits(high=WRITE_BUFFER)
+
+        async def send(kind, payload):
+            writer.write(stream.message(kind, payload))
+            await writer.drain()
+
+        async def receive():
+            # Viewers send nothing; a read only returns at EOF
+            while await reader.read(4096):
+                pass
+
+        try:
+            await self._attach(Subscriber(writer.get_extra_info("peername"), send), receive)
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def _serve_websocket(self, reader, writer):
+        writer.transport.set_write_buffer_limits(high=WRITE_BUFFER)
+        try:
+            if not await _websocket_handshake(reader, writer):
+                return
+
+            async def send(kind, payload):
+                writer.write(_websocket_frame(0x2, bytes((kind,)) + payload))
+                await writer.drain()
+
+            async def receive():
+                while True:
+                    opcode, payload = await _websocket_read(reader)
+                    if opcode == 0x8:
+                        writer.write(_websocket_frame(0x8, payload[:2]))
+                        return
+                    if opcode == 0x9:
+                        writer.write(_websocket_frame(0xA, payload))
+
+            await self._attach(Subscriber(writer.get_extra_info("peername"), send), receive)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def _websocket_handshake(reader, writer):
+    """Minimal RFC 6455 upgrade, returns False for anything else"""
+    request = await reader.readuntil(b"\r\n\r\n")
+    headers = {}
+    for line in request.decode("latin-1").split("\r\n")[1:]:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    key = headers.get("sec-websocket-key")
+    if key is None or headers.get("upgrade", "").lower() != "websocket":
+        writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+        return False
+    accept = base64.b64encode(hashlib.sha1(key.encode("ascii") + _WS_GUID).digest())
+    writer.write(b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+                 b"Connection: Upgrade\r\nSec-WebSocket-Accept: " + accept + b"\r\n\r\n")
+    await writer.drain()
+    return True
+
+
+def _websocket_frame(opcode, payload):
+    length = len(payload)
+    if length < 126:
+        head = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        head = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        head = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return head + payload
+
+
+async def _websocket_read(reader):
+    """One client frame as (opcode, unmasked payload)"""
+    first, second = await reader.readexactly(2)
+    length = second & 0x7F
+    if length == 126:
+        (length,) = struct.unpack("!H", await reader.readexactly(2))
+    elif length == 127:
+        (length,) = struct.unpack("!Q", await reader.readexactly(8))
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if mask is not None:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return first & 0x0F, payload
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m brownian.server",
+        description="Server simulasi Gerak Brown untuk banyak penampil"
+    )
+    parser.add_argument("-n", "--particles", type=int, default=20)
+    parser.add_argument("--width", type=float, default=800)
+    parser.add_argument("--height", type=float, default=600)
+    parser.add_argument("--speed", type=float, default=3)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--integrator", choices=INTEGRATORS, default="classic")
+    parser.add_argument("--temperature", type=float, default=TEMPERATURE)
+    parser.add_argument("--friction", type=float, default=FRICTION)
+    parser.add_argument("--dt", type=float, default=DT)
+    parser.add_argument("--warp", type=int, default=1,
+                        help="physics steps per simulation tick (0 = as fast as possible)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=PORT, help="TCP port")
+    parser.add_argument("--ws-port", type=int, default=None, help="also serve WebSocket")
+    parser.add_argument("--fps", type=float, default=FPS, help="frames broadcast per second")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    system = ParticleSystem(args.width, args.height, args.particles, seed=args.seed)
+    system.set_integrator(args.integrator, temperature=args.temperature,
+                          friction=args.friction, dt=args.dt)
+    system.record_trails = False
+    server = SimulationServer(system, args.speed, args.fps, args.warp)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.ws_port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
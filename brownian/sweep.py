@@ -0,0 +1,252 @@
+"""
+Parameter sweep
+Headless runs over a grid of parameters, one table row per run
+
+Every point of the grid (particles x speed x wall damping x kick, times
+`repeats`) runs in a worker process and comes back as one row of
+metrics: MSD slope and diffusion coefficient, wall-hit rate and mean
+speed. Rows are appended to a CSV file as soon as they arrive, so an
+interrupted sweep started again with the same output file only runs the
+points that are missing from it.
+
+    python -m brownian.sweep --particles 100,1000 --speed 1,3,5 \\
+        --wall-damping 0.5,0.8,1 --kick 0.25,0.5 --steps 2000 -o sweep.csv
+
+Run r of every point uses the same seed, so points differ by their
+parameters rather than by their noise; `seed` in the table reproduces a
+row with brownian.headless.
+"""
+
+import argparse
+import csv
+import itertools
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+from .engine import INTEGRATORS, KICK, WALL_DAMPING, ParticleSystem
+from .langevin import DT, FRICTION, TEMPERATURE
+
+PARAMETERS = ("particles", "speed", "wall_damping", "kick", "repeat")
+METRICS = ("msd_slope", "diffusion", "final_msd", "wall_hit_rate", "mean_speed", "elapsed_s")
+# Fixed for a whole sweep; a table is only resumed with the same values
+SETTINGS = ("steps", "sample_every", "width", "height", "integrator", "temperature",
+            "friction", "dt")
+COLUMNS = PARAMETERS + ("sweep_seed", "seed") + SETTINGS + METRICS
+INTEGER_COLUMNS = ("particles", "repeat", "sweep_seed", "seed", "steps", "sample_every")
+TEXT_COLUMNS = ("integrator",)
+
+
+def parameter_grid(particles, speeds, wall_dampings, kicks, repeats=1):
+    """Every combination as a dict, in a stable order"""
+    return [
+        dict(zip(PARAMETERS, (int(n), float(s), float(d), float(k), r)))
+        for n, s, d, k, r in itertools.product(particles, speeds, wall_dampings, kicks,
+                                               range(repeats))
+    ]
+
+
+def point_key(point):
+    return tuple(type_(point[name]) for name, type_ in zip(PARAMETERS, (int, float, float, float, int)))
+
+
+def run_seed(sweep_seed, repeat):
+    """Integer seed of run `repeat`, usable as ParticleSystem(seed=...)"""
+    state = np.random.SeedSequence(sweep_seed, spawn_key=(repeat,)).generate_state(1, np.uint64)
+    return int(state[0])
+
+
+def run_point(task):
+    """Simulate one grid point in a worker process, returns its table row"""
+    point, sweep_seed, settings = task
+    steps, sample_every = settings["steps"], settings["sample_every"]
+    width, height = settings["width"], settings["height"]
+    model = {name: settings[name] for name in ("integrator", "temperature", "friction", "dt")}
+    start = time.perf_counter()
+    seed = run_seed(sweep_seed, point["repeat"])
+    system = ParticleSystem(width, height, point["particles"], seed=seed)
+    system.set_integrator(**model)
+    system.kick = point["kick"]
+    system.wall_damping = point["wall_damping"]
+    system.record_trails = False
+    x0 = system.x.astype(np.float64)
+    y0 = system.y.astype(np.float64)
+
+    samples = steps // sample_every
+    msd = np.empty(samples, dtype=np.float64)
+    speed_sum = 0.0
+    hits = 0
+    for step in range(1, steps + 1):
+        system.step(point["speed"])
+        hits += system.last_wall_hits
+        if step % sample_every == 0:
+            dx = system.x - x0
+            dy = system.y - y0
+            msd[step // sample_every - 1] = (dx * dx + dy * dy).mean()
+            speed_sum += float(np.hypot(system.vx, system.vy).mean())
+
+    # Least-squares MSD = slope * lag + c over every sample
+    lags = np.arange(1, samples + 1, dtype=np.float64) * sample_every
+    slope = float(np.polyfit(lags, msd, 1)[0]) if samples >= 2 else float("nan")
+    return dict(
+        point,
+        sweep_seed=sweep_seed,
+        seed=seed,
+        **settings,
+        msd_slope=slope,
+        diffusion=slope / (4 * system.time_step),
+        final_msd=float(msd[-1]),
+        wall_hit_rate=hits / (steps * system.count),
+        mean_speed=speed_sum / samples,
+        elapsed_s=time.perf_counter() - start,
+    )
+
+
+def read_results(path):
+    """Complete rows of an existing sweep table; a row cut off by an interruption is dropped"""
+    rows = []
+    with open(path, newline="") as f:
+        reader = csv.DictReader(f)
+        if reader.fieldnames is not None and tuple(reader.fieldnames) != COLUMNS:
+            raise ValueError(f"{path} is not a sweep table of this version")
+        for row in reader:
+            try:
+                rows.append({name: _parse(name, row[name]) for name in COLUMNS})
+            except (TypeError, ValueError):
+                continue
+    return rows
+
+
+def _parse(name, text):
+    if name in TEXT_COLUMNS:
+        if text is None:
+            raise ValueError("missing value")
+        return text
+    return (int if name in INTEGER_COLUMNS else float)(text)
+
+
+def _write_rows(path, rows):
+    """Rewrite the table with only `rows`, atomically"""
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", newline="") as f:
+        writer = csv.DictWriter(f, COLUMNS)
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp, path)
+
+
+def run_sweep(output, grid, steps=1000, seed=None, workers=None, sample_every=10,
+              width=800, height=600, progress=None, integrator="classic",
+              temperature=TEMPERATURE, friction=FRICTION, dt=DT):
+    """Run every point of `grid` not yet in the CSV table `output`
+
+    Returns (runs done now, points already in the table). `progress` is
+    called as progress(done, total) after each appended row, counting
+    the points found in the table as done. Resuming with another seed
+    or run setting (steps, sampling, box, model) than the table was
+    made with raises ValueError.
+    """
+    if sample_every < 1 or steps < sample_every:
+        raise ValueError("steps must be at least sample_every (>= 1)")
+    if any(point["particles"] < 1 for point in grid):
+        raise ValueError("particles must be >= 1")
+    settings = {"steps": steps, "sample_every": sample_every, "width": float(width),
+                "height": float(height), "integrator": integrator,
+                "temperature": float(temperature), "friction": float(friction), "dt": float(dt)}
+
+    rows = read_results(output) if os.path.exists(output) else []
+    if rows:
+        sweep_seed = rows[0]["sweep_seed"]
+        if seed is not None and seed != sweep_seed:
+            raise ValueError(f"{output} was swept with seed {sweep_seed}, not {seed}")
+        for name, value in settings.items():
+            if rows[0][name] != value:
+                raise ValueError(f"{output} was swept with {name}={rows[0][name]}, not {value}")
+    else:
+        sweep_seed = np.random.SeedSequence(seed).entropy
+    # Drops a half-written last row before appending
+    _write_rows(output, rows)
+
+    finished = {point_key(row) for row in rows}
+    pending = [point for point in grid if point_key(point) not in finished]
+    resumed = len(grid) - len(pending)
+    tasks = ((point, sweep_seed, settings) for point in pending)
+
+    done = 0
+    workers = workers or os.cpu_count() or 1
+    with open(output, "a", newline="") as f, multiprocessing.Pool(workers) as pool:
+        writer = csv.DictWriter(f, COLUMNS)
+        for row in pool.imap_unordered(run_point, tasks):
+            writer.writerow(row)
+            f.flush()
+            done += 1
+            if progress is not None:
+                progress(resumed + done, len(grid))
+    return done, resumed
+
+
+def _values(type_):
+    def parse(text):
+        return [type_(value) for value in text.split(",") if value.strip()]
+    return parse
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m brownian.sweep",
+        description="Sapuan parameter Gerak Brown di semua core, hasil sebagai tabel CSV"
+    )
+    parser.add_argument("-n", "--particles", type=_values(int), default=[20],
+                        help="comma-separated particle counts")
+    parser.add_argument("--speed", type=_values(float), default=[3],
+                        help="comma-separated speeds")
+    parser.add_argument("--wall-damping", type=_values(float), default=[WALL_DAMPING],
+                        help="comma-separated wall damping factors")
+    parser.add_argument("--kick", type=_values(float), default=[KICK],
+                        help="comma-separated kick amplitudes")
+    parser.add_argument("-r", "--repeats", type=int, default=1,
+                        help="runs per grid point")
+    parser.add_argument("--steps", type=int, default=1000)
+    parser.add_argument("--sample-every", type=int, default=10)
+    parser.add_argument("--width", type=float, default=800)
+    parser.add_argument("--height", type=float, default=600)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--integrator", choices=INTEGRATORS, default="classic")
+    parser.add_argument("--temperature", type=float, default=TEMPERATURE)
+    parser.add_argument("--friction", type=float, default=FRICTION)
+    parser.add_argument("--dt", type=float, default=DT)
+    parser.add_argument("-o", "--output", default="sweep.csv",
+                        help="CSV table, an existing one is resumed")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    grid = parameter_grid(args.particles, args.speed, args.wall_damping, args.kick,
+                          args.repeats)
+    start = time.perf_counter()
+
+    def progress(done, total):
+        elapsed = time.perf_counter() - start
+        print(f"\r{done}/{total} titik, {elapsed:.0f}s", end="", file=sys.stderr, flush=True)
+
+    try:
+        done, resumed = run_sweep(
+            args.output, grid, args.steps, args.seed, args.workers, args.sample_every,
+            args.width, args.height, progress=progress, integrator=args.integrator,
+            temperature=args.temperature, friction=args.friction, dt=args.dt,
+        )
+    except ValueError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+    print(file=sys.stderr)
+    print(f"{done} runs done, {resumed} already in {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
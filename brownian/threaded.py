@@ -0,0 +1,306 @@
+"""
+Threaded simulation
+Steps a ParticleSystem on a worker thread at a fixed timestep
+
+The worker publishes triple-rotated snapshots (previous, current, back)
+and the Tk loop copies the newest pair into a RenderState, optionally
+interpolating between them. Rendering speed and simulation speed are
+independent: a slow frame never slows simulated time.
+
+With `warp` > 1 every tick runs that many steps and only the last one is
+published; warp = FAST_AS_POSSIBLE steps back to back and publishes at
+PUBLISH_RATE, so the display never waits for physics or the reverse.
+With `trail_points` set, the worker keeps the positions of the last
+steps and each snapshot carries the ones the reader has not seen yet,
+so trails get a point per step at any warp.
+"""
+
+import queue
+import threading
+import time
+
+import numpy as np
+
+from .engine import COLORS
+from .trails import TRAIL_LENGTH, TrailBuffer, TrailHistory
+
+STEP_RATE = 60.0
+MAX_CATCH_UP = 5
+PUBLISH_RATE = 60.0
+FAST_AS_POSSIBLE = 0
+
+
+class Snapshot:
+    """Particle state published by the worker after a step"""
+
+    def __init__(self):
+        self.step = -1
+        self.time = 0.0
+        self.generation = None
+        self.x = self.y = self.radius = None
+        self.color_index = None
+        # Positions of the newest steps, (N, k, 2) oldest first, or None
+        self.trail = None
+        self._trail_store = None
+
+    def fill(self, system, step, now, trail=None, points=0):
+        if self.x is None or self.x.shape != system.x.shape or self.x.dtype != system.x.dtype:
+            self.x = np.empty_like(system.x)
+            self.y = np.empty_like(system.y)
+            self.radius = np.empty_like(system.radius)
+            self.color_index = np.empty_like(system.color_index)
+        np.copyto(self.x, system.x)
+        np.copyto(self.y, system.y)
+        np.copyto(self.radius, system.radius)
+        np.copyto(self.color_index, system.color_index)
+        self.generation = system.generation
+        self.step = step
+        self.time = now
+        self.trail = None
+        if trail is not None and points:
+            store = self._trail_store
+            if store is None or store.shape != trail.data.shape:
+                store = self._trail_store = np.empty_like(trail.data)
+            self.trail = store[:, :points]
+            self.trail[...] = trail.recent(points)
+
+
+class RenderState(TrailHistory):
+    """Render-side copy of the newest snapshot, shaped like a ParticleSystem
+
+    Trails are recorded here: one point per new snapshot, or every step
+    the snapshot carries when it is more than one step ahead.
+    """
+
+    def __init__(self, trail_length=TRAIL_LENGTH):
+        self.trail_length = trail_length
+        self.record_trails = True
+        self.dtype = np.dtype(np.float64)
+        self.generation = 0
+        self.source = None
+        self.step = -1
+        self.x = self.y = self.radius = np.empty(0, dtype=self.dtype)
+        self.color_index = np.empty(0, dtype=np.uint8)
+        self.reset_trails(0)
+
+    @property
+    def count(self):
+        return len(self.x)
+
+    def __len__(self):
+        return self.count
+
+    def colors(self):
+        return [COLORS[i] for i in self.color_index.tolist()]
+
+    def _adopt(self, owner, template):
+        """Start over when a different population shows up"""
+        key = (id(owner), template.generation)
+        if key == self.source:
+            if len(template.x) != self.count:
+                self._resize(template)
+            return
+        self.source = key
+        self.dtype = template.x.dtype
+        self.x = np.empty_like(template.x)
+        self.y = np.empty_like(template.y)
+        self.radius = template.radius.copy()
+        self.color_index = template.color_index.copy()
+        self.generation += 1
+        self.reset_trails(self.count)
+
+    def _resize(self, template):
+        """Particles were added or removed; keep the survivors' trails"""
+        self.x = template.x.copy()
+        self.y = template.y.copy()
+        self.radius = template.radius.copy()
+        self.color_index = template.color_index.copy()
+        self.resize_trails(self.count)
+
+    def load(self, system, step=0):
+        """Copy state straight from a ParticleSystem (no worker running)"""
+        self._adopt(system, system)
+        np.copyto(self.x, system.x)
+        np.copyto(self.y, system.y)
+        if step != self.step:
+            self.step = step
+            self.record_trail()
+
+    def blend(self, prev, cur, alpha, owner):
+        """Interpolate between two snapshots into this state"""
+        self._adopt(owner, cur)
+        if prev.step < 0 or prev.generation != cur.generation or prev.x.shape != cur.x.shape:
+            alpha = 1.0
+        if alpha >= 1.0:
+            np.copyto(self.x, cur.x)
+            np.copyto(self.y, cur.y)
+        else:
+            np.subtract(cur.x, prev.x, out=self.x)
+            self.x *= alpha
+            self.x += prev.x
+            np.subtract(cur.y, prev.y, out=self.y)
+            self.y *= alpha
+            self.y += prev.y
+        if cur.step != self.step:
+            new = cur.step - self.step
+            self.step = cur.step
+            if new > 1 and cur.trail is not None:
+                self.extend_trail(cur.trail[:, -new:])
+            else:
+                self.record_trail()
+
+
+class SimulationThread:
+    """Advances a ParticleSystem at a fixed timestep on a worker thread
+
+    Changes to the system while the worker runs must go through submit(),
+    which runs them between two steps on the worker itself. With
+    `on_error` set, a command or step hook that raises is reported as
+    on_error(exc, source) instead of ending the worker; a failing hook
+    is detached.
+    """
+
+    def __init__(self, system, speed=3, step_rate=STEP_RATE, steps=0,
+                 max_catch_up=MAX_CATCH_UP, profiler=None):
+        self.system = system
+        self.profiler = profiler
+        self.speed = speed
+        self.dt = 1.0 / step_rate
+        self.steps = steps
+        self.max_catch_up = max_catch_up
+        # Steps per tick, or FAST_AS_POSSIBLE
+        self.warp = 1
+        self.step_hooks = []
+        self.on_error = None
+        # Trail points kept per step on the worker, 0 for none
+        self.trail_points = 0
+        self._trail = None
+        self._trail_key = None
+        self._read_step = steps
+
+        self._lock = threading.Lock()
+        self._commands = queue.SimpleQueue()
+        self._stop = threading.Event()
+        self._thread = None
+        self._prev, self._cur, self._back = Snapshot(), Snapshot(), Snapshot()
+        self._cur.fill(system, steps, time.perf_counter())
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="brownian-sim", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the worker and wait until it is parked, pending commands still run"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._run_commands()
+
+    def submit(self, command):
+        """Run `command()` on the worker between two steps"""
+        if self.running:
+            self._commands.put(command)
+        else:
+            command()
+
+    def _run_commands(self):
+        while True:
+            try:
+                command = self._commands.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                command()
+            except Exception as exc:
+                if self.on_error is None:
+                    raise
+                self.on_error(exc, command)
+
+    def _run(self):
+        next_time = time.perf_counter()
+        while not self._stop.is_set():
+            now = time.perf_counter()
+            if now < next_time:
+                time.sleep(next_time - now)
+                continue
+
+            if self.warp == FAST_AS_POSSIBLE:
+                # Step until the next publish is due, then hand over a frame
+                deadline = now + 1.0 / PUBLISH_RATE
+                while time.perf_counter() < deadline and not self._stop.is_set():
+                    self._advance()
+                next_time = time.perf_counter()
+                self._publish()
+                continue
+
+            # Fixed timestep; if we fall far behind, drop the backlog rather
+            # than spiralling into ever longer catch-up bursts
+            done = 0
+            while next_time <= now and done < self.max_catch_up:
+                for _ in range(self.warp):
+                    self._advance()
+                    if self._stop.is_set():
+                        break
+                next_time += self.dt
+                done += 1
+            if next_time <= now:
+                next_time = now + self.dt
+            self._publish()
+
+    def _advance(self):
+        self._run_commands()
+        start = time.perf_counter()
+        self.system.step(self.speed)
+        self.steps += 1
+        try:
+            for hook in self.step_hooks:
+                hook(self.system, self.steps)
+        except Exception as exc:
+            if self.on_error is None:
+                raise
+            self.step_hooks.remove(hook)
+            self.on_error(exc, hook)
+        if self.trail_points:
+            self._record_trail()
+        else:
+            self._trail = None
+        if self.profiler is not None:
+            self.profiler.record("step", time.perf_counter() - start)
+
+    def _record_trail(self):
+        system = self.system
+        trail = self._trail
+        key = (system.generation, system.count, self.trail_points)
+        if trail is None or self._trail_key != key:
+            trail = self._trail = TrailBuffer(system.count, self.trail_points, system.x.dtype)
+            self._trail_key = key
+        trail.push(system.x, system.y)
+
+    def _publish(self):
+        # Carry the steps the reader has not seen, at most a whole trail
+        trail, points = None, 0
+        if self.trail_points and self._trail is not None:
+            trail = self._trail
+            points = min(trail.size, self.steps - self._read_step)
+        # The back buffer is never visible to readers, so fill it unlocked
+        self._back.fill(self.system, self.steps, time.perf_counter(), trail, points)
+        with self._lock:
+            self._prev, self._cur, self._back = self._cur, self._back, self._prev
+
+    def read(self, state, interpolate=True):
+        """Copy the newest state into `state`, returns the simulated step"""
+        with self._lock:
+            prev, cur = self._prev, self._cur
+            alpha = 1.0
+            # Snapshots many steps apart are not worth blending
+            if interpolate and self.warp == 1:
+                alpha = min(1.0, (time.perf_counter() - cur.time) / self.dt)
+            state.blend(prev, cur, alpha, self.system)
+            self._read_step = cur.step
+        return cur.step
@@ -0,0 +1,185 @@
+"""
+Trail history
+Fixed-capacity ring buffer holding the last positions of every particle
+"""
+
+import numpy as np
+
+TRAIL_LENGTH = 30
+MIN_TRAIL_LENGTH = 2
+MAX_TRAIL_LENGTH = 1000
+
+
+class TrailBuffer:
+    """Preallocated (N, L, 2) ring of positions with one shared head index
+
+    Every step writes one column, so recording never allocates. Point ages
+    count backwards from the newest one: age 0 is the latest position.
+    """
+
+    def __init__(self, count, length=TRAIL_LENGTH, dtype=np.float64):
+        if not MIN_TRAIL_LENGTH <= length <= MAX_TRAIL_LENGTH:
+            raise ValueError(
+                f"trail length must be between {MIN_TRAIL_LENGTH} and {MAX_TRAIL_LENGTH}"
+            )
+        self.count = count
+        self.length = length
+        self.dtype = np.dtype(dtype)
+        # Allocated on the first push, so runs without trails never pay for it.
+        # `data` is a view of the first `count` rows of a pooled store.
+        self.data = None
+        self._store = None
+        self.head = 0
+        self.size = 0
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.head = 0
+        self.size = 0
+
+    def push(self, x, y):
+        """Record the current position of every particle"""
+        if self.data is None:
+            self._store = np.empty((self.count, self.length, 2), dtype=self.dtype)
+            self.data = self._store
+        self.data[:, self.head, 0] = x
+        self.data[:, self.head, 1] = y
+        self.head = (self.head + 1) % self.length
+        if self.size < self.length:
+            self.size += 1
+
+    def extend(self, points):
+        """Record several steps at once, `points` of shape (N, k, 2) oldest first"""
+        for i in range(max(0, points.shape[1] - self.length), points.shape[1]):
+            self.push(points[:, i, 0], points[:, i, 1])
+
+    def resize(self, count, x=None, y=None):
+        """Change the particle count in place, survivors keep their history
+
+        Rows of added particles are filled with their current position
+        (x[i], y[i]) at every age, so they start with a zero-length trail.
+        """
+        old = self.count
+        self.count = count
+        if self.data is None:
+            return
+        if count > len(self._store):
+            store = np.empty((max(count, 2 * len(self._store)), self.length, 2),
+                             dtype=self.dtype)
+            store[:old] = self._store[:old]
+            self._store = store
+        self.data = self._store[:count]
+        if count > old and x is not None:
+            self.data[old:, :, 0] = x[old:count, None]
+            self.data[old:, :, 1] = y[old:count, None]
+
+    def load(self, points):
+        """Replace the history with `points` of shape (N, k, 2), oldest first"""
+        points = points[:, max(0, points.shape[1] - self.length):]
+        keep = points.shape[1]
+        self.clear()
+        if keep == 0:
+            return
+        if self.data is None:
+            self.data = self._store = np.empty((self.count, self.length, 2), dtype=self.dtype)
+        self.data[:, :keep] = points
+        self.head = keep % self.length
+        self.size = keep
+
+    def slot(self, age):
+        """Ring index of the point `age` steps old"""
+        return (self.head - 1 - age) % self.length
+
+    def recent(self, points):
+        """Newest `points` positions of all particles, oldest first, shape (N, k, 2)
+
+        Only the requested points are gathered, not the whole history.
+        """
+        points = min(points, self.size)
+        if points == 0 or self.data is None:
+            return np.empty((self.count, 0, 2), dtype=self.dtype)
+        start = (self.head - points) % self.length
+        if start + points <= self.length:
+            return self.data[:, start:start + points]
+        return self.data.take(range(start, start + points), axis=1, mode="wrap")
+
+    def ordered(self, index=None):
+        """History oldest to newest as two views (older part, newer part)
+
+        Concatenating the two gives the full ordered trail; neither is a copy.
+        Without `index` the views cover every particle.
+        """
+        rows = slice(None) if index is None else index
+        if self.data is None or self.size == 0:
+            empty = np.empty((self.count, 0, 2), dtype=self.dtype)[rows]
+            return empty, empty
+        if self.size < self.length:
+            return self.data[rows, 0:0], self.data[rows, :self.size]
+        return self.data[rows, self.head:], self.data[rows, :self.head]
+
+    def to_array(self, index=None):
+        """Ordered copy of the history, for exporters that need one block"""
+        older, newer = self.ordered(index)
+        return np.concatenate([older, newer], axis=-2)
+
+    def points(self, index):
+        """Trail of one particle as a list of (x, y) tuples, oldest first"""
+        return [tuple(p) for p in self.to_array(index).tolist()]
+
+    def resized(self, length):
+        """New buffer with another capacity, keeping the newest points"""
+        other = TrailBuffer(self.count, length, self.dtype)
+        keep = min(self.size, length)
+        if keep:
+            other.data = other._store = np.empty((self.count, length, 2), dtype=self.dtype)
+            other.data[:, :keep] = self.recent(keep)
+            other.head = keep % length
+            other.size = keep
+        return other
+
+
+class TrailHistory:
+    """Mixin for particle containers that record trails
+
+    Hosts provide x, y, dtype, record_trails and trail_length. The version
+    and epoch counters let renderers tell how many points were recorded
+    since their previous frame and whether the history was thrown away.
+    """
+
+    def reset_trails(self, count):
+        self.trails = TrailBuffer(count, self.trail_length, self.dtype)
+        self.trail_version = 0
+        self.trail_epoch = getattr(self, "trail_epoch", -1) + 1
+
+    def resize_trails(self, count):
+        """Follow a particle count change without dropping the history"""
+        self.trails.resize(count, self.x, self.y)
+
+    def clear_trails(self):
+        self.trails.clear()
+        self.trail_epoch += 1
+
+    def load_trails(self, points):
+        """Replace the history with recorded points (N, k, 2), oldest first"""
+        self.clear_trails()
+        self.trails.load(points)
+        self.trail_version += self.trails.size
+
+    def set_trail_length(self, length):
+        """Change the trail capacity, keeping the newest points"""
+        self.trails = self.trails.resized(length)
+        self.trail_length = length
+        self.trail_epoch += 1
+
+    def record_trail(self):
+        if self.record_trails:
+            self.trails.push(self.x, self.y)
+            self.trail_version += 1
+
+    def extend_trail(self, points):
+        """Record several steps at once, `points` (N, k, 2) oldest first"""
+        if self.record_trails:
+            self.trails.extend(points)
+            self.trail_version += points.shape[1]
@@ -0,0 +1,212 @@
+"""
+Trajectory files
+Chunked binary recording of particle positions, read back via mmap
+
+Layout of a .brtraj file:
+
+    8 bytes   magic b"BRWNTRJ1"
+    4 bytes   little-endian header length H
+    H bytes   JSON header (particles, dt, seed, dtype, fields, offsets...)
+    static    radius (N float32) and color index (N uint8), 64-byte aligned
+    frames    frame k = fields x N values of `dtype`, back to back
+
+Frames are only ever appended, so the frame count is derived from the
+file size and a run that is killed mid-write stays readable up to its
+last complete frame.
+"""
+
+import json
+import os
+import queue
+import struct
+import threading
+
+import numpy as np
+
+MAGIC = b"BRWNTRJ1"
+ALIGN = 64
+CHUNK_STEPS = 64
+BUFFERS = 4
+
+
+def _aligned(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+
+def write_header(f, particles, fields, dtype, dt=1.0, seed=None, width=None,
+                 height=None, step0=0, radius=None, color_index=None):
+    """Write magic, JSON header and static block, returns the header dict"""
+    header = {
+        "version": 1,
+        "particles": particles,
+        "fields": list(fields),
+        "dtype": np.dtype(dtype).str,
+        "dt": dt,
+        "seed": seed,
+        "width": width,
+        "height": height,
+        "step0": step0,
+    }
+    # Offsets depend on the header size, iterate until they are stable
+    while True:
+        blob = json.dumps(header).encode("utf-8")
+        static = _aligned(len(MAGIC) + 4 + len(blob))
+        if header.get("radius_offset") == static:
+            break
+        header["radius_offset"] = static
+        header["color_offset"] = static + 4 * particles
+        header["data_offset"] = _aligned(header["color_offset"] + particles)
+
+    f.write(MAGIC)
+    f.write(struct.pack("<I", len(blob)))
+    f.write(blob)
+    f.write(b"\0" * (header["radius_offset"] - f.tell()))
+    radius = np.zeros(particles, np.float32) if radius is None else radius
+    color_index = np.zeros(particles, np.uint8) if color_index is None else color_index
+    f.write(np.ascontiguousarray(radius, dtype="<f4").tobytes())
+    f.write(np.ascontiguousarray(color_index, dtype=np.uint8).tobytes())
+    f.write(b"\0" * (header["data_offset"] - f.tell()))
+    return header
+
+
+def read_header(path):
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a trajectory file")
+        (length,) = struct.unpack("<I", f.read(4))
+        return json.loads(f.read(length).decode("utf-8"))
+
+
+class TrajectoryRecorder:
+    """Streams every step of a ParticleSystem to a trajectory file
+
+    Positions are copied into a preallocated chunk on the calling thread
+    (the simulation worker); full chunks are written by a background
+    writer thread, so neither rendering nor stepping waits on disk unless
+    all spare buffers are in flight. Usable as a step hook.
+
+    If a write fails the recording stops and the error is raised once,
+    from the next record() or from close().
+    """
+
+    def __init__(self, path, system, velocities=False, dtype=np.float32,
+                 dt=1.0, seed=None, step0=0, chunk_steps=CHUNK_STEPS):
+        self.path = path
+        self.particles = system.count
+        self.fields = ("x", "y", "vx", "vy") if velocities else ("x", "y")
+        self.dtype = np.dtype(dtype).newbyteorder("<")
+        self.frames = 0
+        self.closed = False
+        self.error = None
+
+        self._file = open(path, "wb")
+        self.header = write_header(
+            self._file, self.particles, self.fields, self.dtype, dt=dt, seed=seed,
+            width=system.width, height=system.height, step0=step0,
+            radius=system.radius, color_index=system.color_index,
+        )
+
+        shape = (chunk_steps, len(self.fields), self.particles)
+        self._free = queue.Queue()
+        for _ in range(BUFFERS):
+            self._free.put(np.empty(shape, dtype=self.dtype))
+        self._full = queue.Queue()
+        self._chunk = self._free.get()
+        self._fill = 0
+        self._writer = threading.Thread(target=self._write_loop, name="brownian-rec", daemon=True)
+        self._writer.start()
+
+    def __call__(self, system, step):
+        self.record(system)
+
+    def record(self, system):
+        """Append the current state as one frame"""
+        if self.closed:
+            return
+        if self.error is not None:
+            self.close()
+        if system.count != self.particles:
+            # The file has a fixed particle count; stop cleanly instead
+            self.close()
+            return
+        frame = self._chunk[self._fill]
+        for row, name in enumerate(self.fields):
+            frame[row] = getattr(system, name)
+        self._fill += 1
+        self.frames += 1
+        if self._fill == len(self._chunk):
+            self._full.put((self._chunk, self._fill))
+            self._chunk = self._free.get()
+            self._fill = 0
+
+    def _write_loop(self):
+        while True:
+            item = self._full.get()
+            if item is None:
+                return
+            chunk, fill = item
+            if self.error is None:
+                try:
+                    self._file.write(memoryview(chunk[:fill]).cast("B"))
+                except Exception as exc:
+                    self.error = exc
+            # Always handed back, so record() never waits on a dead writer
+            self._free.put(chunk)
+
+    def close(self):
+        """Flush the partial chunk and finish writing"""
+        if self.closed:
+            return
+        self.closed = True
+        if self._fill:
+            self._full.put((self._chunk, self._fill))
+        self._full.put(None)
+        self._writer.join()
+        self._file.close()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TrajectoryReader:
+    """Memory-mapped view of a trajectory file, any frame in O(1)"""
+
+    def __init__(self, path):
+        self.path = path
+        self.header = read_header(path)
+        self.particles = self.header["particles"]
+        self.fields = tuple(self.header["fields"])
+        self.dtype = np.dtype(self.header["dtype"])
+        self.radius = np.memmap(path, dtype="<f4", mode="r",
+                                offset=self.header["radius_offset"], shape=(self.particles,))
+        self.color_index = np.memmap(path, dtype=np.uint8, mode="r",
+                                     offset=self.header["color_offset"], shape=(self.particles,))
+        self.data = None
+        self.refresh()
+
+    def refresh(self):
+        """Map the file again, picking up frames appended since opening"""
+        frame_bytes = len(self.fields) * self.particles * self.dtype.itemsize
+        size = os.path.getsize(self.path) - self.header["data_offset"]
+        frames = size // frame_bytes if frame_bytes else 0
+        if frames == 0:
+            raise ValueError(f"{self.path} contains no frames")
+        self.data = np.memmap(self.path, dtype=self.dtype, mode="r",
+                              offset=self.header["data_offset"],
+                              shape=(frames, len(self.fields), self.particles))
+
+    def __len__(self):
+        return len(self.data)
+
+    def field(self, name, index):
+        """One field of one frame as a view into the mapped file"""
+        return self.data[index, self.fields.index(name)]
+
+    def window(self, start, stop):
+        """Positions of frames [start, stop) as a (frames, 2, N) view"""
+        return self.data[start:stop, :2]
@@ -0,0 +1,190 @@
+"""
+Stream viewer
+Lightweight Tk client drawing a brownian.server stream
+
+    python -m brownian.viewer --host 127.0.0.1 --port 8765 [--raster]
+
+A background thread reads and decodes messages as fast as they arrive;
+the Tk loop only ever draws the newest decoded frame, with the same
+renderers and trail history as the desktop app.
+"""
+
+import argparse
+import socket
+import sys
+import threading
+import time
+
+import numpy as np
+
+from . import stream
+from .engine import COLORS
+from .scheduler import FrameScheduler, Throttle
+from .server import PORT
+from .trails import TRAIL_LENGTH, TrailHistory
+
+
+class RemoteState(TrailHistory):
+    """The streamed population, shaped like a ParticleSystem for the renderers"""
+
+    def __init__(self, trail_length=TRAIL_LENGTH):
+        self.trail_length = trail_length
+        self.record_trails = True
+        self.dtype = np.dtype(np.float64)
+        self.generation = 0
+        self.population = None
+        self.step = -1
+        self.width = self.height = None
+        self.x = self.y = self.radius = np.empty(0, dtype=self.dtype)
+        self.color_index = np.empty(0, dtype=np.uint8)
+        self.reset_trails(0)
+
+    @property
+    def count(self):
+        return len(self.x)
+
+    def __len__(self):
+        return self.count
+
+    def colors(self):
+        return [COLORS[i] for i in self.color_index.tolist()]
+
+    def apply(self, frame):
+        """Take over a frame published by StreamReceiver"""
+        population, header, radius, color_index, step, x, y = frame
+        self.x, self.y = x, y
+        if population != self.population:
+            self.population = population
+            self.width = header["width"]
+            self.height = header["height"]
+            self.radius = radius
+            self.color_index = color_index
+            self.generation += 1
+            self.reset_trails(self.count)
+        if step != self.step:
+            self.step = step
+            self.record_trail()
+
+
+class StreamReceiver:
+    """Reads the stream on a daemon thread, keeps only the newest frame"""
+
+    def __init__(self, host, port=PORT):
+        self.sock = socket.create_connection((host, port))
+        self.decoder = stream.StreamDecoder()
+        self.frames = 0
+        self.bytes = 0
+        self.error = None
+        self.closed = False
+        self._latest = None
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="brownian-viewer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        decoder = self.decoder
+        try:
+            with self.sock.makefile("rb") as f:
+                while True:
+                    received = stream.read_message(f)
+                    if received is None:
+                        break
+                    kind, payload = received
+                    self.bytes += len(payload) + 5
+                    if decoder.feed(kind, payload):
+                        x, y = decoder.positions()
+                        frame = (decoder.population, decoder.header, decoder.radius,
+                                 decoder.color_index, decoder.step, x, y)
+                        with self._lock:
+                            self._latest = frame
+                        self.frames += 1
+        except (OSError, ValueError) as exc:
+            self.error = exc
+        self.closed = True
+
+    def take(self):
+        """The newest frame not taken yet, or None"""
+        with self._lock:
+            frame, self._latest = self._latest, None
+        return frame
+
+    def close(self):
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+def run_viewer(host, port=PORT, raster=False, show_trails=True):
+    import tkinter as tk
+    from .rendering import CanvasRenderer, RasterRenderer
+
+    receiver = StreamReceiver(host, port)
+    state = RemoteState()
+    state.record_trails = show_trails
+
+    root = tk.Tk()
+    root.title("Gerak Brown - Penampil")
+    root.configure(bg="#1a1a2e")
+    canvas = tk.Canvas(root, width=800, height=600, bg="#0f1419", highlightthickness=0)
+    canvas.pack(fill=tk.BOTH, expand=True)
+    renderer = (RasterRenderer if raster else CanvasRenderer)(canvas)
+    title_throttle = Throttle()
+    started = time.perf_counter()
+
+    def frame():
+        received = receiver.take()
+        if received is not None:
+            if received[0] != state.population:
+                renderer.clear()
+                canvas.config(width=int(received[1]["width"]), height=int(received[1]["height"]))
+            state.apply(received)
+            renderer.draw_grid(canvas.winfo_width(), canvas.winfo_height())
+            renderer.draw(state, show_trails)
+        if title_throttle.ready():
+            elapsed = max(time.perf_counter() - started, 1e-9)
+            root.title(f"Gerak Brown - Penampil | langkah {state.step} | "
+                       f"{receiver.frames / elapsed:.0f} fps | "
+                       f"{receiver.bytes / elapsed / 1024:.0f} KiB/s")
+        if receiver.closed:
+            frames.stop()
+            root.title("Gerak Brown - Penampil | koneksi terputus"
+                       + (f": {receiver.error}" if receiver.error else ""))
+
+    frames = FrameScheduler(root, frame)
+
+    def close():
+        frames.stop()
+        receiver.close()
+        root.destroy()
+
+    root.protocol("WM_DELETE_WINDOW", close)
+    frames.start()
+    root.mainloop()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m brownian.viewer",
+        description="Penampil aliran simulasi Gerak Brown"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--raster", action="store_true", help="use the raster renderer")
+    parser.add_argument("--no-trails", action="store_true", help="do not draw trails")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        run_viewer(args.host, args.port, raster=args.raster, show_trails=not args.no_trails)
+    except OSError as exc:
+        print(f"cannot connect to {args.host}:{args.port}: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from brownian.analytics import LiveAnalytics, MultiTauCorrelator
+from brownian.engine import ParticleSystem
+
+
+def test_diffusion_stays_stable_in_a_bounded_box():
+    # The walls are reached after a few hundred steps, MSD saturates soon after
+    system = ParticleSystem(200, 200, 50, seed=8)
+    system.set_integrator("langevin", temperature=4.0, friction=1.0, dt=1.0)
+    system.record_trails = False
+    analytics = LiveAnalytics()
+    estimates = []
+    for step in range(1, 5001):
+        system.step(0)
+        analytics.update(system)
+        if step in (1000, 5000):
+            estimates.append(analytics.diffusion_coefficient())
+    early, late = estimates
+    assert early == pytest.approx(4.0, rel=0.25)
+    assert late == pytest.approx(early, rel=0.15)
+    # Fitting over every lag is what the bound prevents
+    assert analytics.diffusion_coefficient(msd_fraction=None) < 0.5 * late
+
+
+def test_correlator_matches_direct_msd():
+    rng = np.random.default_rng(3)
+    steps, count = 300, 25
+    x = np.cumsum(rng.normal(size=(steps, count)), axis=0)
+    y = np.cumsum(rng.normal(size=(steps, count)), axis=0)
+    correlator = MultiTauCorrelator(count, "msd", points=8, levels=6, dtype=np.float64)
+    for t in range(steps):
+        correlator.push(x[t], y[t])
+
+    lags, values = correlator.result()
+    assert lags.tolist() == sorted(set(lags.tolist()))
+    for lag, value in zip(lags, values):
+        # Coarse levels sample every 2**level steps, from the first sample on
+        stride = 1 << max(0, int(lag).bit_length() - 3)
+        origins = np.arange(stride - 1, steps - lag, stride)
+        dx = x[origins + lag] - x[origins]
+        dy = y[origins + lag] - y[origins]
+        assert value == pytest.approx(float((dx * dx + dy * dy).mean()), rel=1e-9)
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from brownian.checkpoint import Autosaver, Checkpoint, load_checkpoint, save_checkpoint
+from brownian.engine import FIELDS, ParticleSystem
+from brownian.headless import run_headless
+
+
+def assert_same_state(a, b):
+    for name in FIELDS:
+        np.testing.assert_array_equal(getattr(a, name), getattr(b, name), err_msg=name)
+
+
+@pytest.mark.parametrize("integrator", ["classic", "langevin"])
+def test_resume_is_bit_identical(tmp_path, integrator):
+    path = str(tmp_path / "run.brckpt")
+    straight = ParticleSystem(800, 600, 300, seed=5)
+    straight.set_integrator(integrator, temperature=2.0, friction=0.3, dt=0.5)
+    interrupted = ParticleSystem(800, 600, 300, seed=5)
+    interrupted.set_integrator(integrator, temperature=2.0, friction=0.3, dt=0.5)
+    for system in (straight, interrupted):
+        system.kick = 0.7
+        system.wall_damping = 0.6
+
+    for _ in range(40):
+        straight.step(4)
+        interrupted.step(4)
+    save_checkpoint(path, interrupted, step=40, speed=4)
+    for _ in range(40):
+        straight.step(4)
+
+    resumed, header = load_checkpoint(path)
+    assert header["step"] == 40
+    assert header["speed"] == 4
+    assert (resumed.kick, resumed.wall_damping) == (0.7, 0.6)
+    assert resumed.integrator == integrator
+    for _ in range(40):
+        resumed.step(header["speed"])
+    assert_same_state(straight, resumed)
+    np.testing.assert_array_equal(straight.trails.to_array(), resumed.trails.to_array())
+
+
+def test_resume_after_resize(tmp_path):
+    path = str(tmp_path / "run.brckpt")
+    straight = ParticleSystem(800, 600, 50, seed=9)
+    interrupted = ParticleSystem(800, 600, 50, seed=9)
+    for system in (straight, interrupted):
+        for _ in range(10):
+            system.step(3)
+        system.resize(120)
+        for _ in range(10):
+            system.step(3)
+    save_checkpoint(path, interrupted, step=20)
+
+    resumed, _ = load_checkpoint(path)
+    # Particles added after the resume come from the next spawn batch
+    for system in (straight, resumed):
+        system.resize(200)
+        for _ in range(10):
+            system.step(3)
+    assert_same_state(straight, resumed)
+
+
+def test_headless_resume_matches_one_run(tmp_path):
+    path = str(tmp_path / "run.brckpt")
+    straight, _ = run_headless(num_particles=200, steps=60, seed=3)
+    run_headless(num_particles=200, steps=25, seed=3, checkpoint=path, checkpoint_every=10)
+    resumed, summary = run_headless(steps=35, resume=path)
+    assert summary["step"] == 60
+    assert_same_state(straight, resumed)
+
+
+
+def test_failed_autosave_is_raised_on_close(tmp_path):
+    saver = Autosaver(str(tmp_path / "missing" / "run.brckpt"), every_steps=1)
+    saver.save(ParticleSystem(800, 600, 10, seed=1), 1)
+    with pytest.raises(OSError):
+        saver.close()
+
+
+def test_failed_headless_autosave_fails_the_run(tmp_path, monkeypatch):
+    path = str(tmp_path / "run.brckpt")
+    write = Checkpoint.write
+    calls = []
+
+    def flaky(self, target):
+        # Only the first background write fails, the final save would succeed
+        calls.append(target)
+        if len(calls) == 1:
+            raise OSError("disk full")
+        write(self, target)
+
+    monkeypatch.setattr(Checkpoint, "write", flaky)
+    with pytest.raises(OSError, match="disk full"):
+        run_headless(num_particles=50, steps=40, seed=1, checkpoint=path, checkpoint_every=10)
@@ -0,0 +1,33 @@
+import numpy as np
+
+from brownian.collisions import candidate_pairs, resolve_collisions
+from brownian.engine import ParticleSystem
+
+
+def test_candidate_pairs_cover_every_close_pair_once():
+    rng = np.random.default_rng(0)
+    count, cell, width, height = 400, 12.0, 300.0, 200.0
+    x = rng.uniform(0, width, count)
+    y = rng.uniform(0, height, count)
+    i, j = candidate_pairs(x, y, cell, width, height)
+
+    pairs = {(min(a, b), max(a, b)) for a, b in zip(i.tolist(), j.tolist())}
+    assert len(pairs) == len(i)
+    assert all(a != b for a, b in pairs)
+    # Brute force: every pair closer than one cell must be a candidate
+    dist = np.hypot(x[:, None] - x, y[:, None] - y)
+    close = {(a, b) for a, b in zip(*np.nonzero(np.triu(dist < cell, k=1)))}
+    assert close <= pairs
+
+
+def test_collisions_conserve_momentum():
+    system = ParticleSystem(200, 200, 300, seed=4)
+    system.collisions = True
+    system.radius[:] = np.linspace(2, 6, system.count)
+    mass = system.radius.astype(np.float64) ** 2
+    before = (float((mass * system.vx).sum()), float((mass * system.vy).sum()))
+
+    hits = resolve_collisions(system)
+    assert hits > 0
+    after = (float((mass * system.vx).sum()), float((mass * system.vy).sum()))
+    np.testing.assert_allclose(after, before, atol=1e-9 * float(mass.sum()))
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from brownian.density import HEAT_LEVELS, OccupancyGrid
+from brownian.engine import ParticleSystem
+
+
+def test_every_step_adds_one_visit_per_particle():
+    system = ParticleSystem(800, 600, 250, seed=10)
+    grid = OccupancyGrid(cell=50)
+    for _ in range(20):
+        system.step(3)
+        grid.update(system)
+        assert grid.histogram().sum() == system.count * grid.steps
+    assert grid.shape == (12, 16)
+    assert grid.density().sum() * 50 * 50 == pytest.approx(1.0)
+
+
+def test_cells_follow_positions_and_edges_are_clamped():
+    system = ParticleSystem(100, 60, 4, seed=0)
+    system.x[:] = [0.0, 49.9, 50.0, 100.0]
+    system.y[:] = [0.0, 10.0, 59.9, 60.0]
+    grid = OccupancyGrid(cell=50)
+    grid.update(system)
+    assert grid.histogram().tolist() == [[2, 0], [0, 2]]
+
+
+def test_new_population_starts_a_new_histogram_but_resize_keeps_it():
+    system = ParticleSystem(200, 200, 30, seed=1)
+    grid = OccupancyGrid(cell=20)
+    grid.update(system)
+    system.resize(40)
+    grid.update(system)
+    assert grid.histogram().sum() == 70
+    grid.update(ParticleSystem(200, 200, 5, seed=2))
+    assert grid.histogram().sum() == 5
+
+
+def test_inactive_grid_ignores_steps_and_image_uses_the_palette():
+    system = ParticleSystem(200, 200, 30, seed=1)
+    grid = OccupancyGrid(cell=20)
+    grid.active = False
+    grid(system, 1)
+    assert grid.steps == 0
+    grid.active = True
+    grid(system, 1)
+    image = grid.image()
+    assert image.shape == (10, 10, 3) and image.dtype == np.uint8
+    busiest = np.unravel_index(grid.histogram().argmax(), grid.shape)
+    assert image[busiest].tolist() == grid.palette[HEAT_LEVELS - 1].tolist()
+
+
+def test_export_round_trip(tmp_path):
+    system = ParticleSystem(210, 100, 50, seed=3)
+    grid = OccupancyGrid(cell=50)
+    grid.update(system)
+    grid.export(str(tmp_path / "density.npz"))
+    grid.export(str(tmp_path / "density.csv"))
+    saved = np.load(tmp_path / "density.npz")
+    np.testing.assert_array_equal(saved["counts"], grid.histogram())
+    assert saved["x_edges"].tolist() == [0, 50, 100, 150, 200, 210]
+    np.testing.assert_array_equal(np.loadtxt(tmp_path / "density.csv", delimiter=",", ndmin=2),
+                                  grid.histogram())
@@ -0,0 +1,62 @@
+import math
+
+import pytest
+
+from brownian.engine import ParticleSystem
+from brownian.langevin import ou_coefficients
+
+# A box this large keeps the walls out of reach for the whole run
+BOX = 1e7
+COUNT = 40_000
+
+
+def msd_from_rest(t, temperature, friction):
+    """2D mean squared displacement of particles starting at rest
+
+    Per axis (Uhlenbeck-Ornstein, v0 = 0):
+    kT/gamma² * (2 gamma t - 3 + 4 exp(-gamma t) - exp(-2 gamma t))
+    """
+    h = friction * t
+    return 2 * temperature / friction ** 2 * (2 * h - 3 + 4 * math.exp(-h) - math.exp(-2 * h))
+
+
+@pytest.mark.parametrize("dt", [0.25, 1.0, 4.0])
+def test_msd_matches_closed_form(dt):
+    temperature, friction = 1.5, 0.5
+    system = ParticleSystem(BOX, BOX, COUNT, seed=21)
+    system.set_integrator("langevin", temperature=temperature, friction=friction, dt=dt)
+    system.record_trails = False
+    system.vx[:] = 0
+    system.vy[:] = 0
+    x0 = system.x.copy()
+    y0 = system.y.copy()
+
+    # Exact for any dt: check at the same physical times whatever the step
+    steps = 0
+    for t in (4.0, 16.0, 40.0):
+        while steps * dt < t - 1e-9:
+            system.step(0)
+            steps += 1
+        dx = system.x - x0
+        dy = system.y - y0
+        msd = float((dx * dx + dy * dy).mean())
+        assert msd == pytest.approx(msd_from_rest(t, temperature, friction), rel=0.03)
+
+
+def test_velocities_relax_to_temperature():
+    temperature = 2.0
+    system = ParticleSystem(BOX, BOX, COUNT, seed=22)
+    system.set_integrator("langevin", temperature=temperature, friction=1.0, dt=1.0)
+    system.record_trails = False
+    for _ in range(20):
+        system.step(0)
+    assert float(system.vx.var()) == pytest.approx(temperature, rel=0.03)
+    assert float(system.vy.var()) == pytest.approx(temperature, rel=0.03)
+
+
+def test_small_step_coefficients_are_continuous():
+    # The Taylor branch and the closed form agree where they meet
+    below = ou_coefficients(1.0, 1.0, 0.05 * (1 - 1e-9))
+    above = ou_coefficients(1.0, 1.0, 0.05 * (1 + 1e-9))
+    for a, b in zip(below, above):
+        assert a == pytest.approx(b, rel=1e-6)
@@ -0,0 +1,88 @@
+import multiprocessing
+
+import numpy as np
+import pytest
+
+from brownian.engine import FIELDS, ParticleSystem
+from brownian.headless import run_headless
+from brownian.parallel import ParallelStepper, shard_bounds
+from brownian.rng import RNG_BLOCK
+
+# Three blocks, so up to three shards
+COUNT = 2 * RNG_BLOCK + 500
+
+
+def make_system(integrator, seed=11):
+    system = ParticleSystem(800, 600, COUNT, seed=seed)
+    system.set_integrator(integrator)
+    system.record_trails = False
+    return system
+
+
+def assert_same_state(a, b):
+    for name in FIELDS:
+        np.testing.assert_array_equal(getattr(a, name), getattr(b, name), err_msg=name)
+
+
+def test_shard_bounds_cover_whole_blocks():
+    bounds = shard_bounds(COUNT, 8, RNG_BLOCK)
+    assert bounds == [(0, RNG_BLOCK), (RNG_BLOCK, 2 * RNG_BLOCK), (2 * RNG_BLOCK, COUNT)]
+    assert shard_bounds(10, 4, RNG_BLOCK) == [(0, 10)]
+
+
+@pytest.mark.parametrize("integrator", ["classic", "langevin"])
+@pytest.mark.parametrize("processes", [1, 2, 3])
+def test_parallel_matches_single_process(integrator, processes):
+    single = make_system(integrator)
+    for _ in range(20):
+        single.step(3)
+
+    system = make_system(integrator)
+    with ParallelStepper(system, processes) as stepper:
+        stepper.step(3, 5)
+        for _ in range(15):
+            stepper.step(3)
+    assert_same_state(single, system)
+
+    # The RNG hand-over lets the system carry on single-process
+    for _ in range(5):
+        single.step(3)
+        system.step(3)
+    assert_same_state(single, system)
+
+
+def test_parallel_with_spawn_context():
+    single = make_system("classic")
+    for _ in range(10):
+        single.step(3)
+
+    system = make_system("classic")
+    with ParallelStepper(system, 3, multiprocessing.get_context("spawn")) as stepper:
+        stepper.step(3, 10)
+    assert_same_state(single, system)
+
+
+def test_close_releases_shared_memory_after_worker_failure():
+    system = make_system("classic")
+    stepper = ParallelStepper(system, 2)
+    stepper.step(3)
+    worker = stepper._workers[0]
+    worker.kill()
+    worker.join()
+    with pytest.raises(RuntimeError):
+        stepper.step(3)
+    with pytest.raises(RuntimeError):
+        stepper.close()
+    assert stepper._handles == []
+    assert system.count == COUNT
+    system.step(3)
+
+
+def test_headless_parallel_resume_matches_one_run(tmp_path):
+    path = str(tmp_path / "run.brckpt")
+    count = 9000
+    straight, _ = run_headless(num_particles=count, steps=30, seed=4)
+    run_headless(num_particles=count, steps=12, seed=4, checkpoint=path, checkpoint_every=5,
+                 processes=3)
+    resumed, _ = run_headless(steps=18, resume=path, processes=2)
+    assert_same_state(straight, resumed)
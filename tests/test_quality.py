@@ -0,0 +1,44 @@
+from brownian.quality import QUALITY_LEVELS, AdaptiveQuality
+
+BUDGET = 1 / 60
+
+
+def feed(quality, seconds, now):
+    """One full window of equal frame times, returns whether the level changed"""
+    changed = False
+    for _ in range(quality.samples.maxlen):
+        changed = quality.observe(seconds, now=now)
+    return changed
+
+
+def test_slow_frames_step_down_one_level_per_window():
+    quality = AdaptiveQuality(budget=BUDGET, window=10, hold=2.0)
+    assert feed(quality, 2 * BUDGET, now=0.0)
+    assert quality.level == 1
+    assert feed(quality, 2 * BUDGET, now=0.1)
+    assert quality.level == 2
+    for _ in range(len(QUALITY_LEVELS)):
+        feed(quality, 2 * BUDGET, now=0.2)
+    assert quality.level == len(QUALITY_LEVELS) - 1
+    assert quality.current == QUALITY_LEVELS[-1]
+
+
+def test_quality_returns_only_after_headroom_and_hold():
+    quality = AdaptiveQuality(budget=BUDGET, window=10, headroom=0.6, hold=2.0)
+    feed(quality, 2 * BUDGET, now=0.0)
+    assert quality.level == 1
+    # Inside the dead band between headroom and budget: stay
+    assert not feed(quality, 0.8 * BUDGET, now=10.0)
+    # Fast frames, but the last change is too recent
+    quality.last_change = 9.0
+    assert not feed(quality, 0.1 * BUDGET, now=10.0)
+    assert quality.level == 1
+    assert feed(quality, 0.1 * BUDGET, now=11.0)
+    assert quality.level == 0
+
+
+def test_a_few_spikes_do_not_lower_quality():
+    quality = AdaptiveQuality(budget=BUDGET, window=20)
+    for i in range(20):
+        quality.observe(3 * BUDGET if i in (3, 11) else 0.5 * BUDGET, now=0.0)
+    assert quality.level == 0
@@ -0,0 +1,51 @@
+import numpy as np
+
+from brownian.engine import ParticleSystem
+from brownian.replay import TrajectoryPlayer
+from brownian.trajectory import TrajectoryReader, TrajectoryRecorder
+
+
+def test_replay_matches_the_recorded_run(tmp_path):
+    path = str(tmp_path / "run.brtraj")
+    system = ParticleSystem(400, 300, 20, seed=7, trail_length=10)
+    with TrajectoryRecorder(path, system, dtype=np.float64, step0=100) as recorder:
+        recorder.record(system)
+        history = [np.stack([system.x, system.y], axis=-1)]
+        for _ in range(40):
+            system.step(3)
+            recorder.record(system)
+            history.append(np.stack([system.x, system.y], axis=-1))
+    history = np.stack(history, axis=1)
+
+    player = TrajectoryPlayer(TrajectoryReader(path), trail_length=10)
+    assert player.frames == 41
+    np.testing.assert_array_equal(player.radius, system.radius.astype(np.float32))
+
+    # Playing forward appends trail points, seeking rebuilds them; both agree
+    player.seek(3)
+    for index in (4, 9, 30, 31, 12, 40, 0):
+        player.seek(index)
+        assert player.step == 100 + index
+        np.testing.assert_array_equal(player.x, history[:, index, 0])
+        np.testing.assert_array_equal(player.trails.to_array(),
+                                      history[:, max(0, index - 9):index + 1])
+    # The last recorded trail is the one the simulation kept
+    player.seek(40)
+    np.testing.assert_array_equal(player.trails.to_array(), system.trails.to_array())
+
+
+def test_playback_advances_by_rate_and_stops_at_the_end(tmp_path):
+    path = str(tmp_path / "run.brtraj")
+    system = ParticleSystem(400, 300, 5, seed=8)
+    with TrajectoryRecorder(path, system) as recorder:
+        for _ in range(30):
+            recorder.record(system)
+            system.step(3)
+
+    player = TrajectoryPlayer(TrajectoryReader(path), frame_rate=10)
+    player.set_rate(2.0)
+    player.advance(0.5)
+    assert player.frame_index == 10
+    player.advance(10)
+    assert player.frame_index == 29
+    assert not player.playing
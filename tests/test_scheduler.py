@@ -0,0 +1,103 @@
+import itertools
+
+import pytest
+
+from brownian import scheduler
+from brownian.scheduler import Debouncer, FrameScheduler, Throttle
+
+
+class FakeRoot:
+    """after()/after_cancel() against a virtual clock in seconds"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.jobs = {}
+        self._ids = itertools.count()
+
+    def after(self, ms, callback):
+        job = next(self._ids)
+        self.jobs[job] = (self.now + ms / 1000, callback)
+        return job
+
+    def after_cancel(self, job):
+        del self.jobs[job]
+
+    def run_until(self, end):
+        while self.jobs:
+            job, (when, callback) = min(self.jobs.items(), key=lambda item: item[1][0])
+            if when > end:
+                break
+            del self.jobs[job]
+            self.now = max(self.now, when)
+            callback()
+        self.now = end
+
+
+@pytest.fixture
+def root(monkeypatch):
+    root = FakeRoot()
+    monkeypatch.setattr(scheduler.time, "perf_counter", lambda: root.now)
+    return root
+
+
+def test_frame_cost_does_not_stretch_the_frame_rate(root):
+    frames = []
+
+    def frame():
+        frames.append(root.now)
+        root.now += 0.010  # 10 ms of work in a 16.7 ms period
+
+    loop = FrameScheduler(root, frame, fps=60)
+    loop.start()
+    root.run_until(1.0)
+    assert len(frames) == pytest.approx(60, abs=1)
+    assert loop.missed == 0
+    loop.stop()
+    assert root.jobs == {}
+
+
+def test_overrun_restarts_the_schedule_instead_of_bursting(root):
+    frames = []
+
+    def frame():
+        frames.append(root.now)
+        root.now += 0.050 if len(frames) == 3 else 0.001
+
+    loop = FrameScheduler(root, frame, fps=60)
+    loop.start()
+    root.run_until(0.2)
+    assert loop.missed == 1
+    gaps = [b - a for a, b in zip(frames[3:], frames[4:])]
+    assert min(gaps) >= 0.015
+
+
+def test_throttle_lets_through_at_most_rate_per_second():
+    throttle = Throttle(rate=4)
+    passed = [t for t in range(100) if throttle.ready(now=t / 100)]
+    assert passed == [0, 25, 50, 75]
+    throttle.reset()
+    assert throttle.ready(now=0.76)
+
+
+def test_debouncer_collapses_a_drag_into_one_call(root):
+    calls = []
+    debouncer = Debouncer(root, delay_ms=120)
+    for value in range(10):
+        debouncer.schedule("speed", lambda value=value: calls.append(("speed", value)))
+        root.run_until(root.now + 0.05)
+    debouncer.schedule("trail", lambda: calls.append(("trail", 1)))
+    assert calls == []
+    root.run_until(root.now + 0.2)
+    assert sorted(calls) == [("speed", 9), ("trail", 1)]
+
+
+def test_debouncer_flush_and_cancel(root):
+    calls = []
+    debouncer = Debouncer(root)
+    debouncer.schedule("a", lambda: calls.append("a"))
+    debouncer.flush()
+    assert calls == ["a"] and root.jobs == {}
+    debouncer.schedule("b", lambda: calls.append("b"))
+    debouncer.cancel()
+    root.run_until(1.0)
+    assert calls == ["a"]
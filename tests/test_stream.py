@@ -0,0 +1,68 @@
+import io
+
+import numpy as np
+import pytest
+
+from brownian.engine import ParticleSystem
+from brownian.stream import (DELTA, HELLO, KEY, PLANES16, RAW8, StreamDecoder, encode_delta,
+                             encode_hello, encode_key, message, quantize, read_message)
+
+
+def quantized(system):
+    return np.stack([quantize(system.x, system.width), quantize(system.y, system.height)])
+
+
+def test_key_and_deltas_rebuild_every_frame():
+    system = ParticleSystem(800, 600, 200, seed=9)
+    header = {"particles": system.count, "width": system.width, "height": system.height}
+    sent = [quantized(system)]
+    stream = [message(HELLO, encode_hello(header, system.radius, system.color_index)),
+              message(KEY, encode_key(0, sent[0]))]
+    rng = np.random.default_rng(1)
+    for step in range(1, 30):
+        # Mostly small moves, with a few large jumps that need 16-bit deltas
+        if step % 10:
+            move = rng.integers(-100, 100, sent[-1].shape)
+        else:
+            move = rng.integers(-5000, 5000, sent[-1].shape)
+        q = (sent[-1] + move).astype("<u2")
+        stream.append(message(DELTA, encode_delta(step, q, step - 1, sent[-1])))
+        sent.append(q)
+
+    decoder = StreamDecoder()
+    reader = io.BytesIO(b"".join(stream))
+    frames, modes = [], set()
+    while (item := read_message(reader)) is not None:
+        kind, payload = item
+        if kind == DELTA:
+            modes.add(payload[16])
+        if decoder.feed(kind, payload):
+            frames.append(decoder.q.copy())
+    assert modes == {RAW8, PLANES16}
+    assert decoder.step == 29
+    np.testing.assert_array_equal(decoder.radius, system.radius.astype(np.float32))
+    np.testing.assert_array_equal(np.array(frames), np.array(sent))
+    x, _ = decoder.positions()
+    np.testing.assert_allclose(x, sent[-1][0] * (system.width / 65535))
+
+
+def test_quantization_error_is_below_one_quantum():
+    system = ParticleSystem(800, 600, 200, seed=9)
+    decoder = StreamDecoder()
+    decoder.feed(HELLO, encode_hello({"particles": system.count, "width": system.width,
+                                      "height": system.height},
+                                     system.radius, system.color_index))
+    decoder.feed(KEY, encode_key(0, quantized(system)))
+    x, y = decoder.positions()
+    np.testing.assert_allclose(x, system.x, atol=system.width / 65535)
+    np.testing.assert_allclose(y, system.y, atol=system.height / 65535)
+
+
+def test_delta_against_a_missed_frame_is_rejected():
+    q0 = np.zeros((2, 4), dtype="<u2")
+    decoder = StreamDecoder()
+    decoder.feed(HELLO, encode_hello({"particles": 4, "width": 1.0, "height": 1.0},
+                                     np.ones(4), np.zeros(4)))
+    decoder.feed(KEY, encode_key(5, q0))
+    with pytest.raises(ValueError):
+        decoder.feed(DELTA, encode_delta(7, q0 + 1, 6, q0))
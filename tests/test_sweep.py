@@ -0,0 +1,52 @@
+import csv
+
+import pytest
+
+from brownian.sweep import COLUMNS, parameter_grid, read_results, run_sweep
+
+STEPS = 40
+
+
+def small_grid(particles=(5, 10)):
+    return parameter_grid(particles, [1.0, 2.0], [0.8], [0.5])
+
+
+def test_rows_are_written_for_every_point(tmp_path):
+    output = str(tmp_path / "sweep.csv")
+    done, resumed = run_sweep(output, small_grid(), steps=STEPS, seed=1, workers=2)
+    assert (done, resumed) == (4, 0)
+    rows = read_results(output)
+    assert sorted((row["particles"], row["speed"]) for row in rows) == [
+        (5, 1.0), (5, 2.0), (10, 1.0), (10, 2.0)]
+    assert all(row["steps"] == STEPS and row["integrator"] == "classic" for row in rows)
+    with open(output, newline="") as f:
+        assert tuple(next(csv.reader(f))) == COLUMNS
+
+
+def test_resume_runs_only_the_missing_points(tmp_path):
+    output = str(tmp_path / "sweep.csv")
+    run_sweep(output, small_grid(), steps=STEPS, seed=1, workers=1)
+    first = read_results(output)
+
+    # An interrupted write leaves a partial last row behind
+    with open(output, "a") as f:
+        f.write("20,1.0,0.8")
+    done, resumed = run_sweep(output, small_grid((5, 10, 20)), steps=STEPS, workers=1)
+    assert (done, resumed) == (2, 4)
+    rows = read_results(output)
+    assert len(rows) == 6
+    assert rows[:4] == first
+    assert sorted(row["particles"] for row in rows[4:]) == [20, 20]
+    # Same seed as the first part, taken from the table
+    assert {row["sweep_seed"] for row in rows} == {first[0]["sweep_seed"]}
+
+
+@pytest.mark.parametrize("changed", [{"steps": STEPS + 10}, {"integrator": "langevin"},
+                                     {"width": 500}, {"seed": 2}])
+def test_resume_with_other_settings_is_rejected(tmp_path, changed):
+    output = str(tmp_path / "sweep.csv")
+    run_sweep(output, small_grid(), steps=STEPS, seed=1, workers=1)
+    settings = dict({"steps": STEPS, "seed": 1, "workers": 1}, **changed)
+    with pytest.raises(ValueError):
+        run_sweep(output, small_grid(), **settings)
+    assert len(read_results(output)) == 4
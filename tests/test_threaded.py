@@ -0,0 +1,62 @@
+import time
+
+import numpy as np
+
+from brownian.engine import ParticleSystem
+from brownian.threaded import RenderState, SimulationThread
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.perf_counter() + timeout
+    while not condition() and time.perf_counter() < deadline:
+        time.sleep(0.005)
+    return condition()
+
+
+def test_failing_hook_is_reported_and_detached():
+    errors = []
+    simulation = SimulationThread(ParticleSystem(800, 600, 10, seed=1), step_rate=1000)
+    simulation.on_error = lambda exc, source: errors.append((exc, source))
+
+    def broken(system, step):
+        raise OSError("disk full")
+
+    def broken_command():
+        raise ValueError("bad command")
+
+    simulation.step_hooks.append(broken)
+    simulation.start()
+    try:
+        simulation.submit(broken_command)
+        assert wait_for(lambda: len(errors) == 2)
+        steps = simulation.steps
+        assert wait_for(lambda: simulation.steps > steps + 10)
+        assert simulation.running
+    finally:
+        simulation.stop()
+    assert {type(exc) for exc, _ in errors} == {OSError, ValueError}
+    assert {source for _, source in errors} == {broken, broken_command}
+    assert simulation.step_hooks == []
+
+
+def test_warped_trails_keep_every_step():
+    system = ParticleSystem(800, 600, 20, seed=2)
+    system.record_trails = False
+    simulation = SimulationThread(system, step_rate=200)
+    simulation.warp = 8
+    simulation.trail_points = 30
+    state = RenderState(trail_length=30)
+    simulation.start()
+    try:
+        while simulation.steps < 200:
+            simulation.read(state)
+            time.sleep(0.002)
+    finally:
+        simulation.stop()
+    simulation.read(state)
+
+    reference = ParticleSystem(800, 600, 20, seed=2, trail_length=30)
+    for _ in range(simulation.steps):
+        reference.step(simulation.speed)
+    assert state.step == simulation.steps
+    np.testing.assert_array_equal(state.trails.to_array(), reference.trails.to_array())
@@ -0,0 +1,43 @@
+import numpy as np
+
+from brownian.trails import TrailBuffer
+
+
+def positions(step, count=3):
+    """Distinct, recognizable positions of every particle at `step`"""
+    x = np.arange(count) * 100.0 + step
+    return x, -x
+
+
+def test_ring_keeps_the_newest_points_in_order_after_wrapping():
+    trails = TrailBuffer(3, length=4)
+    for step in range(10):
+        trails.push(*positions(step))
+    assert trails.size == 4
+    assert trails.head == 10 % 4
+    expected = np.stack([np.stack(positions(step), axis=-1) for step in range(6, 10)], axis=1)
+    np.testing.assert_array_equal(trails.to_array(), expected)
+    np.testing.assert_array_equal(trails.recent(3), expected[:, 1:])
+    assert trails.points(1) == [(100.0 + step, -100.0 - step) for step in range(6, 10)]
+    # Age 0 is the newest point
+    assert trails.data[0, trails.slot(0), 0] == 9
+    assert trails.data[0, trails.slot(3), 0] == 6
+
+
+def test_partial_ring_and_resize_keep_history():
+    trails = TrailBuffer(3, length=5)
+    for step in range(3):
+        trails.push(*positions(step))
+    older, newer = trails.ordered()
+    assert older.shape[1] == 0
+    np.testing.assert_array_equal(newer[:, :, 0], [[0, 1, 2], [100, 101, 102], [200, 201, 202]])
+
+    x, y = positions(50, count=4)
+    trails.resize(4, x, y)
+    history = trails.to_array()
+    np.testing.assert_array_equal(history[:3, :, 0], newer[:, :, 0])
+    # An added particle starts with a zero-length trail at its position
+    np.testing.assert_array_equal(history[3, :, 0], [350, 350, 350])
+
+    shorter = trails.resized(2)
+    np.testing.assert_array_equal(shorter.to_array(), history[:, 1:])
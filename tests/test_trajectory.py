@@ -0,0 +1,68 @@
+import os
+
+import numpy as np
+import pytest
+
+from brownian.engine import ParticleSystem
+from brownian.headless import run_headless
+from brownian.trajectory import BUFFERS, CHUNK_STEPS, TrajectoryReader, TrajectoryRecorder
+
+def record_run(path, steps, chunk_steps=CHUNK_STEPS, velocities=False):
+    """Record `steps` steps after frame 0, returns the positions of every frame"""
+    system = ParticleSystem(400, 300, 30, seed=6)
+    system.record_trails = False
+    frames = []
+    with TrajectoryRecorder(path, system, velocities=velocities, dtype=np.float64, step0=5,
+                            seed=system.seed, chunk_steps=chunk_steps) as recorder:
+        for _ in range(steps + 1):
+            if frames:
+                system.step(3)
+            recorder.record(system)
+            frames.append(np.stack([system.x, system.y, system.vx, system.vy]))
+    return system, np.array(frames)
+
+
+def test_recording_reads_back_exactly(tmp_path):
+    path = str(tmp_path / "run.brtraj")
+    # Chunks of 7 leave a partial chunk for close() to flush
+    system, frames = record_run(path, 50, chunk_steps=7, velocities=True)
+    reader = TrajectoryReader(path)
+    assert len(reader) == 51
+    assert reader.header["step0"] == 5
+    assert reader.header["seed"] == system.seed
+    np.testing.assert_array_equal(reader.data, frames)
+    np.testing.assert_array_equal(reader.field("vy", 20), frames[20, 3])
+    np.testing.assert_array_equal(reader.radius, system.radius.astype(np.float32))
+    np.testing.assert_array_equal(reader.color_index, system.color_index)
+
+
+def test_truncated_recording_stays_readable(tmp_path):
+    path = str(tmp_path / "run.brtraj")
+    _, frames = record_run(path, 20)
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 10)
+    reader = TrajectoryReader(path)
+    assert len(reader) == 20
+    np.testing.assert_array_equal(reader.data[:, :2], frames[:20, :2])
+
+
+needs_dev_full = pytest.mark.skipif(not os.path.exists("/dev/full"),
+                                    reason="needs /dev/full to fail writes")
+
+
+@needs_dev_full
+def test_failed_write_is_raised_instead_of_blocking():
+    system = ParticleSystem(800, 600, 100, seed=1)
+    recorder = TrajectoryRecorder("/dev/full", system)
+    with pytest.raises(OSError):
+        # More chunks than buffers: a dead writer would block forever here
+        for _ in range(CHUNK_STEPS * (BUFFERS + 2)):
+            recorder.record(system)
+    assert recorder.closed
+    recorder.close()
+
+
+@needs_dev_full
+def test_headless_run_fails_when_recording_fails():
+    with pytest.raises(OSError):
+        run_headless(num_particles=100, steps=CHUNK_STEPS * (BUFFERS + 2), record="/dev/full")